@@ -1,3 +1,7 @@
+from musicpi.startup import StartupReport
+
+STARTUP = StartupReport()  # before anything else is imported, so the report covers the imports as well
+
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -6,7 +10,6 @@ from platform import machine
 import yaml
 
 from musicpi.hmi.hmi import Hmi
-from musicpi.musicpi_application import MusicPi
 
 LOG = logging.getLogger(__name__)
 
@@ -31,12 +34,22 @@ if __name__ == "__main__":
         print("Raspi")
         from musicpi.hmi.hmi_arm import HmiArm
 
-        h: Hmi = HmiArm()
+        h: Hmi = HmiArm(cfg.get("hmi", {}))
     elif machine() == "x86_64":
         print("Laptop")
         from musicpi.hmi.hmi_x86_64 import HmiX86X64
 
-        h: Hmi = HmiX86X64()  # type: ignore
+        h: Hmi = HmiX86X64(cfg.get("hmi", {}))  # type: ignore
     else:
         raise ValueError("I don't know who I am! Problably the hardware platform is not supported (yet)!")
-    MusicPi(hmi=h, cfg=cfg.get("logic", {})).start()
+    STARTUP.mark("hmi")
+
+    # something on the display before the application with mpd, asyncio and the state machine is imported
+    from musicpi.hmi.splash import splash_frame
+
+    h.show_on_display(splash_frame())
+    STARTUP.mark("splash")
+
+    with STARTUP.importing("musicpi.musicpi_application"):
+        from musicpi.musicpi_application import MusicPi
+    MusicPi(hmi=h, cfg=cfg.get("logic", {}), startup=STARTUP).start()
@@ -1 +1,15 @@
-from .mpd_wrapper import Mpd, SongInfo, Stats, Status
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .mpd_wrapper import Mpd, PlayerSnapshot, SongInfo, Stats, Status
+
+_MPD_WRAPPER_EXPORTS = {"Mpd", "PlayerSnapshot", "SongInfo", "Stats", "Status"}
+
+
+def __getattr__(name: str) -> Any:
+    """imports mpd_wrapper on first use, so importing e.g. musicpi.hmi for the splash screen doesn't load mpd"""
+    if name in _MPD_WRAPPER_EXPORTS:
+        from . import mpd_wrapper
+
+        return getattr(mpd_wrapper, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from threading import Condition, Thread
+from time import perf_counter
+from typing import Callable, Optional
+
+from mpd import CommandError, MPDClient, MPDError
+from PIL import Image
+
+from musicpi.mpd_wrapper import MpdWrapper
+from musicpi.probes import PROBES
+
+LOG = logging.getLogger(__name__)
+
+COVER_ART_SIZE = 32  # pixels, the thumbnail fits into a square of this size
+COVER_CACHE_MAX_BYTES = 1024 * 1024
+COVER_MEMORY_ENTRIES = 16  # thumbnails kept in memory, including albums known to have no cover
+
+
+def fetch_cover_art(client: MPDClient, file: str) -> Optional[bytes]:
+    """the cover file in the song's directory or, if there is none, the picture embedded in the song"""
+    for command in (client.albumart, client.readpicture):
+        try:
+            picture = command(file)
+        except CommandError:  # albumart answers "No file exists" if there is no cover
+            continue
+        if picture.get("binary"):
+            return bytes(picture["binary"])
+    return None
+
+
+def make_thumbnail(data: bytes, size: int = COVER_ART_SIZE) -> Image.Image:
+    """downscales a cover to fit size x size and dithers it to 1-bit"""
+    with Image.open(BytesIO(data)) as encoded:
+        encoded.draft("L", (size, size))  # lets the jpeg decoder shrink the image by up to 8 while decoding
+        image = encoded.convert("L")
+    image.thumbnail((size, size), Image.Resampling.LANCZOS)
+    return image.convert("1")  # Floyd-Steinberg
+
+
+class ThumbnailCache:
+    """1-bit thumbnails as png files in a directory, bounded by their total size
+
+    The modification time of a file is its last use, so the least recently used thumbnails are evicted first, even
+    across restarts. An empty file records that an album has no cover.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = COVER_CACHE_MAX_BYTES) -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._sizes: OrderedDict[Path, int] = OrderedDict()  # least recently used first
+        if directory.is_dir():
+            stats = sorted(((path, path.stat()) for path in directory.glob("*.png")), key=lambda p: p[1].st_mtime)
+            self._sizes.update((path, stat.st_size) for path, stat in stats)
+
+    @property
+    def size(self) -> int:
+        return sum(self._sizes.values())
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key) in self._sizes
+
+    def load(self, key: str) -> Optional[Image.Image]:
+        """the cached thumbnail or None if the album has no cover. Marks it as used."""
+        path = self._path(key)
+        try:
+            os.utime(path)
+            self._sizes.move_to_end(path)
+            if not self._sizes[path]:
+                return None
+            with Image.open(path) as image:
+                return image.convert("1")
+        except (OSError, KeyError) as e:
+            LOG.warning(f"Ignoring unreadable thumbnail {path}: {e}")
+            self._sizes.pop(path, None)
+            return None
+
+    def save(self, key: str, thumbnail: Optional[Image.Image]) -> None:
+        path = self._path(key)
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            if thumbnail is None:
+                path.write_bytes(b"")
+            else:
+                thumbnail.save(path, optimize=True)
+            self._sizes[path] = path.stat().st_size
+            self._sizes.move_to_end(path)
+            self._evict()
+        except OSError as e:
+            LOG.warning(f"Couldn't cache thumbnail {path}: {e}")
+
+    def _evict(self) -> None:
+        size = self.size
+        while size > self._max_bytes and len(self._sizes) > 1:
+            path, evicted = self._sizes.popitem(last=False)
+            path.unlink(missing_ok=True)
+            size -= evicted
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{hashlib.sha1(key.encode()).hexdigest()}.png"
+
+
+class CoverArt(Thread):
+    """album covers as thumbnails for the display, fetched and made in this thread
+
+    get() never blocks: it returns what is known already and otherwise asks the thread for the cover, calling on_ready
+    once it's there. Only the latest request is worked on, so skipping through tracks doesn't queue up work. The
+    mpd_wrapper should be a dedicated one, so fetching a cover doesn't compete with the ui for the connection.
+    """
+
+    def __init__(
+        self,
+        mpd_wrapper: MpdWrapper,
+        cache: Optional[ThumbnailCache] = None,
+        size: int = COVER_ART_SIZE,
+        on_ready: Optional[Callable[[], object]] = None,
+    ) -> None:
+        super().__init__(name="cover-art", daemon=True)
+        self._mpd_wrapper = mpd_wrapper
+        self._cache = cache
+        self._size = size
+        self._on_ready = on_ready
+        self._thumbnails: OrderedDict[str, Optional[Image.Image]] = OrderedDict()
+        self._wanted: Optional[str] = None
+        self._working_on: Optional[str] = None
+        self._condition = Condition()
+        self._stop_requested = False
+
+    @staticmethod
+    def key(file: Path) -> str:
+        """covers belong to albums, i.e. to the directory of a song"""
+        return str(file.parent)
+
+    def get(self, file: Path) -> Optional[Image.Image]:
+        if file == Path("."):  # no current song
+            return None
+        key = self.key(file)
+        with self._condition:
+            if key in self._thumbnails:
+                self._thumbnails.move_to_end(key)
+                return self._thumbnails[key]
+            # other tracks of the album that is being fetched already share its cover
+            if key not in (self.key(Path(f)) for f in (self._wanted, self._working_on) if f is not None):
+                self._wanted = str(file)
+                self._condition.notify()
+        return None
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stop_requested = True
+            self._condition.notify()
+        if self.is_alive():
+            self.join()
+
+    def run(self) -> None:
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._stop_requested or self._wanted is not None)
+                    if self._stop_requested:
+                        return
+                    file, self._wanted = self._wanted, None
+                    self._working_on = file
+                assert file is not None
+                try:
+                    thumbnail = self._thumbnail(file)
+                except (MPDError, OSError) as e:
+                    LOG.warning(f"Couldn't fetch the cover of {file}: {e}")
+                    with self._condition:
+                        self._working_on = None
+                    continue  # asked for again with the next frame that shows the song
+                except Exception:
+                    LOG.exception(f"Couldn't make the thumbnail of {file}")
+                    with self._condition:
+                        self._working_on = None
+                    continue
+                with self._condition:
+                    self._working_on = None
+                    self._thumbnails[self.key(Path(file))] = thumbnail
+                    while len(self._thumbnails) > COVER_MEMORY_ENTRIES:
+                        self._thumbnails.popitem(last=False)
+                if self._on_ready is not None:
+                    self._on_ready()
+        finally:
+            self._mpd_wrapper.disconnect()
+
+    def _thumbnail(self, file: str) -> Optional[Image.Image]:
+        key = self.key(Path(file))
+        if self._cache is not None and key in self._cache:
+            return self._cache.load(key)
+        start = perf_counter()
+        with self._mpd_wrapper as client:
+            data = fetch_cover_art(client, file)
+        PROBES.record("coverart.fetch", perf_counter() - start)
+        thumbnail = None
+        if data is not None:
+            try:
+                with PROBES.measure("coverart.thumbnail"):
+                    thumbnail = make_thumbnail(data, self._size)
+            except Exception as e:  # pillow raises anything from OSError to SyntaxError for a broken image
+                LOG.warning(f"Couldn't decode the cover of {file}: {e}")
+        if self._cache is not None:
+            self._cache.save(key, thumbnail)
+        return thumbnail
@@ -1 +1,13 @@
-from .display import Display
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .display import Display
+
+
+def __getattr__(name: str) -> Any:
+    """imports the display, and with it luma, on first use rather than with every module of this package"""
+    if name == "Display":
+        from .display import Display
+
+        return Display
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from queue import Queue
+from threading import Event, Lock, Timer
+from time import monotonic
+from typing import Callable, Dict, Optional
+
+LOG = logging.getLogger(__name__)
+
+BUTTON_DEBOUNCE_TIME = 0.02
+BUTTON_LONG_PRESS_TIME = 1.0
+
+
+class ButtonEventType(Enum):
+    PRESS = "press"
+    LONG_PRESS = "long_press"
+    RELEASE = "release"
+
+
+@dataclass(frozen=True)
+class ButtonEvent:
+    button: str
+    type: ButtonEventType
+    timestamp: float  # time.monotonic() of the edge that caused the event
+
+
+@dataclass
+class _ButtonState:
+    pressed: bool = False
+    settling: bool = False
+    presses: int = 0
+    long_press_timer: Optional[Timer] = None
+
+
+class ButtonEvents:
+    """turns raw edges of buttons into debounced press, long-press and release events on a thread-safe queue
+
+    The first edge after a quiet period is reported right away. Further edges are ignored for the debounce time,
+    after which the pin is read once more, so a change that happened while bouncing still gets reported. A button
+    that is held for long_press seconds additionally yields a long-press event before its release.
+    """
+
+    def __init__(
+        self,
+        is_pressed: Callable[[str], bool],
+        debounce: float = BUTTON_DEBOUNCE_TIME,
+        long_press: float = BUTTON_LONG_PRESS_TIME,
+    ) -> None:
+        self._is_pressed = is_pressed
+        self.debounce = debounce
+        self.long_press = long_press
+        self._states: Dict[str, _ButtonState] = {}
+        self._lock = Lock()
+        self.queue: "Queue[ButtonEvent]" = Queue()
+        self.wakeup: Optional[Event] = None  # set along with every queued event, so one can wait for more than input
+
+    def on_edge(self, button: str) -> None:
+        """to be called on every edge of the button's pin, e.g. from an RPi.GPIO event callback"""
+        timestamp = monotonic()
+        with self._lock:
+            state = self._states.setdefault(button, _ButtonState())
+            if state.settling:
+                return
+            self._update(button, state, timestamp)
+
+    def _settled(self, button: str) -> None:
+        with self._lock:
+            state = self._states[button]
+            state.settling = False
+            self._update(button, state, monotonic())
+
+    def _update(self, button: str, state: _ButtonState, timestamp: float) -> None:
+        pressed = self._is_pressed(button)
+        if pressed == state.pressed:
+            return
+        state.pressed = pressed
+        state.settling = True
+        _start_timer(self.debounce, self._settled, button)
+        if pressed:
+            state.presses += 1
+            state.long_press_timer = _start_timer(self.long_press, self._held, button, state.presses)
+            self._put(ButtonEvent(button, ButtonEventType.PRESS, timestamp))
+        else:
+            if state.long_press_timer is not None:
+                state.long_press_timer.cancel()
+            self._put(ButtonEvent(button, ButtonEventType.RELEASE, timestamp))
+
+    def _held(self, button: str, press: int) -> None:
+        with self._lock:
+            state = self._states[button]
+            if state.pressed and state.presses == press:
+                self._put(ButtonEvent(button, ButtonEventType.LONG_PRESS, monotonic()))
+
+    def _put(self, event: ButtonEvent) -> None:
+        LOG.debug(f"{event.button}: {event.type.value}")
+        self.queue.put(event)
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+
+def _start_timer(interval: float, function: Callable[..., None], *args: object) -> Timer:
+    timer = Timer(interval, function, args)
+    timer.daemon = True
+    timer.start()
+    return timer
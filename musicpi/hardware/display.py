@@ -1,15 +1,42 @@
-from threading import Thread
+from dataclasses import dataclass
 from time import sleep
+from typing import List, Optional, Tuple
 
 from luma.core.interface.serial import i2c
 from luma.core.render import canvas
 from luma.oled.device import sh1106
-from PIL import ImageDraw
+from PIL import Image, ImageDraw
+
+PAGE_HEIGHT = 8
+COLUMN_OFFSET = 0x02  # the sh1106 has 132 columns of ram, the 128 visible ones start at column 2
+SET_PAGE_ADDRESS = 0xB0
+SET_LOWER_COLUMN = 0x00
+SET_HIGHER_COLUMN = 0x10
+
+
+@dataclass
+class TransferStats:
+    frames_sent: int = 0
+    frames_skipped: int = 0
+    pages_sent: int = 0
+    bytes_sent: int = 0
+
+
+def to_pages(image: Image.Image) -> List[bytes]:
+    """packs a 1-bit image into the sh1106 memory layout: one byte per column and page, LSB is the topmost pixel"""
+    _, height = image.size
+    pages = height // PAGE_HEIGHT
+    # after flipping and transposing, each row of the image holds one display column bottom-up, so PIL's MSB-first
+    # packing yields the page bytes of that column in reverse page order
+    columns = image.transpose(Image.Transpose.FLIP_TOP_BOTTOM).transpose(Image.Transpose.TRANSPOSE).tobytes()
+    return [columns[pages - 1 - page :: pages] for page in range(pages)]
 
 
 class Display:
-    def __init__(self) -> None:
-        self._display = sh1106(i2c(port=1, address=0x3C))
+    def __init__(self, device: Optional[sh1106] = None) -> None:
+        self._display = device if device is not None else sh1106(i2c(port=1, address=0x3C))
+        self._last_pages: Optional[List[bytes]] = None
+        self._stats = TransferStats()
 
     def write_teststuff_to_displays(self) -> None:
         with canvas(self._display) as draw:
@@ -21,5 +48,47 @@ class Display:
     def dis(self) -> ImageDraw.Draw:
         return self._display
 
+    @property
+    def transfer_stats(self) -> TransferStats:
+        return self._stats
+
+    def show(self, image: Image.Image) -> None:
+        """sends only the column range of those pages that differ from the previously sent frame"""
+        pages = to_pages(self._display.preprocess(image))
+        previous = self._last_pages
+        changed = False
+        for page, data in enumerate(pages):
+            if previous is None:
+                self._send_page(page, 0, data)
+            elif previous[page] != data:
+                first, last = _changed_columns(previous[page], data)
+                self._send_page(page, first, data[first : last + 1])
+            else:
+                continue
+            changed = True
+        if changed:
+            self._stats.frames_sent += 1
+        else:
+            self._stats.frames_skipped += 1
+        self._last_pages = pages
+
+    def invalidate(self) -> None:
+        """forces the next frame to be sent completely, e.g. after the display content got lost"""
+        self._last_pages = None
+
+    def _send_page(self, page: int, first_column: int, data: bytes) -> None:
+        column = first_column + COLUMN_OFFSET
+        command = (SET_PAGE_ADDRESS + page, SET_LOWER_COLUMN | (column & 0x0F), SET_HIGHER_COLUMN | (column >> 4))
+        self._display.command(*command)
+        self._display.data(list(data))
+        self._stats.pages_sent += 1
+        self._stats.bytes_sent += len(command) + len(data)
+
     def run_for_fun(self) -> None:
         print("hey")
+
+
+def _changed_columns(previous: bytes, current: bytes) -> Tuple[int, int]:
+    first = next(x for x in range(len(current)) if previous[x] != current[x])
+    last = next(x for x in reversed(range(len(current))) if previous[x] != current[x])
+    return first, last
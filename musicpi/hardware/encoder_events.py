@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Condition
+from time import monotonic
+from typing import Optional
+
+ENCODER_STEPS_PER_DETENT = 4  # the Encoder library counts every edge of both quadrature signals
+
+
+@dataclass(frozen=True)
+class Acceleration:
+    slow: float = 5.0  # detents per second up to which every detent moves by one entry
+    fast: float = 25.0  # detents per second from which on every detent moves by max_factor entries
+    max_factor: int = 10
+
+    def factor(self, speed: float) -> int:
+        if speed <= self.slow:
+            return 1
+        ratio = min(1.0, (speed - self.slow) / (self.fast - self.slow))
+        return round(1 + ratio * (self.max_factor - 1))
+
+
+@dataclass(frozen=True)
+class EncoderDelta:
+    delta: int  # accelerated number of entries to move, negative means counter-clockwise
+    detents: int  # the detents the delta is made of
+    timestamp: float  # time.monotonic() of the latest of these detents
+
+
+class EncoderEvents:
+    """turns the absolute count of a rotary encoder into accelerated deltas
+
+    Deltas are coalesced until they're taken, so a fast spin ends up as one ui update rather than one per detent. The
+    speed is measured between successive detents and restarts whenever the direction changes.
+    """
+
+    def __init__(
+        self,
+        count: int = 0,
+        steps_per_detent: int = ENCODER_STEPS_PER_DETENT,
+        acceleration: Acceleration = Acceleration(),
+    ) -> None:
+        self._count = count
+        self._steps_per_detent = steps_per_detent
+        self._acceleration = acceleration
+        self._last_detent: Optional[float] = None
+        self._last_direction = 0
+        self._pending: Optional[EncoderDelta] = None
+        self._condition = Condition()
+
+    def on_count(self, count: int, timestamp: Optional[float] = None) -> None:
+        """to be called with the current count whenever it may have changed, e.g. from an RPi.GPIO event callback"""
+        timestamp = monotonic() if timestamp is None else timestamp
+        with self._condition:
+            detents = int((count - self._count) / self._steps_per_detent)
+            if not detents:
+                return
+            self._count += detents * self._steps_per_detent
+            direction = 1 if detents > 0 else -1
+            if direction == self._last_direction and self._last_detent is not None and timestamp > self._last_detent:
+                speed = abs(detents) / (timestamp - self._last_detent)
+            else:
+                speed = 0.0
+            self._last_detent, self._last_direction = timestamp, direction
+            delta = detents * self._acceleration.factor(speed)
+            if self._pending is not None:
+                delta += self._pending.delta
+                detents += self._pending.detents
+            self._pending = EncoderDelta(delta=delta, detents=detents, timestamp=timestamp)
+            self._condition.notify_all()
+
+    def take(self, timeout: Optional[float] = 0) -> Optional[EncoderDelta]:
+        """everything since the last call as one delta. Waits up to timeout seconds (forever if None) for rotation."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending is not None, timeout=timeout)
+            pending, self._pending = self._pending, None
+            return pending
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from platform import machine
+from queue import Queue
+from threading import Event
 from time import sleep
 from typing import Optional
 
@@ -17,6 +19,9 @@ from pathlib import Path
 import RPi.GPIO as GPIO
 from Encoder import Encoder
 
+from musicpi.hardware.button_events import ButtonEvent, ButtonEvents
+from musicpi.hardware.encoder_events import EncoderDelta, EncoderEvents
+
 LOG = logging.getLogger(Path(__file__).name)
 
 
@@ -45,20 +50,27 @@ class PinInterface:
         self._encoder = Encoder(Pins.enc["a"], Pins.enc["b"])
         self._setup_encoder_pins()
         # GPIO init happens in Encoder(...)
+        self._encoder_events = EncoderEvents(self.encoder_value())
+        self._setup_encoder_events()
+        self._button_events = ButtonEvents(self._button_pin_pressed)
         self._setup_buttons()
         self._setup_leds()
 
-    @staticmethod
-    def _setup_buttons() -> None:
-        for button in Pins.buttons.values():
+    def _setup_buttons(self) -> None:
+        for name, button in Pins.buttons.items():
             GPIO.setup(button, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-            GPIO.add_event_detect(button, GPIO.FALLING)
+            GPIO.add_event_detect(button, GPIO.BOTH, callback=lambda _, name=name: self._button_events.on_edge(name))
 
     @staticmethod
     def _setup_encoder_pins() -> None:
         for enc_pin in Pins.enc.values():
             GPIO.setup(enc_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
 
+    def _setup_encoder_events(self) -> None:
+        # runs after the Encoder's own callback, which was added first, so the count is up to date
+        for enc_pin in Pins.enc.values():
+            GPIO.add_event_callback(enc_pin, lambda _: self._encoder_events.on_count(self.encoder_value()))
+
     @staticmethod
     def _setup_leds() -> None:
         for led_pin in Pins.leds.values():
@@ -67,6 +79,18 @@ class PinInterface:
     def encoder_value(self) -> int:
         return int(self._encoder.read())
 
+    @property
+    def encoder_events(self) -> EncoderEvents:
+        return self._encoder_events
+
+    @property
+    def button_events(self) -> ButtonEvents:
+        return self._button_events
+
+    @staticmethod
+    def _button_pin_pressed(name: str) -> bool:
+        return not bool(GPIO.input(Pins.buttons[name]))
+
     def button_pressed(self) -> bool:
         return not bool(GPIO.input(Pins.buttons["button"]))
 
@@ -93,6 +117,10 @@ class RotaryEncoder:
     def read(self) -> int:
         return self._pin_interface.encoder_value()
 
+    def take_delta(self, timeout: Optional[float] = 0) -> Optional[EncoderDelta]:
+        """accelerated rotation since the last call, coalesced into one delta. See EncoderEvents.take"""
+        return self._pin_interface.encoder_events.take(timeout)
+
 
 class Button:
     def __init__(self) -> None:
@@ -101,6 +129,19 @@ class Button:
     def pressed(self) -> bool:
         return self._pin_interface.button_pressed()
 
+    @property
+    def events(self) -> "Queue[ButtonEvent]":
+        """press, long-press and release events of the button as well as the encoder's switch"""
+        return self._pin_interface.button_events.queue
+
+    def notify(self, wakeup: Optional[Event]) -> None:
+        """sets wakeup along with every event from now on, None stops that"""
+        self._pin_interface.button_events.wakeup = wakeup
+
+    def configure(self, debounce: float, long_press: float) -> None:
+        self._pin_interface.button_events.debounce = debounce
+        self._pin_interface.button_events.long_press = long_press
+
 
 class Led:
     def __init__(self) -> None:
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from tempfile import gettempdir
+from time import monotonic, time
+from types import TracebackType
+from typing import Optional, Tuple, Type
+
+from PIL import Image
+
+LOG = logging.getLogger(__name__)
+
+FRAMEBUFFER_MAGIC = b"MPFB"
+FRAMEBUFFER_SIZE = (128, 64)
+# shared memory rather than a disk, if there is one
+FRAMEBUFFER_PATH = Path("/dev/shm" if Path("/dev/shm").is_dir() else gettempdir()) / "musicpi.fb"
+FRAMEBUFFER_READ_ATTEMPTS = 100
+# magic, width, height, sequence, wall clock time and monotonic time of the frame. The sequence is odd while a frame
+# is being written and twice the frame number otherwise
+HEADER = struct.Struct("<4sHHQdd")
+
+
+@dataclass(frozen=True)
+class FramebufferFrame:
+    number: int  # frames written before and including this one
+    time: float  # time.time() when it was written
+    monotonic: float  # time.monotonic() when it was written, comparable across processes
+    image: Image.Image
+
+
+class Framebuffer:
+    """1-bit frames in a memory-mapped file, one at a time, with a frame counter and timestamps
+
+    The file holds a header and the pixels packed like PIL packs a 1-bit image, eight pixels per byte and the leftmost
+    in the most significant bit. One process writes, any number of others may read. Readers retry while a frame is
+    being written, so they never see half of one.
+    """
+
+    def __init__(self, path: Path, writable: bool, size: Optional[Tuple[int, int]] = None) -> None:
+        self._path = path
+        if writable:
+            assert size is not None
+            self._size = size
+            with open(path, "w+b") as f:
+                f.truncate(HEADER.size + self._frame_bytes)
+                self._mmap = mmap.mmap(f.fileno(), 0)
+            HEADER.pack_into(self._mmap, 0, FRAMEBUFFER_MAGIC, *size, 0, 0.0, 0.0)
+        else:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, width, height, *_ = HEADER.unpack_from(self._mmap)
+            if magic != FRAMEBUFFER_MAGIC:
+                self._mmap.close()
+                raise ValueError(f"{path} is no framebuffer")
+            self._size = (width, height)
+        self._sequence = 0
+
+    @classmethod
+    def create(cls, path: Path, size: Tuple[int, int] = FRAMEBUFFER_SIZE) -> Framebuffer:
+        """a new, blank framebuffer to write to. Replaces the content of an existing file"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return cls(path, writable=True, size=size)
+
+    @classmethod
+    def open(cls, path: Path) -> Framebuffer:
+        """an existing framebuffer to read from"""
+        return cls(path, writable=False)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self._size
+
+    @property
+    def _frame_bytes(self) -> int:
+        width, height = self._size
+        return (width + 7) // 8 * height
+
+    def write(self, image: Image.Image) -> int:
+        """copies the image into the file and returns its frame number"""
+        if image.size != self._size:
+            raise ValueError(f"frame of size {image.size} doesn't fit into the framebuffer of size {self._size}")
+        data = image.convert("1").tobytes()
+        self._sequence += 1
+        HEADER.pack_into(self._mmap, 0, FRAMEBUFFER_MAGIC, *self._size, self._sequence, time(), monotonic())
+        self._mmap[HEADER.size :] = data
+        self._sequence += 1
+        HEADER.pack_into(self._mmap, 0, FRAMEBUFFER_MAGIC, *self._size, self._sequence, time(), monotonic())
+        return self._sequence // 2
+
+    def read(self) -> FramebufferFrame:
+        for _ in range(FRAMEBUFFER_READ_ATTEMPTS):
+            *_, sequence, wall_time, monotonic_time = HEADER.unpack_from(self._mmap)
+            if sequence % 2:
+                os.sched_yield()
+                continue
+            data = self._mmap[HEADER.size :]
+            if HEADER.unpack_from(self._mmap)[3] == sequence:
+                image = Image.frombytes("1", self._size, data)
+                return FramebufferFrame(number=sequence // 2, time=wall_time, monotonic=monotonic_time, image=image)
+        raise TimeoutError(f"{self._path} didn't hold still for a whole frame")
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> Framebuffer:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtWidgets import QApplication, QLabel, QWidget
+
+from musicpi.hmi.framebuffer import FRAMEBUFFER_PATH, Framebuffer
+
+VIEWER_SCALE = 4  # screen pixels per display pixel
+VIEWER_POLL_INTERVAL = 20  # ms
+
+
+class FramebufferViewer(QLabel):
+    """shows the latest frame of a Framebuffer, scaled up without smoothing, as a stand-in for the oled"""
+
+    def __init__(self, framebuffer: Framebuffer, scale: int = VIEWER_SCALE, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self._framebuffer = framebuffer
+        self._number = -1
+        width, height = framebuffer.size
+        self.setFixedSize(width * scale, height * scale)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._poll)
+        self._timer.start(VIEWER_POLL_INTERVAL)
+
+    def _poll(self) -> None:
+        frame = self._framebuffer.read()
+        if frame.number == self._number:
+            return
+        self._number = frame.number
+        width, height = frame.image.size
+        # QImage's Format_Mono is packed like PIL's mode "1": eight pixels per byte, the leftmost in the top bit
+        image = QImage(frame.image.tobytes(), width, height, (width + 7) // 8, QImage.Format.Format_Mono)
+        image.setColorTable([0xFF000000, 0xFFFFFFFF])
+        self.setPixmap(QPixmap.fromImage(image).scaled(self.size()))
+        self.setToolTip(f"frame {frame.number}")
+
+
+def main() -> None:
+    """python -m musicpi.hmi.gui.view.framebuffer_viewer [path], while musicpi runs with HmiX86X64"""
+    app = QApplication(sys.argv)
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else FRAMEBUFFER_PATH
+    with Framebuffer.open(path) as framebuffer:
+        viewer = FramebufferViewer(framebuffer)
+        viewer.setWindowTitle(f"musicpi - {path}")
+        viewer.show()
+        app.exec()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,22 @@
 
-from PySide6.QtCore import QFile
+from typing import Optional
+
+from PySide6.QtCore import QFile, Qt
 from PySide6.QtUiTools import QUiLoader
-from PySide6.QtWidgets import QMainWindow, QWidget
+from PySide6.QtWidgets import QDockWidget, QMainWindow, QWidget
 
+from musicpi.hmi.framebuffer import Framebuffer
+from musicpi.hmi.gui.view.framebuffer_viewer import FramebufferViewer
 from resources import resources_rc  # needs to be here for self._load_ui(":/ui/main_window.ui") to work
 
 
 class MinimalGUIMainWindow(QMainWindow):
-    def __init__(self, parent: QWidget = None):
+    def __init__(self, parent: QWidget = None, framebuffer: Optional[Framebuffer] = None):
         super().__init__(parent=parent)
         self._ui = self._load_ui(":/ui/minimal_main_window.ui")
         self._init_gui()
+        if framebuffer is not None:
+            self._show_framebuffer(framebuffer)
 
     def _load_ui(self, resource_path: str) -> QWidget:
         loader = QUiLoader(self)
@@ -26,4 +32,10 @@ class MinimalGUIMainWindow(QMainWindow):
     def _init_gui(self) -> None:
         self.setWindowTitle(self._ui.windowTitle())
         self.resize(self._ui.size())
-        self.setWindowIcon(self._ui.windowIcon())
\ No newline at end of file
+        self.setWindowIcon(self._ui.windowIcon())
+
+    def _show_framebuffer(self, framebuffer: Framebuffer) -> None:
+        """the display of a musicpi running with HmiX86X64, docked next to the controls"""
+        dock = QDockWidget("display", self)
+        dock.setWidget(FramebufferViewer(framebuffer, parent=dock))
+        self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, dock)
@@ -5,6 +5,9 @@ class Hmi:
     def show_on_display(self, image: Image) -> None:
         raise RuntimeError("implement start-method in the respective hmi subclass!")
 
+    def invalidate_display(self) -> None:
+        """makes the next frame be sent completely, e.g. after a transfer failed halfway"""
+
     @property
     def display(self) -> ImageDraw.Draw:
         raise RuntimeError("implement start-method in the respective hmi subclass!")
@@ -1,21 +1,32 @@
-from luma.core.render import canvas
+from typing import Optional
+
 from PIL import Image, ImageDraw
 
-from musicpi.hardware.display import Display
+from musicpi.hardware.button_events import BUTTON_DEBOUNCE_TIME, BUTTON_LONG_PRESS_TIME
+from musicpi.hardware.display import Display, TransferStats
 from musicpi.hardware.pin_interface import Button, Led, RotaryEncoder
 from musicpi.hmi.hmi import Hmi
 
 
 class HmiArm(Hmi):
-    def __init__(self) -> None:
+    def __init__(self, cfg_hmi: Optional[dict] = None) -> None:
         self._button = Button()
+        cfg_buttons = (cfg_hmi or {}).get("buttons", {})
+        self._button.configure(
+            debounce=cfg_buttons.get("debounce", BUTTON_DEBOUNCE_TIME),
+            long_press=cfg_buttons.get("long_press", BUTTON_LONG_PRESS_TIME),
+        )
         self._led = Led()
         self._encoder = RotaryEncoder()
-        self._display = Display().dis
+        self._display = Display()
 
     @property
     def display(self) -> ImageDraw.Draw:
-        return self._display
+        return self._display.dis
+
+    @property
+    def display_transfer_stats(self) -> TransferStats:
+        return self._display.transfer_stats
 
     @property
     def led(self) -> Led:
@@ -30,5 +41,7 @@ class HmiArm(Hmi):
         return self._button
 
     def show_on_display(self, image: Image.Image) -> None:
-        with canvas(device=self._display, background=image) as display:
-            pass  # visualisation happens during __enter__
+        self._display.show(image)
+
+    def invalidate_display(self) -> None:
+        self._display.invalidate()
@@ -1,6 +1,59 @@
+import logging
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+from musicpi.hardware.button_events import BUTTON_DEBOUNCE_TIME, BUTTON_LONG_PRESS_TIME
+from musicpi.hardware.pin_interface import Button, Led, RotaryEncoder
+from musicpi.hmi.framebuffer import FRAMEBUFFER_PATH, Framebuffer
 from musicpi.hmi.hmi import Hmi
 
+LOG = logging.getLogger(__name__)
+
 
 class HmiX86X64(Hmi):
-    def __init__(self) -> None:
-        ...
+    """the pins of HmiArm on the RPi.GPIO mockup, with a memory-mapped framebuffer file instead of the oled
+
+    Other processes can watch the frames with a Framebuffer of the same file, e.g. the FramebufferViewer. With png_dump
+    set, every frame is saved to that directory as well, which is slow and meant for looking at single frames.
+    """
+
+    def __init__(self, cfg_hmi: Optional[dict] = None) -> None:
+        cfg_hmi = cfg_hmi or {}
+        self._button = Button()
+        cfg_buttons = cfg_hmi.get("buttons", {})
+        self._button.configure(
+            debounce=cfg_buttons.get("debounce", BUTTON_DEBOUNCE_TIME),
+            long_press=cfg_buttons.get("long_press", BUTTON_LONG_PRESS_TIME),
+        )
+        self._led = Led()
+        self._encoder = RotaryEncoder()
+        cfg_framebuffer = cfg_hmi.get("framebuffer", {})
+        self._framebuffer = Framebuffer.create(Path(cfg_framebuffer.get("path", FRAMEBUFFER_PATH)).expanduser())
+        LOG.info(f"showing frames in {self._framebuffer.path}")
+        png_dump = cfg_framebuffer.get("png_dump")
+        self._png_dump = Path(png_dump).expanduser() if png_dump else None
+        if self._png_dump is not None:
+            self._png_dump.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def framebuffer(self) -> Framebuffer:
+        return self._framebuffer
+
+    @property
+    def led(self) -> Led:
+        return self._led
+
+    @property
+    def encoder(self) -> RotaryEncoder:
+        return self._encoder
+
+    @property
+    def button(self) -> Button:
+        return self._button
+
+    def show_on_display(self, image: Image.Image) -> None:
+        number = self._framebuffer.write(image)
+        if self._png_dump is not None:
+            image.save(self._png_dump / f"frame_{number:06d}.png")
@@ -0,0 +1,17 @@
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image
+
+ICON_DIRECTORY = Path(__file__).parent / "icons"
+
+
+def icon(name: str) -> Image.Image:
+    """the icon from ICON_DIRECTORY in the display's 1-bit mode, loaded on first use rather than on import"""
+    return _load(ICON_DIRECTORY / f"{name}.png")
+
+
+@lru_cache(maxsize=None)
+def _load(path: Path) -> Image.Image:
+    with Image.open(path) as image:
+        return image.convert("1")
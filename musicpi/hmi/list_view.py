@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from typing import List, Optional, Protocol, Sequence
+
+from PIL import Image
+
+from musicpi.hmi.text_cache import DEFAULT_FONT, TextBitmapCache
+
+LOG = logging.getLogger(__name__)
+
+LIST_ROW_HEIGHT = 8  # eight rows on the 64px display
+LIST_FONT_SIZE = 8
+LIST_PREFETCH_PAGES = 1  # pages fetched ahead in both directions of the one the cursor is on
+LIST_CACHED_PAGES = 5
+
+
+class ListSource(Protocol):
+    """anything that can hand out a window of its items, e.g. a PrefixIndex of artists"""
+
+    def __len__(self) -> int: ...
+
+    def names(self, start: int = 0, stop: Optional[int] = None) -> List[str]: ...
+
+
+class SequenceSource:
+    """a ListSource for results that come as a whole anyway, like the few albums of an artist"""
+
+    def __init__(self, items: Sequence[str]) -> None:
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def names(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        return list(self._items[start:stop])
+
+
+class PageCache:
+    """LRU cache of page-sized windows of a ListSource"""
+
+    def __init__(self, source: ListSource, page_size: int, max_pages: int = LIST_CACHED_PAGES) -> None:
+        self._source = source
+        self._page_size = page_size
+        self._max_pages = max_pages
+        self._pages: OrderedDict[int, List[str]] = OrderedDict()
+        self.fetches = 0
+
+    def __len__(self) -> int:
+        return len(self._source)
+
+    def page(self, number: int) -> List[str]:
+        page = self._pages.get(number)
+        if page is not None:
+            self._pages.move_to_end(number)
+            return page
+        start = number * self._page_size
+        page = self._pages[number] = self._source.names(start, start + self._page_size)
+        self.fetches += 1
+        while len(self._pages) > self._max_pages:
+            self._pages.popitem(last=False)
+        return page
+
+    def items(self, start: int, stop: int) -> List[str]:
+        """the items in [start, stop), taken from the one or two pages they span"""
+        items: List[str] = []
+        for number in range(start // self._page_size, (stop - 1) // self._page_size + 1):
+            offset = number * self._page_size
+            items += self.page(number)[max(start - offset, 0) : stop - offset]
+        return items
+
+    def prefetch(self, number: int, pages: int) -> None:
+        last = (len(self._source) - 1) // self._page_size
+        for neighbour in range(max(number - pages, 0), min(number + pages, last) + 1):
+            if neighbour not in self._pages:
+                self.page(neighbour)
+        self.page(number)  # the one with the cursor is evicted last
+
+
+class ListView:
+    """a cursor over a ListSource that only fetches and draws the rows visible on the display
+
+    Items are fetched a page, i.e. a screen full of rows, at a time and the pages around the cursor are prefetched.
+    Moving the cursor therefore costs the same for ten and for a hundred thousand items. The window scrolls just far
+    enough to keep the cursor visible.
+    """
+
+    def __init__(
+        self,
+        source: ListSource,
+        text_cache: TextBitmapCache,
+        height: int = 64,
+        row_height: int = LIST_ROW_HEIGHT,
+        prefetch_pages: int = LIST_PREFETCH_PAGES,
+        cached_pages: int = LIST_CACHED_PAGES,
+    ) -> None:
+        self._text_cache = text_cache
+        self._row_height = row_height
+        self._rows = height // row_height
+        self._prefetch_pages = prefetch_pages
+        self._cached_pages = cached_pages
+        self._pages = PageCache(source, self._rows, cached_pages)
+        self._cursor = 0
+        self._top = 0
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    @property
+    def cursor(self) -> int:
+        return self._cursor
+
+    @property
+    def top(self) -> int:
+        """index of the item in the first row"""
+        return self._top
+
+    @property
+    def pages(self) -> PageCache:
+        return self._pages
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def set_source(self, source: ListSource) -> None:
+        """replaces the items, e.g. after the library got rebuilt, and keeps the cursor where possible"""
+        self._pages = PageCache(source, self._rows, self._cached_pages)
+        self.jump(self._cursor)
+
+    def move(self, delta: int) -> bool:
+        """moves the cursor by delta items, e.g. an EncoderDelta.delta, and returns whether it moved"""
+        return self.jump(self._cursor + delta)
+
+    def jump(self, index: int) -> bool:
+        index = max(0, min(index, len(self) - 1))
+        if index == self._cursor:
+            return False
+        self._cursor = index
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + self._rows:
+            self._top = index - self._rows + 1
+        self._pages.prefetch(index // self._rows, self._prefetch_pages)
+        return True
+
+    def selected(self) -> Optional[str]:
+        if not len(self):
+            return None
+        return self._pages.items(self._cursor, self._cursor + 1)[0]
+
+    def visible(self) -> List[str]:
+        if not len(self):
+            return []
+        return self._pages.items(self._top, min(self._top + self._rows, len(self)))
+
+    def draw(self, target: Image.Image) -> None:
+        """draws the visible rows, the one with the cursor inverted"""
+        for row, item in enumerate(self.visible()):
+            y = row * self._row_height
+            bitmap = self._text_cache.render(item, DEFAULT_FONT, LIST_FONT_SIZE)
+            # the font's first pixel row is empty and its descenders would reach into the next row
+            bitmap = bitmap.crop((0, 1, min(bitmap.width, target.width), self._row_height + 1))
+            if self._top + row == self._cursor:
+                target.paste(255, (0, y, target.width, y + self._row_height))
+                target.paste(0, (0, y), bitmap)
+            else:
+                target.paste(bitmap, (0, y), bitmap)
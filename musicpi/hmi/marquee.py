@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from musicpi.hmi.text_cache import TextBitmapCache
+
+MARQUEE_SPEED = 30.0  # pixels per second
+MARQUEE_GAP = 24  # pixels between the end of a text and its repetition
+MARQUEE_PAUSE = 1.5  # seconds the beginning of a text rests before every pass
+
+
+@dataclass(frozen=True)
+class _Slot:
+    text: str
+    strip: Image.Image  # the text twice, separated by the gap, or just the text if it fits
+    period: int  # pixels per pass, 0 if the text fits
+    since: float
+
+
+class Marquee:
+    """draws texts that are wider than the space right of their position as horizontally scrolling marquees
+
+    Each text is rasterised once into a wide 1-bit strip. Every frame only crops a window from it, so animating is as
+    cheap as pasting a cached bitmap. Each position remembers its text and restarts the animation when it changes.
+    """
+
+    def __init__(
+        self,
+        text_cache: TextBitmapCache,
+        speed: float = MARQUEE_SPEED,
+        gap: int = MARQUEE_GAP,
+        pause: float = MARQUEE_PAUSE,
+    ) -> None:
+        self._text_cache = text_cache
+        self._speed = speed
+        self._gap = gap
+        self._pause = pause
+        self._slots: Dict[Tuple[int, int], _Slot] = {}
+
+    def draw(self, target: Image.Image, xy: Tuple[int, int], text: str, now: Optional[float] = None) -> bool:
+        """returns whether the text scrolls, i.e. whether later frames will look different"""
+        now = monotonic() if now is None else now
+        width = target.width - xy[0]
+        slot = self._slots.get(xy)
+        if slot is None or slot.text != text:
+            slot = self._slots[xy] = self._slot(text, width, now)
+        if not slot.period:
+            target.paste(slot.strip, xy, slot.strip)
+            return False
+        elapsed = (now - slot.since) % (self._pause + slot.period / self._speed)
+        offset = int(max(0.0, elapsed - self._pause) * self._speed) % slot.period
+        window = slot.strip.crop((offset, 0, offset + width, slot.strip.height))
+        target.paste(window, xy, window)
+        return True
+
+    def _slot(self, text: str, width: int, now: float) -> _Slot:
+        bitmap = self._text_cache.render(text)
+        if bitmap.width <= width:
+            return _Slot(text=text, strip=bitmap, period=0, since=now)
+        period = bitmap.width + self._gap
+        strip = Image.new(mode="1", size=(period + bitmap.width, bitmap.height), color=0)
+        strip.paste(bitmap, (0, 0))
+        strip.paste(bitmap, (period, 0))
+        return _Slot(text=text, strip=strip, period=period, since=now)
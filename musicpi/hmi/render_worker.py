@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, replace
+from threading import Condition, Thread
+from time import monotonic
+from typing import Callable, Optional
+
+from PIL import Image
+
+from musicpi.probes import PROBES
+
+LOG = logging.getLogger(__name__)
+
+RENDER_MAX_FPS = 10.0
+
+
+@dataclass
+class RenderStats:
+    frames_shown: int = 0
+    frames_dropped: int = 0  # submitted, but replaced by a newer frame before they got shown
+    last_frame_time: float = 0.0
+    max_frame_time: float = 0.0
+    total_frame_time: float = 0.0
+
+    @property
+    def mean_frame_time(self) -> float:
+        return self.total_frame_time / self.frames_shown if self.frames_shown else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.frames_shown} frames shown, {self.frames_dropped} dropped, frame time "
+            f"{self.mean_frame_time * 1000:.1f}ms mean / {self.max_frame_time * 1000:.1f}ms max"
+        )
+
+
+class RenderWorker(Thread):
+    """owns the display and shows the latest submitted frame on it, at most max_fps times a second
+
+    submit() only fills the back buffer, a single slot, and never blocks. The worker swaps it to the front and shows
+    it. A frame that is still waiting in the slot when the next one is submitted is dropped.
+    """
+
+    def __init__(
+        self,
+        show: Callable[[Image.Image], None],
+        max_fps: float = RENDER_MAX_FPS,
+        on_first_frame: Optional[Callable[[], object]] = None,
+        on_error: Optional[Callable[[], object]] = None,
+    ) -> None:
+        super().__init__(name="render", daemon=True)
+        self._show = show
+        self._on_first_frame = on_first_frame
+        self._on_error = on_error  # called after show() failed, the display content is unknown then
+        self._min_interval = 1 / max_fps
+        self._back: Optional[Image.Image] = None
+        self._condition = Condition()
+        self._stop_requested = False
+        self._stats = RenderStats()
+
+    @property
+    def stats(self) -> RenderStats:
+        with self._condition:
+            return replace(self._stats)
+
+    def submit(self, frame: Image.Image) -> None:
+        with self._condition:
+            if self._back is not None:
+                self._stats.frames_dropped += 1
+            self._back = frame
+            self._condition.notify()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stop_requested = True
+            self._condition.notify()
+        self.join()
+
+    def run(self) -> None:
+        next_frame = monotonic()
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._stop_requested or self._back is not None)
+                while not self._stop_requested and monotonic() < next_frame:
+                    self._condition.wait(next_frame - monotonic())
+                if self._stop_requested:
+                    return
+                front, self._back = self._back, None
+            assert front is not None
+            start = monotonic()
+            try:
+                self._show(front)
+            except Exception as e:  # luma turns i2c errors into its own exceptions, one glitch mustn't end the worker
+                if isinstance(e, OSError):
+                    LOG.warning(f"Couldn't show frame: {e}")
+                else:
+                    LOG.exception("Couldn't show frame")
+                if self._on_error is not None:
+                    self._on_error()
+            frame_time = monotonic() - start
+            PROBES.record("render.transfer", frame_time)
+            next_frame = start + self._min_interval
+            with self._condition:
+                self._stats.frames_shown += 1
+                self._stats.last_frame_time = frame_time
+                self._stats.max_frame_time = max(self._stats.max_frame_time, frame_time)
+                self._stats.total_frame_time += frame_time
+                first_frame = self._stats.frames_shown == 1
+            if first_frame and self._on_first_frame is not None:
+                self._on_first_frame()
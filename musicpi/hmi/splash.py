@@ -0,0 +1,16 @@
+from typing import Tuple
+
+from PIL import Image, ImageDraw
+
+from musicpi.hmi.text_cache import DEFAULT_FONT, get_font
+
+SPLASH_SIZE = (128, 64)
+SPLASH_FONT_SIZE = 16
+
+
+def splash_frame(text: str = "musicpi", size: Tuple[int, int] = SPLASH_SIZE) -> Image.Image:
+    """the first frame after boot. Needs nothing but PIL, so it can be shown before the application is imported"""
+    frame = Image.new(mode="1", size=size, color=0)
+    draw = ImageDraw.Draw(frame)
+    draw.text((size[0] // 2, size[1] // 2), text, font=get_font(DEFAULT_FONT, SPLASH_FONT_SIZE), fill=1, anchor="mm")
+    return frame
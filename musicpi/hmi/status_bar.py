@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from musicpi.hmi.icons import icon
+from musicpi.hmi.text_cache import TextBitmapCache
+
+STATUS_BAR_SIZE = (128, 16)  # the bottom row of the song info page
+ICON_SIZE = 16
+
+StatusKey = Tuple[bool, bool, bool]  # playing, repeat, random
+
+
+class StatusBar:
+    """the play, repeat and random icons and the playlist position as one sprite
+
+    The icons are composited into a sprite per combination of the three flags, eight at
+    most. The sprite with the position text on it is kept as long as neither the flags nor the text change, so a frame
+    costs a single paste. Pixels that are off in the sprite are transparent, like with the separate icons and text.
+    """
+
+    def __init__(self, text_cache: TextBitmapCache) -> None:
+        self._text_cache = text_cache
+        self._icons: Dict[StatusKey, Image.Image] = {}
+        self._last: Optional[Tuple[StatusKey, str, Image.Image]] = None
+        self._lock = Lock()
+
+    @property
+    def combinations(self) -> int:
+        """icon sprites made so far"""
+        return len(self._icons)
+
+    def sprite(self, playing: bool, repeat: bool, random: bool, position: str) -> Image.Image:
+        key = (playing, repeat, random)
+        with self._lock:
+            if self._last is not None and self._last[:2] == (key, position):
+                return self._last[2]
+            sprite = self._icon_sprite(key).copy()
+            self._text_cache.draw(sprite, (3 * ICON_SIZE, 0), position)
+            self._last = (key, position, sprite)
+            return sprite
+
+    def draw(
+        self, target: Image.Image, xy: Tuple[int, int], playing: bool, repeat: bool, random: bool, position: str
+    ) -> None:
+        sprite = self.sprite(playing, repeat, random, position)
+        target.paste(sprite, xy, sprite)
+
+    def _icon_sprite(self, key: StatusKey) -> Image.Image:
+        sprite = self._icons.get(key)
+        if sprite is None:
+            playing, repeat, random = key
+            sprite = Image.new(mode="1", size=STATUS_BAR_SIZE, color=0)
+            names = [
+                "play" if playing else "pause",
+                "repeat" if repeat else "no_repeat",
+                "random" if random else "no_random",
+            ]
+            for n, name in enumerate(names):
+                sprite.paste(icon(name), (n * ICON_SIZE, 0))
+            self._icons[key] = sprite
+        return sprite
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_FONT = Path("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+DEFAULT_FONT_SIZE = 9
+TEXT_CACHE_MAX_BYTES = 32 * 1024
+
+CacheKey = Tuple[Path, int, str]
+
+
+@lru_cache(maxsize=None)
+def get_font(path: Path = DEFAULT_FONT, size: int = DEFAULT_FONT_SIZE) -> ImageFont.FreeTypeFont:
+    """loads every font/size combination only once per process"""
+    LOG.debug(f"loading font {path} in size {size}")
+    return ImageFont.truetype(str(path), size)
+
+
+def bitmap_size(bitmap: Image.Image) -> int:
+    width, height = bitmap.size
+    return (width + 7) // 8 * height
+
+
+@dataclass
+class CacheReport:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+    max_size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.1%} hit rate), {self.evictions} evictions, "
+            f"{self.entries} entries using {self.size}/{self.max_size} bytes"
+        )
+
+
+class TextBitmapCache:
+    """LRU cache of rasterised 1-bit text, bounded by the bytes the bitmaps occupy
+
+    A bitmap is positioned like ImageDraw.text would position the text, so drawing it at (x, y) is a paste at (x, y).
+    """
+
+    def __init__(self, max_size: int = TEXT_CACHE_MAX_BYTES) -> None:
+        self._max_size = max_size
+        self._bitmaps: OrderedDict[CacheKey, Image.Image] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = Lock()
+
+    def render(self, text: str, font: Path = DEFAULT_FONT, size: int = DEFAULT_FONT_SIZE) -> Image.Image:
+        key = (font, size, text)
+        with self._lock:
+            bitmap = self._bitmaps.get(key)
+            if bitmap is not None:
+                self._hits += 1
+                self._bitmaps.move_to_end(key)
+                return bitmap
+            self._misses += 1
+        bitmap = rasterise(text, get_font(font, size))
+        with self._lock:
+            self._store(key, bitmap)
+        return bitmap
+
+    def draw(
+        self,
+        target: Image.Image,
+        xy: Tuple[int, int],
+        text: str,
+        font: Path = DEFAULT_FONT,
+        size: int = DEFAULT_FONT_SIZE,
+    ) -> None:
+        bitmap = self.render(text, font, size)
+        target.paste(bitmap, xy, bitmap)
+
+    def report(self) -> CacheReport:
+        with self._lock:
+            return CacheReport(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._bitmaps),
+                size=self._size,
+                max_size=self._max_size,
+            )
+
+    def _store(self, key: CacheKey, bitmap: Image.Image) -> None:
+        if key in self._bitmaps:
+            return
+        self._bitmaps[key] = bitmap
+        self._size += bitmap_size(bitmap)
+        while self._size > self._max_size and len(self._bitmaps) > 1:
+            _, evicted = self._bitmaps.popitem(last=False)
+            self._size -= bitmap_size(evicted)
+            self._evictions += 1
+
+
+def rasterise(text: str, font: ImageFont.FreeTypeFont) -> Image.Image:
+    _, _, right, bottom = font.getbbox(text)
+    bitmap = Image.new(mode="1", size=(max(int(right), 1), max(int(bottom), 1)), color=0)
+    ImageDraw.Draw(bitmap).text((0, 0), text, fill="white", font=font)
+    return bitmap
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import logging
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from threading import Event, Lock, Thread
+from time import perf_counter
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from mpd import MPDError
+
+if TYPE_CHECKING:
+    from musicpi.library_cache import LibraryCache
+    from musicpi.mpd_wrapper import MpdWrapper
+
+LOG = logging.getLogger(__name__)
+
+LIBRARY_SCAN_PAGE_SIZE = 1000
+
+TagValue = Union[str, List[str]]
+
+
+@dataclass(frozen=True)
+class Track:
+    file: str
+    title: str
+    artists: Tuple[str, ...]
+    albumartists: Tuple[str, ...]
+    album: str
+    track: int
+    date: str
+
+    @classmethod
+    def from_dict(cls, song: Dict[str, TagValue]) -> Track:
+        artists = _all(song.get("artist", ""))
+        return cls(
+            file=_first(song.get("file", "")),
+            title=_first(song.get("title", "")),
+            artists=artists,
+            # like mpd's albumartist queries, songs without the tag count as albums of their artists
+            albumartists=_all(song["albumartist"]) if "albumartist" in song else artists,
+            album=_first(song.get("album", "")),
+            track=_track_number(_first(song.get("track", ""))),
+            date=_first(song.get("date", "")),
+        )
+
+
+def fold(text: str) -> str:
+    """case-folded and stripped of diacritics, so 'Ärzte', 'arzte' and 'ARZTE' sort and match alike"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+@dataclass(frozen=True)
+class PrefixMatch:
+    offset: int  # position of the first match, or where it would be if there is none
+    count: int
+
+
+class PrefixIndex:
+    """names sorted by their folded form, answering prefix queries with two bisections"""
+
+    def __init__(self, names: Iterable[str]) -> None:
+        entries = sorted((fold(name), name) for name in set(names) if name)
+        self._keys = [key for key, _ in entries]
+        self._names = [name for _, name in entries]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def names(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        return self._names[start:stop]
+
+    def match(self, prefix: str) -> PrefixMatch:
+        key = fold(prefix)
+        first = bisect_left(self._keys, key)
+        return PrefixMatch(offset=first, count=bisect_left(self._keys, key + "\U0010ffff", lo=first) - first)
+
+    def startswith(self, prefix: str) -> List[str]:
+        m = self.match(prefix)
+        return self._names[m.offset : m.offset + m.count]
+
+    def jump_to(self, prefix: str) -> int:
+        """offset of the first name matching prefix or, if there is none, of the one following it"""
+        return min(bisect_left(self._keys, fold(prefix)), max(len(self._keys) - 1, 0))
+
+
+class LibraryIndex:
+    """artist -> albums -> tracks, answering the same questions as Mpd's list queries from memory"""
+
+    def __init__(self, tracks: Iterable[Track], db_update: int) -> None:
+        self._db_update = db_update
+        self._tracks = list(tracks)
+        self._tracks_by_artist: Dict[str, List[Track]] = {}
+        self._tracks_by_albumartist: Dict[str, List[Track]] = {}
+        for track in self._tracks:
+            for artist in track.artists:
+                self._tracks_by_artist.setdefault(artist, []).append(track)
+            for albumartist in track.albumartists:
+                self._tracks_by_albumartist.setdefault(albumartist, []).append(track)
+        self._artists = PrefixIndex(self._tracks_by_artist)
+
+    @property
+    def db_update(self) -> int:
+        return self._db_update
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def tracks(self) -> List[Track]:
+        return list(self._tracks)
+
+    def artists(self) -> List[str]:
+        return self._artists.names()
+
+    @property
+    def artist_prefixes(self) -> PrefixIndex:
+        return self._artists
+
+    def albums_of_artist(self, artist: str) -> List[str]:
+        albums: Dict[str, str] = {}
+        for track in self._tracks_by_albumartist.get(artist, []):
+            albums.setdefault(track.album, track.date)
+        return [album for album, _ in sorted(albums.items(), key=lambda item: (item[1], item[0]))]
+
+    def tracks_of_album_of_artist(self, artist: str, album: str) -> List[str]:
+        tracks = [t for t in self._tracks_by_artist.get(artist, []) if t.album == album]
+        return _unique(t.title for t in sorted(tracks, key=lambda t: (t.track, t.title)))
+
+    def tracks_of_artist(self, artist: str) -> List[str]:
+        return sorted({t.title for t in self._tracks_by_artist.get(artist, []) if t.title})
+
+    def files(self, artist: str, album: Optional[str] = None, title: Optional[str] = None) -> List[str]:
+        return [
+            t.file
+            for t in self._tracks_by_artist.get(artist, [])
+            if (not album or t.album == album) and (not title or t.title == title)
+        ]
+
+
+class Library:
+    """holds the current LibraryIndex and rebuilds it in a background thread once db_update changes
+
+    The mpd_wrapper should be a dedicated one, so the scan doesn't compete with the ui for the connection. With a
+    cache, the last index is available right from the start and every rebuilt index is written back to it.
+    """
+
+    def __init__(self, mpd_wrapper: MpdWrapper, cache: Optional[LibraryCache] = None) -> None:
+        self._mpd_wrapper = mpd_wrapper
+        self._cache = cache
+        self._index: Optional[LibraryIndex] = cache.load() if cache is not None else None
+        self._building: Optional[int] = None
+        self._pending: Optional[int] = None
+        self._lock = Lock()
+        self._built = Event()
+
+    @property
+    def index(self) -> Optional[LibraryIndex]:
+        return self._index
+
+    def refresh(self, db_update: int) -> None:
+        """starts a rebuild unless the index already matches db_update. Runs at most one rebuild at a time."""
+        with self._lock:
+            current = self._index.db_update if self._index is not None else None
+            if db_update in (current, self._building):
+                self._pending = None
+            elif self._building is not None:
+                self._pending = db_update
+            else:
+                self._start_build(db_update)
+
+    def wait_until_built(self, timeout: Optional[float] = None) -> bool:
+        return self._built.wait(timeout)
+
+    def _start_build(self, db_update: int) -> None:
+        self._building = db_update
+        self._pending = None
+        self._built.clear()
+        Thread(target=self._build, args=(db_update,), name="library-index", daemon=True).start()
+
+    def _build(self, db_update: int) -> None:
+        """scans the library into a new index. Whatever goes wrong, the next db_update can start another build."""
+        start = perf_counter()
+        index: Optional[LibraryIndex] = None
+        try:
+            index = LibraryIndex((Track.from_dict(s) for s in self._scan()), db_update)
+            if self._cache is not None:
+                self._cache.save(index)
+        except (MPDError, OSError) as e:
+            LOG.warning(f"Couldn't build library index: {e}")
+        except Exception:
+            LOG.exception("Couldn't build library index")
+        finally:
+            self._mpd_wrapper.disconnect()
+            with self._lock:
+                if index is not None:
+                    self._index = index
+                    LOG.info(f"indexed {len(index)} tracks (db_update {db_update}) in {perf_counter() - start:.2f}s")
+                self._building = None
+                if self._pending is not None:
+                    self._start_build(self._pending)
+                else:
+                    self._built.set()
+
+    def _scan(self) -> Iterator[Dict[str, TagValue]]:
+        """pages through the database, releasing the connection in between, so no response gets huge"""
+        start = 0
+        while True:
+            with self._mpd_wrapper as client:
+                songs = client.search("file", "", "window", (start, start + LIBRARY_SCAN_PAGE_SIZE))
+            yield from songs
+            if len(songs) < LIBRARY_SCAN_PAGE_SIZE:
+                return
+            start += LIBRARY_SCAN_PAGE_SIZE
+
+
+def _first(value: TagValue) -> str:
+    return value[0] if isinstance(value, list) else value
+
+
+def _all(value: TagValue) -> Tuple[str, ...]:
+    return tuple(value) if isinstance(value, list) else (value,)
+
+
+def _track_number(value: str) -> int:
+    try:
+        return int(value.split("/")[0])
+    except ValueError:
+        return 0
+
+
+def _unique(values: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(v for v in values if v))
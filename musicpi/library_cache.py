@@ -0,0 +1,106 @@
+import logging
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Iterator, Optional
+
+from musicpi.library import LibraryIndex, Track
+
+LOG = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2  # 2: albumartists fall back to the artists
+TAG_SEPARATOR = "\x1f"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS tracks (
+    file TEXT NOT NULL,
+    title TEXT NOT NULL,
+    artists TEXT NOT NULL,
+    albumartists TEXT NOT NULL,
+    album TEXT NOT NULL,
+    track INTEGER NOT NULL,
+    date TEXT NOT NULL
+);
+"""
+
+
+class LibraryCache:
+    """persists a LibraryIndex in an sqlite file, tagged with the db_update it was built for"""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> Optional[LibraryIndex]:
+        if not self._path.is_file():
+            return None
+        start = perf_counter()
+        try:
+            with self._connect() as connection:
+                meta = dict(connection.execute("SELECT key, value FROM meta"))
+                if meta.get("schema_version") != SCHEMA_VERSION or "db_update" not in meta:
+                    return None
+                rows = connection.execute(
+                    "SELECT file, title, artists, albumartists, album, track, date FROM tracks ORDER BY rowid"
+                )
+                index = LibraryIndex((_track(*row) for row in rows), db_update=meta["db_update"])
+        except sqlite3.Error as e:
+            LOG.warning(f"Ignoring unreadable library cache {self._path}: {e}")
+            return None
+        LOG.info(f"loaded {len(index)} tracks from {self._path} in {perf_counter() - start:.2f}s")
+        return index
+
+    def save(self, index: LibraryIndex) -> None:
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as connection:
+                connection.execute("DELETE FROM tracks")
+                connection.executemany(
+                    "INSERT INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            t.file,
+                            t.title,
+                            TAG_SEPARATOR.join(t.artists),
+                            TAG_SEPARATOR.join(t.albumartists),
+                            t.album,
+                            t.track,
+                            t.date,
+                        )
+                        for t in index.tracks()
+                    ),
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                    [("schema_version", SCHEMA_VERSION), ("db_update", index.db_update)],
+                )
+        except (sqlite3.Error, OSError) as e:
+            LOG.warning(f"Couldn't write library cache {self._path}: {e}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """yields a connection inside a transaction and closes it afterwards"""
+        connection = sqlite3.connect(str(self._path))
+        try:
+            connection.executescript(SCHEMA)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+
+def _track(file: str, title: str, artists: str, albumartists: str, album: str, track: int, date: str) -> Track:
+    return Track(
+        file=file,
+        title=title,
+        artists=tuple(artists.split(TAG_SEPARATOR)),
+        albumartists=tuple(albumartists.split(TAG_SEPARATOR)),
+        album=album,
+        track=track,
+        date=date,
+    )
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Set
+
+from mpd import ConnectionError
+
+from musicpi.mpd_async import AsyncMpd
+from musicpi.musicpi_application import LOOP_INTERVAL, Menu, MusicPi
+
+LOG = logging.getLogger(__name__)
+
+
+class AsyncioMainloop:
+    """input, rendering and mpd i/o of a MusicPi as concurrent tasks, so a slow mpd call never delays reading the button
+
+    The display transfer itself happens on the render worker's thread. MusicPi imports this module only when the
+    asyncio mainloop is configured.
+    """
+
+    def __init__(self, music_pi: MusicPi) -> None:
+        self._music_pi = music_pi
+
+    def run(self) -> None:
+        """returns once MusicPi.stop() was called"""
+        asyncio.run(self._run())
+
+    async def _run(self) -> None:
+        music_pi = self._music_pi
+        mpd = AsyncMpd(music_pi.cfg.get("mpd", {}))
+        menu = Menu()
+        redraw = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        music_pi.cover_art_ready = lambda: loop.call_soon_threadsafe(music_pi.repaint, menu)
+        tasks = [
+            asyncio.ensure_future(coroutine)
+            for coroutine in (
+                self._watch_mpd(mpd, redraw),
+                self._read_input(mpd, menu, redraw),
+                self._render(mpd, menu, redraw),
+                self._wait_for_stop(),
+            )
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            mpd.disconnect()
+
+    async def _wait_for_stop(self) -> None:
+        while not self._music_pi.stop_requested.is_set():
+            await asyncio.sleep(LOOP_INTERVAL)
+
+    async def _watch_mpd(self, mpd: AsyncMpd, redraw: asyncio.Event) -> None:
+        async for changed in mpd.idle():
+            if "database" in changed:
+                await asyncio.get_running_loop().run_in_executor(None, self._music_pi.mpd.refresh_library)
+            redraw.set()
+
+    async def _read_input(self, mpd: AsyncMpd, menu: Menu, redraw: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        commands: Set["asyncio.Task[None]"] = set()
+        while True:
+            user_input = await loop.run_in_executor(None, self._music_pi.take_input_events, LOOP_INTERVAL)
+            for event in user_input:
+                if self._music_pi.toggles_playback(event):
+                    command = asyncio.ensure_future(self._send_command(mpd.pause_play(), redraw))
+                    commands.add(command)
+                    command.add_done_callback(commands.discard)
+            if user_input:
+                self._music_pi.navigate(menu, user_input)
+                redraw.set()
+
+    @staticmethod
+    async def _send_command(command: Awaitable[None], redraw: asyncio.Event) -> None:
+        try:
+            await command
+        except (ConnectionError, OSError, asyncio.TimeoutError) as e:
+            LOG.warning(f"mpd command failed: {e}")
+        redraw.set()
+
+    async def _render(self, mpd: AsyncMpd, menu: Menu, redraw: asyncio.Event) -> None:
+        music_pi = self._music_pi
+        while True:
+            try:
+                await asyncio.wait_for(redraw.wait(), music_pi.frame_interval if music_pi.animating else None)
+            except asyncio.TimeoutError:
+                if music_pi.needs_resync():
+                    redraw.set()
+                else:
+                    music_pi.animate(menu)
+                continue
+            redraw.clear()
+            try:
+                snapshot = await mpd.snapshot()
+            except (ConnectionError, OSError, asyncio.TimeoutError) as e:
+                LOG.warning(f"Couldn't fetch mpd status: {e}")
+                continue
+            music_pi.show(menu, snapshot)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Iterable, List, Optional
+
+from mpd import ConnectionError
+from mpd.asyncio import MPDClient as AsyncMPDClient
+
+from musicpi.library import PrefixIndex
+from musicpi.mpd_idle import IDLE_RECONNECT_DELAY, IDLE_SUBSYSTEMS
+from musicpi.mpd_wrapper import ConnectionParams, Mpd, PlayerSnapshot, SongInfo, Stats, Status, Transport
+from musicpi.probes import PROBES
+
+LOG = logging.getLogger(__name__)
+
+
+class AsyncMpd:
+    """asyncio counterpart of Mpd, built on python-mpd2's asyncio client
+
+    Every call is bounded by a timeout, which defaults to the connection timeout and can be overridden per call. On
+    timeout or cancellation only the waiting caller gives up; the client still reads the late response off the
+    connection and discards it, so the connection stays usable. Calls issued concurrently are pipelined over the same
+    connection. A broken connection is re-established and the call retried once.
+    """
+
+    def __init__(self, cfg_mpd: dict) -> None:
+        self._conn_params = ConnectionParams.from_cfg(cfg_mpd)
+        self._client = AsyncMPDClient()
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._transport: Optional[Transport] = None
+
+    @property
+    def connected(self) -> bool:
+        return bool(self._client.connected)
+
+    @property
+    def transport(self) -> Optional[Transport]:
+        """the transport of the current or most recent connection"""
+        return self._transport
+
+    async def connect(self) -> None:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if not self.connected:
+                self._transport = await asyncio.wait_for(
+                    self._connect_preferring_unix_socket(), self._conn_params.timeout
+                )
+
+    async def _connect_preferring_unix_socket(self) -> Transport:
+        mpd_socket = self._conn_params.socket
+        if mpd_socket.is_socket():
+            try:
+                await self._client.connect(str(mpd_socket))
+            except OSError as e:
+                LOG.warning(f"Couldn't connect to mpd via {mpd_socket} ({e}). Falling back to tcp")
+            else:
+                LOG.info(f"Connected to mpd via unix socket {mpd_socket}")
+                return Transport.UNIX
+        await self._client.connect(self._conn_params.host, self._conn_params.port)
+        LOG.info(f"Connected to mpd via tcp on {self._conn_params.host}:{self._conn_params.port}")
+        return Transport.TCP
+
+    def disconnect(self) -> None:
+        self._client.disconnect()
+
+    async def execute(self, command: str, *args: Any, timeout: Optional[float] = None, retry: bool = True) -> Any:
+        """sends any mpd command, raising asyncio.TimeoutError if there is no response within timeout seconds
+
+        A broken connection is retried once on a new one, unless retry is off for commands that mustn't run twice.
+        """
+        for attempt in range(2 if retry else 1):
+            if not self.connected:
+                await self.connect()
+            try:
+                with PROBES.measure(f"mpd.async.{command}"):
+                    return await asyncio.wait_for(
+                        _awaited(getattr(self._client, command)(*args)),
+                        timeout if timeout is not None else self._conn_params.timeout,
+                    )
+            except asyncio.TimeoutError:  # an OSError since python 3.11, but the connection is fine
+                raise
+            except (ConnectionError, OSError) as e:
+                self.disconnect()
+                if attempt or not retry:
+                    raise
+                LOG.info(f"{command} lost the mpd connection ({e}). Retrying once")
+        raise AssertionError("unreachable")
+
+    async def stats(self, timeout: Optional[float] = None) -> Stats:
+        return Stats.from_dict(await self.execute("stats", timeout=timeout))
+
+    async def status(self, timeout: Optional[float] = None) -> Status:
+        return Status.from_dict(await self.execute("status", timeout=timeout))
+
+    async def current_song(self, timeout: Optional[float] = None) -> SongInfo:
+        return SongInfo.from_dict(await self.execute("currentsong", timeout=timeout))
+
+    async def snapshot(self, with_stats: bool = False, timeout: Optional[float] = None) -> PlayerSnapshot:
+        """fetches status, current song and optionally stats with pipelined requests, i.e. in one round trip"""
+        commands = ["status", "currentsong"] + (["stats"] if with_stats else [])
+        results = await asyncio.gather(*(self.execute(command, timeout=timeout) for command in commands))
+        return PlayerSnapshot(
+            status=Status.from_dict(results[0]),
+            song_info=SongInfo.from_dict(results[1]),
+            stats=Stats.from_dict(results[2]) if with_stats else None,
+        )
+
+    async def resume(self, timeout: Optional[float] = None) -> None:
+        await self.execute("pause", "0", timeout=timeout)
+
+    async def pause(self, timeout: Optional[float] = None) -> None:
+        await self.execute("pause", "1", timeout=timeout)
+
+    async def pause_play(self, timeout: Optional[float] = None) -> None:
+        if (await self.status(timeout=timeout)).playing:
+            await self.pause(timeout=timeout)
+        else:
+            await self.resume(timeout=timeout)
+
+    async def update(self, timeout: Optional[float] = None) -> int:
+        return int(await self.execute("update", timeout=timeout))
+
+    async def get_artists(self, timeout: Optional[float] = None) -> List[str]:
+        """all artists, sorted case and diacritics insensitive like Mpd.get_artists"""
+        artists = await self.execute("list", "artist", timeout=timeout)
+        return PrefixIndex(item["artist"] for item in artists).names()
+
+    async def get_albums_of_artist(self, artist: str, timeout: Optional[float] = None) -> List[str]:
+        albums = await self.execute("list", "album", "albumartist", artist, "group", "date", timeout=timeout)
+        return Mpd.flatten_list([item["album"] for item in albums])
+
+    async def get_track_of_album_of_artist(self, artist: str, album: str, timeout: Optional[float] = None) -> List[str]:
+        tracks = await self.execute(
+            "list", "title", "artist", artist, "album", album, "group", "track", timeout=timeout
+        )
+        return Mpd.flatten_list([item["title"] for item in tracks])
+
+    async def get_tracks_of_artist(self, artist: str, timeout: Optional[float] = None) -> List[str]:
+        return [
+            t["title"] for t in await self.execute("list", "title", "artist", artist, timeout=timeout) if t["title"]
+        ]
+
+    async def add_tracks(
+        self, artist: str, album: Optional[str] = None, track: Optional[str] = None, timeout: Optional[float] = None
+    ) -> None:
+        await self.execute("findadd", *Mpd.find_filters(artist, album, track), timeout=timeout, retry=False)
+
+    async def search_add(self, query: str, tag: str = "any", timeout: Optional[float] = None) -> None:
+        await self.execute("searchadd", tag, query, timeout=timeout, retry=False)
+
+    async def idle(self, subsystems: Iterable[str] = IDLE_SUBSYSTEMS) -> AsyncIterator[List[str]]:
+        """yields the changed subsystems like IdleListener, including all of them after every (re-)connect"""
+        subscribed = list(subsystems)
+        while True:
+            try:
+                if not self.connected:
+                    await self.connect()
+                yield subscribed
+                async for changed in self._client.idle(subscribed):
+                    yield list(changed)
+            except (ConnectionError, OSError, asyncio.TimeoutError) as e:
+                LOG.warning(f"mpd idle connection lost ({e}). Reconnecting in {IDLE_RECONNECT_DELAY}s")
+                self.disconnect()
+                await asyncio.sleep(IDLE_RECONNECT_DELAY)
+
+
+async def _awaited(result: Awaitable[Any]) -> Any:
+    """the client returns futures whose results only get fed once they're awaited, so wait_for must not wrap them"""
+    return await result
@@ -0,0 +1,73 @@
+import logging
+from queue import Queue
+from threading import Event, Thread
+from typing import Iterable, Optional, Tuple
+
+from mpd import MPDError
+
+from musicpi.mpd_wrapper import MpdWrapper
+
+LOG = logging.getLogger(__name__)
+
+IDLE_SUBSYSTEMS = ("player", "mixer", "options", "playlist", "database")
+IDLE_RECONNECT_DELAY = 1.0
+IDLE_STOP_TIMEOUT = 2.0  # seconds stop() waits for the thread to end
+
+
+class IdleListener(Thread):
+    """blocks on mpd's idle command on a dedicated connection and puts every changed subsystem into a queue
+
+    Right after (re-)connecting, all subscribed subsystems are reported as changed, since changes that happened while
+    the connection was down would go unnoticed otherwise. wakeup, if given, is set after every report.
+    """
+
+    def __init__(
+        self,
+        cfg_mpd: dict,
+        events: "Queue[str]",
+        subsystems: Iterable[str] = IDLE_SUBSYSTEMS,
+        wakeup: Optional[Event] = None,
+    ) -> None:
+        super().__init__(name="mpd-idle", daemon=True)
+        self._mpd_wrapper = MpdWrapper(cfg_mpd=cfg_mpd)
+        self._events = events
+        self._wakeup = wakeup
+        self._subsystems: Tuple[str, ...] = tuple(subsystems)
+        self._stop_requested = Event()
+
+    def run(self) -> None:
+        while not self._stop_requested.is_set():
+            try:
+                self._listen()
+            except (MPDError, OSError) as e:
+                if self._stop_requested.is_set():
+                    break
+                LOG.warning(f"mpd idle connection lost ({e}). Reconnecting in {IDLE_RECONNECT_DELAY}s")
+                self._stop_requested.wait(IDLE_RECONNECT_DELAY)
+        self._mpd_wrapper.disconnect()
+
+    def stop(self) -> None:
+        self._stop_requested.set()
+        self._mpd_wrapper.interrupt()
+        self.join(timeout=IDLE_STOP_TIMEOUT)
+        if self.is_alive():
+            LOG.warning(f"mpd idle listener didn't stop within {IDLE_STOP_TIMEOUT}s")
+
+    def _listen(self) -> None:
+        resync = not self._mpd_wrapper.connected
+        while not self._stop_requested.is_set():
+            with self._mpd_wrapper as client:
+                if resync:
+                    self._publish(self._subsystems)
+                    resync = False
+                if self._stop_requested.is_set():  # stop() may have come before the socket it interrupts existed
+                    return
+                changed = client.idle(*self._subsystems)
+            self._publish(changed)
+
+    def _publish(self, subsystems: Iterable[str]) -> None:
+        for subsystem in subsystems:
+            LOG.debug(f"mpd reports change in {subsystem}")
+            self._events.put(subsystem)
+        if self._wakeup is not None:
+            self._wakeup.set()
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import logging
+import os
 import socket
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import wraps
 from pathlib import Path
-from time import sleep
+from threading import RLock
+from time import monotonic, sleep
 from types import TracebackType
-from typing import List, Optional, Type, Union
+from typing import Any, Callable, List, Optional, Sequence, Type, TypeVar, Union, cast
 
-from mpd import ConnectionError, MPDClient
+from mpd import CommandError, ConnectionError, MPDClient
+
+from musicpi.library import Library, LibraryIndex, PrefixIndex, PrefixMatch
+from musicpi.library_cache import LibraryCache
+from musicpi.probes import PROBES
 
 LOG = logging.getLogger(__name__)
 
@@ -17,6 +25,11 @@ MPD_DEFAULT_HOST = "localhost"
 MPD_DEFAULT_PORT = 6600
 MPD_DEFAULT_SOCKET = Path("/var/run/mpd/socket")
 MPD_DEFAULT_TIMEOUT = 10
+MPD_KEEPALIVE_INTERVAL = 30  # mpd drops idle clients after its connection_timeout (60s by default)
+LIBRARY_CHECK_INTERVAL = 10  # how often Stats.db_update is compared against the library index at most
+ADD_BATCH_SIZE = 1000  # adds per command list, far below the 2 MiB max_command_list_size of mpd
+
+F = TypeVar("F", bound=Callable[..., Any])
 
 
 @dataclass
@@ -34,10 +47,16 @@ class ConnectionParams:
                 setattr(c, param, cfg_mpd[param])
             except KeyError:
                 print(f"MPD connection parameter {param} not in config file. Defaulting to {getattr(cls, param)}")
+        c.socket = Path(c.socket)
         return c
 
 
-@dataclass
+class Transport(Enum):
+    UNIX = "unix socket"
+    TCP = "tcp"
+
+
+@dataclass(frozen=True)
 class Stats:
     uptime: int
     playtime: int
@@ -49,7 +68,10 @@ class Stats:
 
     @classmethod
     def from_client(cls, client: MPDClient) -> Stats:
-        stats = client.stats()
+        return cls.from_dict(client.stats())
+
+    @classmethod
+    def from_dict(cls, stats: dict) -> Stats:
         return cls(
             uptime=int(stats["uptime"]),
             playtime=int(stats["playtime"]),
@@ -61,7 +83,7 @@ class Stats:
         )
 
 
-@dataclass
+@dataclass(frozen=True)
 class Status:
     volume: int
     repeat: bool
@@ -73,10 +95,24 @@ class Status:
     mixrampdb: float
     state: str
     playing: bool
+    elapsed: float = 0.0  # seconds into the current song when the status was fetched
+    duration: float = 0.0
+    timestamp: float = field(default=0.0, compare=False)  # time.monotonic() when the status was fetched
 
     @classmethod
     def from_client(cls, client: MPDClient) -> Status:
-        status = client.status()
+        return cls.from_dict(client.status())
+
+    def position(self, now: Optional[float] = None) -> float:
+        """elapsed seconds extrapolated to now while playing, so showing the progress needs no further status"""
+        if not self.playing:
+            return self.elapsed
+        now = monotonic() if now is None else now
+        position = self.elapsed + max(0.0, now - self.timestamp)
+        return min(position, self.duration) if self.duration else position
+
+    @classmethod
+    def from_dict(cls, status: dict) -> Status:
         return cls(
             volume=int(status.get("volume", 0)),
             repeat=bool(status["repeat"] == "1"),
@@ -88,10 +124,13 @@ class Status:
             mixrampdb=float(status["mixrampdb"]),
             state=str(status["state"]),
             playing=status["state"] == "play",
+            elapsed=float(status.get("elapsed", 0)),
+            duration=float(status.get("duration", 0)),
+            timestamp=monotonic(),
         )
 
 
-@dataclass
+@dataclass(frozen=True)
 class SongInfo:
     file: Path
     album: str
@@ -106,7 +145,10 @@ class SongInfo:
 
     @classmethod
     def from_client(cls, client: MPDClient) -> SongInfo:
-        song_info: dict = client.currentsong()
+        return cls.from_dict(client.currentsong())
+
+    @classmethod
+    def from_dict(cls, song_info: dict) -> SongInfo:
         return cls(
             file=Path(song_info.get("file", ".")),
             album=song_info.get("album", ""),
@@ -121,6 +163,13 @@ class SongInfo:
         )
 
 
+@dataclass(frozen=True)
+class PlayerSnapshot:
+    status: Status
+    song_info: SongInfo
+    stats: Optional[Stats] = None
+
+
 def setup_client(conn_params: ConnectionParams) -> MPDClient:
     client = MPDClient()
     client.timeout = conn_params.timeout
@@ -128,56 +177,184 @@ def setup_client(conn_params: ConnectionParams) -> MPDClient:
 
 
 class MpdWrapper:
+    """keeps one connection to mpd open and hands it out to one user at a time
+
+    The connection is checked with a ping if it was idle for longer than MPD_KEEPALIVE_INTERVAL. If anything but an
+    mpd CommandError escapes the with-block, the connection is dropped and re-established on the next use.
+    """
+
     def __init__(self, cfg_mpd: dict):
         self._conn_params = ConnectionParams.from_cfg(cfg_mpd)
         self._client: MPDClient = setup_client(self._conn_params)
+        self._lock = RLock()
+        self._connected = False
+        self._last_used = 0.0
+        self._transport: Optional[Transport] = None
 
     def __enter__(self) -> MPDClient:
-        self.connect()
+        self._lock.acquire()
+        try:
+            self._ensure_connection()
+        except BaseException:
+            self._lock.release()
+            raise
         return self._client
 
     def __exit__(
         self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException], exc_tb: Optional[TracebackType]
     ) -> None:
-        self._client.close()
-        self._client.disconnect()
+        try:
+            if exc_type is None or issubclass(exc_type, CommandError):
+                self._last_used = monotonic()
+            else:
+                LOG.warning(f"Dropping mpd connection after {exc_type.__name__}: {exc_val}")
+                self.disconnect()
+        finally:
+            self._lock.release()
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    @property
+    def transport(self) -> Optional[Transport]:
+        """the transport of the current or most recent connection"""
+        return self._transport
 
     def connect(self) -> None:
         try:
-            self._client.connect(host=self._conn_params.host, port=self._conn_params.port)
+            self._transport = self._connect_preferring_unix_socket()
         except socket.timeout:
             LOG.warning("Couldn't connect to mpd. Retrying in 1s")
             sleep(1)
             self.connect()
+        else:
+            self._connected = True
+            self._last_used = monotonic()
+
+    def _connect_preferring_unix_socket(self) -> Transport:
+        mpd_socket = self._conn_params.socket
+        if mpd_socket.is_socket():
+            try:
+                self._client.connect(host=str(mpd_socket))
+            except OSError as e:
+                LOG.warning(f"Couldn't connect to mpd via {mpd_socket} ({e}). Falling back to tcp")
+            else:
+                LOG.info(f"Connected to mpd via unix socket {mpd_socket}")
+                return Transport.UNIX
+        self._client.connect(host=self._conn_params.host, port=self._conn_params.port)
+        LOG.info(f"Connected to mpd via tcp on {self._conn_params.host}:{self._conn_params.port}")
+        return Transport.TCP
+
+    def disconnect(self) -> None:
+        with self._lock:
+            if self._connected:
+                try:
+                    self._client.close()
+                except (ConnectionError, OSError):
+                    pass
+            self._client.disconnect()
+            self._connected = False
+
+    def interrupt(self) -> None:
+        """shuts the socket down from another thread, e.g. to unblock a pending idle. Doesn't take the lock."""
+        try:
+            with socket.socket(fileno=os.dup(self._client.fileno())) as sock:
+                sock.shutdown(socket.SHUT_RDWR)
+        except (ConnectionError, OSError):
+            pass
+
+    def _ensure_connection(self) -> None:
+        if not self._connected:
+            self.connect()
+        elif monotonic() - self._last_used > MPD_KEEPALIVE_INTERVAL:
+            try:
+                self._client.ping()
+            except (ConnectionError, OSError):
+                LOG.info("mpd connection went stale. Reconnecting")
+                self.disconnect()
+                self.connect()
+
+
+def reconnecting(method: F) -> F:
+    """retries an Mpd method once on a fresh connection if the current one broke down underneath it. Both attempts
+    together are timed by the probe mpd.<method>"""
+    probe = f"mpd.{method.__name__.lstrip('_')}"
+
+    @wraps(method)
+    def wrapper(self: Mpd, *args: Any, **kwargs: Any) -> Any:
+        with PROBES.measure(probe):
+            try:
+                return method(self, *args, **kwargs)
+            except (ConnectionError, OSError) as e:
+                LOG.info(f"{method.__name__} lost the mpd connection ({e}). Retrying once")
+                return method(self, *args, **kwargs)
+
+    return cast(F, wrapper)
 
 
 class Mpd:
     def __init__(self, cfg_mpd: dict):
         self._mpd_wrapper = MpdWrapper(cfg_mpd=cfg_mpd)
+        cache_path = cfg_mpd.get("library_cache")
+        cache = LibraryCache(Path(cache_path).expanduser()) if cache_path else None
+        self._library = Library(MpdWrapper(cfg_mpd=cfg_mpd), cache)
+        self._library_checked = -float(LIBRARY_CHECK_INTERVAL)
+
+    @property
+    def library(self) -> Library:
+        return self._library
+
+    def refresh_library(self) -> None:
+        """compares Stats.db_update against the library index and rebuilds it in the background if needed"""
+        self._library_checked = monotonic()
+        self._library.refresh(self.stats().db_update)
+
+    def _library_index(self) -> Optional[LibraryIndex]:
+        if monotonic() - self._library_checked > LIBRARY_CHECK_INTERVAL:
+            self.refresh_library()
+        return self._library.index
 
     def artist_startswith(self, startletter: str) -> List[str]:
-        return [
-            artist
-            for artist in self.get_artists()
-            if any(
-                [
-                    artist.startswith(startletter),
-                    artist.startswith(startletter.upper()),
-                    artist.startswith(startletter.lower()),
-                ]
-            )
-        ]
-
-    def get_artists(self) -> List[str]:
+        return self.artist_prefixes().startswith(startletter)
+
+    def match_artist_prefix(self, prefix: str) -> PrefixMatch:
+        """offset and number of the artists in get_artists() that start with prefix"""
+        return self.artist_prefixes().match(prefix)
+
+    def jump_to_artist(self, prefix: str) -> int:
+        """offset in get_artists() of the first artist starting with prefix or, if there is none, the next one"""
+        return self.artist_prefixes().jump_to(prefix)
+
+    def artist_prefixes(self) -> PrefixIndex:
+        index = self._library_index()
+        if index is not None:
+            return index.artist_prefixes
+        return PrefixIndex(self._list_artists())
+
+    def get_artists(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """all artists or the window [start, stop) of them, sorted case and diacritics insensitive"""
+        return self.artist_prefixes().names(start, stop)
+
+    @reconnecting
+    def _list_artists(self) -> List[str]:
         with self._mpd_wrapper as client:
             return [item["artist"] for item in client.list("artist") if item["artist"]]
 
+    @reconnecting
     def get_albums_of_artist(self, artist: str) -> List[str]:
+        index = self._library_index()
+        if index is not None:
+            return index.albums_of_artist(artist)
         with self._mpd_wrapper as client:
             albums_query_result = [l["album"] for l in client.list("album", "albumartist", artist, "group", "date")]
             return self.flatten_list(albums_query_result)
 
+    @reconnecting
     def get_track_of_album_of_artist(self, artist: str, album: str) -> List[str]:
+        index = self._library_index()
+        if index is not None:
+            return index.tracks_of_album_of_artist(artist, album)
         with self._mpd_wrapper as client:
             track_titles = [
                 t["title"] for t in client.list("title", "artist", artist, "album", album, "group", "track")
@@ -196,42 +373,100 @@ class Mpd:
                     flat_list.append(album)
         return flat_list
 
+    @reconnecting
     def get_tracks_of_artist(self, artist: str) -> List[str]:
+        index = self._library_index()
+        if index is not None:
+            return index.tracks_of_artist(artist)
         with self._mpd_wrapper as client:
             return [t["title"] for t in client.list("title", "artist", artist) if t["title"]]
 
-    # Fixme: here it crashes currently
-    def add_tracks(self, artist: str, album: Optional[str], track: Optional[str]) -> None:
-        with self._mpd_wrapper as client:
-            if artist and not album and not track:
-                tracks = client.find("artist", artist)
-            elif artist and album and not track:
-                tracks = client.find("artist", artist, "album", album)
-            elif artist and not album and track:
-                tracks = client.find("artist", artist, "title", track)
-            elif artist and album and track:
-                tracks = client.find("artist", artist, "album", album, "title", track)
-            client.add([track["file"] for track in tracks])
+    @staticmethod
+    def find_filters(artist: str, album: Optional[str] = None, track: Optional[str] = None) -> List[str]:
+        """arguments for find and findadd that match the artist, narrowed down to the album and the title if given"""
+        filters = ["artist", artist]
+        if album:
+            filters += ["album", album]
+        if track:
+            filters += ["title", track]
+        return filters
+
+    def add_tracks(self, artist: str, album: Optional[str] = None, track: Optional[str] = None) -> None:
+        """queues the matching songs in a single round trip. mpd looks them up itself, no metadata is transferred
+
+        Not retried on a broken connection, as mpd might have queued the songs already.
+        """
+        with PROBES.measure("mpd.add_tracks"), self._mpd_wrapper as client:
+            client.findadd(*self.find_filters(artist, album, track))
+
+    def search_add(self, query: str, tag: str = "any") -> None:
+        """queues all songs whose tag contains query, ignoring case, in a single round trip. Not retried, like
+        add_tracks"""
+        with PROBES.measure("mpd.search_add"), self._mpd_wrapper as client:
+            client.searchadd(tag, query)
+
+    def add_files(
+        self,
+        files: Sequence[str],
+        progress: Optional[Callable[[int, int], None]] = None,
+        batch_size: int = ADD_BATCH_SIZE,
+    ) -> None:
+        """queues files that no filter describes, batch_size of them per command list
+
+        progress is called with the number of files queued so far and the total after every batch. A broken connection
+        isn't retried, as mpd might have queued part of the batch already.
+        """
+        with PROBES.measure("mpd.add_files"):
+            for start in range(0, len(files), batch_size):
+                batch = files[start : start + batch_size]
+                with self._mpd_wrapper as client:
+                    client.command_list_ok_begin()
+                    for file in batch:
+                        client.add(file)
+                    client.command_list_end()
+                if progress is not None:
+                    progress(start + len(batch), len(files))
 
     def play_track(self) -> None:
         ...
 
+    @reconnecting
     def stats(self) -> Stats:
         with self._mpd_wrapper as client:
             return Stats.from_client(client)
 
+    @reconnecting
     def status(self) -> Status:
         with self._mpd_wrapper as client:
             return Status.from_client(client)
 
+    @reconnecting
+    def snapshot(self, with_stats: bool = False) -> PlayerSnapshot:
+        """fetches status, current song and optionally stats in a single round trip"""
+        with self._mpd_wrapper as client:
+            client.command_list_ok_begin()
+            client.status()
+            client.currentsong()
+            if with_stats:
+                client.stats()
+            results = client.command_list_end()
+        return PlayerSnapshot(
+            status=Status.from_dict(results[0]),
+            song_info=SongInfo.from_dict(results[1]),
+            stats=Stats.from_dict(results[2]) if with_stats else None,
+        )
+
+    @reconnecting
     def current_song(self) -> SongInfo:
         with self._mpd_wrapper as client:
             return SongInfo.from_client(client)
 
+    @reconnecting
     def resume(self) -> None:
         with self._mpd_wrapper as client:
             client.pause("0")
 
+    @reconnecting
     def pause(self) -> None:
         with self._mpd_wrapper as client:
             client.pause("1")
@@ -241,3 +476,10 @@ class Mpd:
             self.pause()
         else:
             self.resume()
+
+    def disconnect(self) -> None:
+        self._mpd_wrapper.disconnect()
+
+    @property
+    def transport(self) -> Optional[Transport]:
+        return self._mpd_wrapper.transport
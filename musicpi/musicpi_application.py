@@ -1,26 +1,42 @@
+from __future__ import annotations
+
 import logging
 import subprocess
 from enum import Enum
 from pathlib import Path
-from time import sleep
+from queue import Empty, Queue
+from threading import Event
+from time import monotonic
+from typing import Callable, List, Optional, Set
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
 from super_state_machine import machines
 
-from musicpi import Mpd, SongInfo, Status
+from musicpi import Mpd, PlayerSnapshot
+from musicpi.cover_art import COVER_CACHE_MAX_BYTES, CoverArt, ThumbnailCache
+from musicpi.hardware.button_events import ButtonEvent, ButtonEventType
 from musicpi.hmi.hmi import Hmi
+from musicpi.hmi.marquee import Marquee
+from musicpi.hmi.render_worker import RENDER_MAX_FPS, RenderStats, RenderWorker
+from musicpi.hmi.status_bar import StatusBar
+from musicpi.hmi.text_cache import TextBitmapCache
+from musicpi.mpd_idle import IdleListener
+from musicpi.mpd_wrapper import MpdWrapper
+from musicpi.probes import PROBES
+from musicpi.scheduler import Job, Scheduler
+from musicpi.startup import StartupReport
 
 LOG = logging.getLogger(__name__)
 
-icon_pause = Image.open(Path("musicpi/hmi/icons/pause.png"))
-icon_play = Image.open(Path("musicpi/hmi/icons/play.png"))
-icon_repeat = Image.open(Path("musicpi/hmi/icons/repeat.png"))
-icon_no_repeat = Image.open(Path("musicpi/hmi/icons/no_repeat.png"))
-icon_random = Image.open(Path("musicpi/hmi/icons/random.png"))
-icon_no_random = Image.open(Path("musicpi/hmi/icons/no_random.png"))
+LOOP_INTERVAL = 0.1
+SYS_STATS_INTERVAL = 1.0  # how often the sys stats page is redrawn
+COVER_ART_READY = "coverart"  # put among the mpd events, as it needs a redraw as well, but not a new snapshot
+PROGRESS_RESYNC_INTERVAL = 10.0  # seconds the elapsed time is extrapolated without a player event at most
+PAUSED_BACKOFF = 10.0  # the polling mainloop polls mpd and animates this many times slower while paused
+MOUNT_CHECK_INTERVAL = 30.0
 
 
-def mount_multimedia_if_necessary():
+def mount_multimedia_if_necessary() -> None:
     if not Path("/home/max/Multimedia").is_mount():
         try:
             subprocess.call(["mount", "/home/max/Multimedia"], timeout=10)
@@ -29,77 +45,419 @@ def mount_multimedia_if_necessary():
 
 
 class MusicPi:
-    def __init__(self, hmi: Hmi, cfg: dict) -> None:
+    def __init__(self, hmi: Hmi, cfg: dict, startup: Optional[StartupReport] = None) -> None:
         self._hmi = hmi
         self._cfg = cfg
+        self._startup = startup
+        startup_report = cfg.get("startup_report")
+        self._startup_export = Path(startup_report).expanduser() if startup_report else None
         self._mpd = Mpd(cfg.get("mpd", {}))
+        self._mpd_events: "Queue[str]" = Queue()
+        self._text_cache = TextBitmapCache()
+        max_fps = cfg.get("max_fps", RENDER_MAX_FPS)
+        self._render_worker = RenderWorker(
+            hmi.show_on_display,
+            max_fps=max_fps,
+            on_first_frame=self._first_frame if startup else None,
+            on_error=hmi.invalidate_display,
+        )
+        self._frame_interval: float = 1 / max_fps
+        self._marquee = Marquee(self._text_cache)
+        self._status_bar = StatusBar(self._text_cache)
+        self._cover_art = self._setup_cover_art(cfg)
+        self.cover_art_ready: Callable[[], object] = lambda: None  # set by the mainloop to redraw with the new cover
+        self._animating = False  # whether the last frame contained something that moves on its own
+        self._snapshot: Optional[PlayerSnapshot] = None
+        self._stop_requested = Event()
+        self._wakeup = Event()  # the idle mainloop sleeps on this, set by input, mpd changes, covers and stop()
+        self._loop_iterations = 0
+        cfg_probes = cfg.get("probes", {})
+        PROBES.enabled = cfg_probes.get("enabled", False)
+        export = cfg_probes.get("export")
+        self._probes_export = Path(export).expanduser() if export else None
+        self._sys_stats_drawn = -SYS_STATS_INTERVAL
+        self._pending_input: List[ButtonEvent] = []
+
+    def _setup_cover_art(self, cfg: dict) -> Optional[CoverArt]:
+        cfg_cover_art = cfg.get("cover_art", {})
+        if not cfg_cover_art.get("enabled", True):
+            return None
+        cache_path = cfg_cover_art.get("cache")
+        cache = (
+            ThumbnailCache(Path(cache_path).expanduser(), cfg_cover_art.get("max_bytes", COVER_CACHE_MAX_BYTES))
+            if cache_path
+            else None
+        )
+        return CoverArt(MpdWrapper(cfg.get("mpd", {})), cache, on_ready=lambda: self.cover_art_ready())
+
+    def _first_frame(self) -> None:
+        """called from the render worker once the first frame of the application is on the display"""
+        assert self._startup is not None
+        self._startup.mark("first_frame")
+        LOG.info(self._startup)
+        if self._startup_export is not None:
+            try:
+                self._startup.export(self._startup_export)
+            except OSError as e:
+                LOG.warning(f"Couldn't export the startup report: {e}")
+
+    @property
+    def text_cache(self) -> TextBitmapCache:
+        return self._text_cache
+
+    @property
+    def render_stats(self) -> RenderStats:
+        return self._render_worker.stats
+
+    @property
+    def cfg(self) -> dict:
+        return self._cfg
+
+    @property
+    def mpd(self) -> Mpd:
+        return self._mpd
+
+    @property
+    def stop_requested(self) -> Event:
+        return self._stop_requested
+
+    @property
+    def frame_interval(self) -> float:
+        return self._frame_interval
+
+    @property
+    def animating(self) -> bool:
+        """whether the last frame contained something that moves on its own"""
+        return self._animating
+
+    @property
+    def loop_iterations(self) -> int:
+        return self._loop_iterations
+
+    def stop(self) -> None:
+        """makes start() return after the current loop iteration"""
+        self._stop_requested.set()
+        self._wakeup.set()
 
     def start(self) -> None:
+        mainloop = self._cfg.get("mainloop", "polling")
+        LOG.info(f"starting {mainloop} mainloop")
+        if self._startup is not None:
+            self._startup.mark("mainloop")
+        self._render_worker.start()
+        if self._cover_art is not None:
+            self._cover_art.start()
+        try:
+            if mainloop == "idle":
+                self._run_event_driven()
+            elif mainloop == "asyncio":
+                from musicpi.mainloop_asyncio import AsyncioMainloop  # asyncio takes long to import on a pi zero
+
+                AsyncioMainloop(self).run()
+            else:
+                self._run_polling()
+        finally:
+            self._render_worker.stop()
+            if self._cover_art is not None:
+                self._cover_art.stop()
+            self._mpd.disconnect()
+            LOG.info(f"text cache: {self._text_cache.report()}")
+            LOG.info(f"rendering: {self._render_worker.stats}")
+            self.export_probes()
+
+    def export_probes(self) -> None:
+        if PROBES.enabled and self._probes_export is not None:
+            try:
+                PROBES.export(self._probes_export)
+            except OSError as e:
+                LOG.warning(f"Couldn't export probes: {e}")
+
+    def _run_polling(self) -> None:
+        """polls mpd and reads the button, each at its own rate, see _schedule"""
+        self._schedule(Menu()).run(self._stop_requested)
+
+    def _schedule(self, menu: "Menu") -> Scheduler:
+        """input as soon as it arrives, mpd every LOOP_INTERVAL, the display when something changed or moves, at most
+        max_fps times a second, and the led when playback starts or stops. While paused, polling and animations
+        slow down by PAUSED_BACKOFF."""
+        scheduler = Scheduler(wait=lambda timeout: self._wait_for_input(scheduler, timeout))
+        scheduler.add(Job("input", lambda: self._handle_input(menu, scheduler)))
+        scheduler.add(
+            Job("status", lambda: self._poll_status(scheduler), interval=LOOP_INTERVAL, backoff=PAUSED_BACKOFF)
+        )
+        scheduler.add(
+            Job(
+                "display",
+                lambda: self._draw(menu, scheduler),
+                min_interval=self._frame_interval,
+                backoff=PAUSED_BACKOFF,
+            )
+        )
+        scheduler.add(Job("led", self._update_led))
+        if self._cfg.get("mount_check", False):
+            scheduler.add(Job("mount", mount_multimedia_if_necessary, interval=MOUNT_CHECK_INTERVAL))
+        return scheduler
+
+    def _wait_for_input(self, scheduler: Scheduler, timeout: float) -> None:
+        self._pending_input += self.take_input_events(timeout)
+        if self._pending_input:
+            scheduler.trigger("input")
+
+    def _handle_input(self, menu: "Menu", scheduler: Scheduler) -> None:
+        user_input, self._pending_input = self._pending_input, []
+        if any(self.toggles_playback(event) for event in user_input):
+            self._mpd.pause_play()
+            scheduler.trigger("status")
+        self.navigate(menu, user_input)
+        scheduler.trigger("display")
+
+    def _poll_status(self, scheduler: Scheduler) -> None:
+        previous, self._snapshot = self._snapshot, self._mpd.snapshot()
+        playing = self._snapshot.status.playing
+        scheduler.paused = not playing
+        if previous is None or previous.status.playing != playing:
+            scheduler.trigger("led")
+        scheduler.trigger("display")
+
+    def _update_led(self) -> None:
+        if self._snapshot is not None:
+            self.set_led_to_playstatus(self._snapshot)
+
+    def _draw(self, menu: "Menu", scheduler: Scheduler) -> None:
+        if self._snapshot is None:
+            return
+        self.draw(menu, self._snapshot)
+        scheduler.job("display").interval = self._frame_interval if self._animating else None
+
+    def _run_event_driven(self) -> None:
+        """redraws only if mpd reports a change via idle or the user gives some input
+
+        Sleeps until one of them sets the wakeup event, or the next animation frame is due.
+        """
         menu = Menu()
-        while True:
-            if menu.state == "songinfo":
-                self.visualize_current_song()
-            if self._hmi.button.pressed():
-                self._mpd.pause_play()
-            self.set_led_to_playstatus()
-            # mount_multimedia_if_necessary()
-            sleep(0.1)
-
-    def set_led_to_playstatus(self) -> None:
-        if self._mpd.status().playing:
+        listener = IdleListener(self._cfg.get("mpd", {}), self._mpd_events, wakeup=self._wakeup)
+        self.cover_art_ready = self._put_cover_art_ready
+        self._hmi.button.notify(self._wakeup)
+        listener.start()
+        try:
+            while not self._stop_requested.is_set():
+                self._wakeup.wait(timeout=self._frame_interval if self._animating else None)
+                self._wakeup.clear()  # before taking the events, so the ones that arrive meanwhile set it again
+                user_input = self.take_input_events()
+                if any(self.toggles_playback(event) for event in user_input):
+                    self._mpd.pause_play()
+                self.navigate(menu, user_input)
+                changed = self._take_mpd_events()
+                if "database" in changed:
+                    self._mpd.refresh_library()
+                if changed - {COVER_ART_READY} or user_input or self.needs_resync():
+                    self.refresh(menu)
+                elif changed:
+                    self.repaint(menu)
+                else:
+                    self.animate(menu)
+        finally:
+            self._hmi.button.notify(None)
+            listener.stop()
+
+    def _put_cover_art_ready(self) -> None:
+        self._mpd_events.put(COVER_ART_READY)
+        self._wakeup.set()
+
+    def take_input_events(self, timeout: float = 0) -> List[ButtonEvent]:
+        """waits up to timeout for the first event and returns it along with all that are queued already. Every
+        mainloop calls this once per iteration."""
+        self._loop_iterations += 1
+        events = self._hmi.button.events
+        try:
+            taken = [events.get(timeout=timeout)]
+        except Empty:
+            return []
+        while not events.empty():
+            taken.append(events.get_nowait())
+        return taken
+
+    @staticmethod
+    def toggles_playback(event: ButtonEvent) -> bool:
+        return event.button == "button" and event.type is ButtonEventType.PRESS
+
+    def navigate(self, menu: "Menu", user_input: List[ButtonEvent]) -> None:
+        """a long press on the encoder switch toggles between the song info and the sys stats page"""
+        for event in user_input:
+            if event.button != "enc_sw" or event.type is not ButtonEventType.LONG_PRESS:
+                continue
+            if menu.state == "submenu_sys_stats":
+                menu.set_songinfo()
+            else:
+                menu.set_main_menu()
+                menu.set_submenu_sys_stats()
+                self._sys_stats_drawn = -SYS_STATS_INTERVAL
+                self.export_probes()
+
+    def _take_mpd_events(self) -> Set[str]:
+        changed: Set[str] = set()
+        while not self._mpd_events.empty():
+            changed.add(self._mpd_events.get_nowait())
+        return changed
+
+    def refresh(self, menu: "Menu") -> None:
+        self.show(menu, self._mpd.snapshot())
+
+    def needs_resync(self) -> bool:
+        """whether the extrapolated elapsed time of a playing song should be checked against mpd again"""
+        if self._snapshot is None or not self._snapshot.status.playing:
+            return False
+        return monotonic() - self._snapshot.status.timestamp > PROGRESS_RESYNC_INTERVAL
+
+    def repaint(self, menu: "Menu") -> None:
+        """redraws the last snapshot, e.g. with a cover that has become available since"""
+        if self._snapshot is not None:
+            self.show(menu, self._snapshot)
+
+    def animate(self, menu: "Menu") -> None:
+        """redraws the last snapshot if the previous frame was animated, e.g. a scrolling title or the progress"""
+        if self._animating and self._snapshot is not None:
+            self.show(menu, self._snapshot)
+
+    def show(self, menu: "Menu", snapshot: PlayerSnapshot) -> None:
+        self.draw(menu, snapshot)
+        self.set_led_to_playstatus(snapshot)
+
+    def draw(self, menu: "Menu", snapshot: PlayerSnapshot) -> None:
+        self._snapshot = snapshot
+        if menu.state == "songinfo":
+            self.visualize_current_song(snapshot)
+        elif menu.state == "submenu_sys_stats":
+            self.visualize_sys_stats()
+
+    def set_led_to_playstatus(self, snapshot: PlayerSnapshot) -> None:
+        if snapshot.status.playing:
             self._hmi.led.on()
         else:
             self._hmi.led.off()
 
-    def visualize_current_song(self) -> None:
-        song_info: SongInfo = self._mpd.current_song()
-        status: Status = self._mpd.status()
-        fnt = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 9)
+    def visualize_current_song(self, snapshot: PlayerSnapshot) -> None:
+        with PROBES.measure("render.compose"):
+            display_content = Image.new(mode="1", size=(128, 64), color=0)
+            cover = self._cover_art.get(snapshot.song_info.file) if self._cover_art is not None else None
+            visualisation = SongVisualisation(
+                display_content, snapshot, self._text_cache, self._marquee, self._status_bar, cover
+            )
+            self._animating = visualisation.display_status()
+            if snapshot.song_info.title:
+                ...
+            else:
+                self._text_cache.draw(display_content, (0, 0), "empty playlist")
+        self._render_worker.submit(display_content)
+
+    def visualize_sys_stats(self) -> None:
+        """p50/p95/max of every probe in ms, redrawn every SYS_STATS_INTERVAL"""
+        self._animating = True
+        if monotonic() - self._sys_stats_drawn < SYS_STATS_INTERVAL:
+            return
+        self._sys_stats_drawn = monotonic()
         display_content = Image.new(mode="1", size=(128, 64), color=0)
-        canvas = ImageDraw.Draw(display_content)
-        visualisation = SongVisualisation(display_content, status, song_info)
-        visualisation.display_status()
-        if song_info.title:
-            ...
-        else:
-            canvas.text((0, 0), "empty playlist", fill="white", font=fnt)
-        self._hmi.show_on_display(display_content)
+        SysStatsVisualisation(display_content, self._text_cache).display_probes()
+        self._render_worker.submit(display_content)
+
+
+def format_time(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
 
 
 class SongVisualisation:
-    def __init__(self, display_content: Image, status: Status, song_info: SongInfo) -> None:
-        self._display_content = display_content
-        self._status: Status = status
-        self._song_info: SongInfo = song_info
-        self._canvas = ImageDraw.Draw(display_content)
-        self._font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 9)
+    COVER_POSITION = (96, 24)
+    STATUS_BAR_POSITION = (0, 48)
+    PROGRESS_Y = 24
+    PROGRESS_WIDTH = 92  # left of the cover
 
-    def display_status(self) -> None:
-        self._display_song_info()
-        self._display_play_status()
-        self._display_repeat()
-        self._display_random()
-        self._display_playlist_position()
+    def __init__(
+        self,
+        display_content: Image.Image,
+        snapshot: PlayerSnapshot,
+        text_cache: TextBitmapCache,
+        marquee: Marquee,
+        status_bar: StatusBar,
+        cover: Optional[Image.Image] = None,
+    ) -> None:
+        self._display_content = display_content
+        self._status_bar = status_bar
+        self._cover = cover
+        self._status = snapshot.status
+        self._song_info = snapshot.song_info
+        self._text_cache = text_cache
+        self._marquee = marquee
 
-    def _display_song_info(self) -> None:
-        self._canvas.text((0, 11), self._song_info.artist, fill="white", font=self._font)
-        self._canvas.text((0, 0), self._song_info.title, fill="white", font=self._font)
+    def display_status(self) -> bool:
+        """returns whether the frame is animated, i.e. whether the song info scrolls or the progress moves"""
+        scrolling = self._display_song_info()
+        self._display_progress()
+        self._display_cover()
+        self._display_status_bar()
+        return scrolling or self._status.playing
 
-    def _display_play_status(self) -> None:
-        self._display_content.paste(icon_play if self._status.playing else icon_pause, (0, 48))
+    def _display_song_info(self) -> bool:
+        artist_scrolls = self._marquee.draw(self._display_content, (0, 11), self._song_info.artist)
+        title_scrolls = self._marquee.draw(self._display_content, (0, 0), self._song_info.title)
+        return artist_scrolls or title_scrolls
 
-    def _display_repeat(self) -> None:
-        self._display_content.paste(icon_repeat if self._status.repeat else icon_no_repeat, (16, 48))
+    def _display_progress(self) -> None:
+        """elapsed and remaining time above a bar, extrapolated from the status rather than fetched for every frame"""
+        duration = self._status.duration
+        if not duration:
+            return
+        position = self._status.position()
+        self._text_cache.draw(self._display_content, (0, self.PROGRESS_Y), format_time(position))
+        remaining = self._text_cache.render(f"-{format_time(duration - position)}")
+        self._display_content.paste(remaining, (self.PROGRESS_WIDTH - remaining.width, self.PROGRESS_Y), remaining)
+        bar_y = self.PROGRESS_Y + 12
+        self._display_content.paste(255, (0, bar_y + 2, self.PROGRESS_WIDTH, bar_y + 3))
+        self._display_content.paste(255, (0, bar_y, round(self.PROGRESS_WIDTH * position / duration), bar_y + 3))
 
-    def _display_random(self) -> None:
-        self._display_content.paste(icon_random if self._status.random else icon_no_random, (32, 48))
+    def _display_cover(self) -> None:
+        if self._cover is not None:
+            self._display_content.paste(self._cover, self.COVER_POSITION)
 
-    def _display_playlist_position(self) -> None:
+    def _display_status_bar(self) -> None:
         try:
             pos_string = f"({self._song_info.id}/{self._status.playlistlength})"
         except KeyError:
             pos_string = "(N/A)"
-        self._canvas.text((48, 48), text=pos_string, fill="white", font=self._font)
+        self._status_bar.draw(
+            self._display_content,
+            self.STATUS_BAR_POSITION,
+            self._status.playing,
+            self._status.repeat,
+            self._status.random,
+            pos_string,
+        )
+
+
+class SysStatsVisualisation:
+    LINE_HEIGHT = 10
+    VALUES_X = 68  # probe names are cut off here
+
+    def __init__(self, display_content: Image.Image, text_cache: TextBitmapCache) -> None:
+        self._display_content = display_content
+        self._text_cache = text_cache
+
+    def display_probes(self) -> None:
+        if not PROBES.enabled:
+            self._text_cache.draw(self._display_content, (0, 0), "probes disabled")
+            return
+        self._text_cache.draw(self._display_content, (0, 0), "latency p50/p95/max [ms]")
+        lines = self._display_content.height // self.LINE_HEIGHT - 1
+        for row, summary in enumerate(PROBES.summary()[:lines], start=1):
+            y = row * self.LINE_HEIGHT
+            name = self._text_cache.render(summary.name)
+            name = name.crop((0, 0, min(name.width, self.VALUES_X - 2), name.height))
+            self._display_content.paste(name, (0, y), name)
+            values = "/".join(
+                f"{seconds * 1000:.0f}" if seconds >= 0.01 else f"{seconds * 1000:.1f}"
+                for seconds in (summary.p50, summary.p95, summary.max)
+            )
+            self._text_cache.draw(self._display_content, (self.VALUES_X, y), values)
 
 
 class Menu(machines.StateMachine):
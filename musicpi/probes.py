@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import logging
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from threading import Lock
+from time import perf_counter, time
+from types import TracebackType
+from typing import Dict, List, Optional, Type
+
+LOG = logging.getLogger(__name__)
+
+PROBE_RING_SIZE = 256  # durations kept per probe. Percentiles are taken over these
+_DISABLED: AbstractContextManager[None] = nullcontext()
+
+
+@dataclass(frozen=True)
+class ProbeSummary:
+    name: str
+    count: int  # all measurements since the last clear, not only the ones still in the ring
+    p50: float
+    p95: float
+    max: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.p50 * 1000:.2f}ms p50 / {self.p95 * 1000:.2f}ms p95 / {self.max * 1000:.2f}ms max "
+            f"({self.count} samples)"
+        )
+
+
+class Ring:
+    """the latest size durations in a preallocated list, so recording never allocates"""
+
+    def __init__(self, size: int = PROBE_RING_SIZE) -> None:
+        self._values = [0.0] * size
+        self._count = 0
+        self._lock = Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._values[self._count % len(self._values)] = seconds
+            self._count += 1
+
+    def summary(self, name: str) -> ProbeSummary:
+        with self._lock:
+            count = self._count
+            values = sorted(self._values[: min(count, len(self._values))])
+        if not values:
+            return ProbeSummary(name=name, count=0, p50=0.0, p95=0.0, max=0.0)
+        return ProbeSummary(
+            name=name, count=count, p50=_percentile(values, 0.5), p95=_percentile(values, 0.95), max=values[-1]
+        )
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """nearest rank"""
+    return ordered[max(0, round(fraction * len(ordered)) - 1)]
+
+
+class _Timing:
+    __slots__ = ("_ring", "_start")
+
+    def __init__(self, ring: Ring) -> None:
+        self._ring = ring
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self._ring.record(perf_counter() - self._start)
+
+
+class Probes:
+    """named timing probes around hot paths, e.g. mpd round trips or display transfers
+
+    While disabled, measure() hands out one shared no-op context manager, so a probe costs a method call and nothing is
+    recorded.
+    """
+
+    def __init__(self, enabled: bool = False, size: int = PROBE_RING_SIZE) -> None:
+        self.enabled = enabled
+        self._size = size
+        self._rings: Dict[str, Ring] = {}
+        self._lock = Lock()
+
+    def measure(self, name: str) -> AbstractContextManager[None]:
+        if not self.enabled:
+            return _DISABLED
+        return _Timing(self._ring(name))
+
+    def record(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            self._ring(name).record(seconds)
+
+    def _ring(self, name: str) -> Ring:
+        ring = self._rings.get(name)
+        if ring is None:
+            with self._lock:
+                ring = self._rings.setdefault(name, Ring(self._size))
+        return ring
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rings = {}
+
+    def summary(self) -> List[ProbeSummary]:
+        with self._lock:
+            rings = sorted(self._rings.items())
+        return [ring.summary(name) for name, ring in rings]
+
+    def export(self, path: Path) -> None:
+        """writes the summary of all probes as json"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        probes = {s.name: {k: v for k, v in asdict(s).items() if k != "name"} for s in self.summary()}
+        path.write_text(json.dumps({"timestamp": time(), "unit": "s", "probes": probes}, indent=2))
+        LOG.info(f"exported {len(probes)} probes to {path}")
+
+
+PROBES = Probes()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from math import inf
+from threading import Event
+from time import monotonic, sleep
+from typing import Callable, Dict, List, Optional
+
+SCHEDULER_MAX_SLEEP = 1.0  # seconds, bounds how long stopping the scheduler may take
+
+
+@dataclass
+class Job:
+    name: str
+    action: Callable[[], object]
+    interval: Optional[float] = None  # seconds between runs, None: only when triggered
+    backoff: float = 1.0  # the interval is multiplied by this while playback is paused
+    min_interval: float = 0.0  # triggers that follow a run more closely than this are deferred, e.g. to cap the fps
+    last_run: float = -inf
+    triggered: bool = False
+    runs: int = 0
+
+    def due(self, paused: bool) -> float:
+        """the time the job wants to run next, inf if it waits for a trigger"""
+        due = inf
+        if self.interval is not None:
+            due = self.last_run + self.interval * (self.backoff if paused else 1.0)
+        if self.triggered:
+            due = min(due, self.last_run + self.min_interval)
+        return due
+
+
+class Scheduler:
+    """runs jobs cooperatively on one thread, each one at its own rate or when it's triggered
+
+    Between runs it sleeps until the next job is due. The sleep is the wait function, which may return early, e.g.
+    because a button event arrived, and trigger jobs on the way. Jobs run in the order they were added, so a job
+    triggered by an earlier one runs in the same pass.
+    """
+
+    def __init__(
+        self,
+        wait: Callable[[float], object] = sleep,
+        clock: Callable[[], float] = monotonic,
+        max_sleep: float = SCHEDULER_MAX_SLEEP,
+    ) -> None:
+        self._wait = wait
+        self._clock = clock
+        self._max_sleep = max_sleep
+        self._jobs: Dict[str, Job] = {}
+        self.paused = False  # playback is paused, jobs run at their backed off rate
+
+    @property
+    def jobs(self) -> List[Job]:
+        return list(self._jobs.values())
+
+    def add(self, job: Job) -> Job:
+        self._jobs[job.name] = job
+        return job
+
+    def job(self, name: str) -> Job:
+        return self._jobs[name]
+
+    def trigger(self, name: str) -> None:
+        """runs the job as soon as its min_interval allows. Unknown jobs are ignored, e.g. ones that are configured off"""
+        job = self._jobs.get(name)
+        if job is not None:
+            job.triggered = True
+
+    def run_due(self) -> int:
+        """runs every job that is due and returns how many ran"""
+        ran = 0
+        for job in list(self._jobs.values()):
+            now = self._clock()
+            if job.due(self.paused) > now:
+                continue
+            job.last_run = now
+            job.triggered = False
+            job.runs += 1
+            ran += 1
+            job.action()
+        return ran
+
+    def next_due(self) -> float:
+        return min((job.due(self.paused) for job in self._jobs.values()), default=inf)
+
+    def run(self, stop: Event) -> None:
+        while not stop.is_set():
+            self.run_due()
+            if not stop.is_set():
+                self._wait(min(max(self.next_due() - self._clock(), 0.0), self._max_sleep))
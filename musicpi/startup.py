@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+import logging
+import sys
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from threading import Lock
+from time import perf_counter, time
+from typing import Dict, Iterator, Optional
+
+LOG = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    seconds: float
+    modules: int  # modules loaded by the import, including the ones it imports itself
+
+
+class StartupReport:
+    """time from the start of the process to milestones like the splash screen and the first frame of the application
+
+    Only depends on the standard library, so it can be created before anything heavy gets imported. The time python
+    itself needs to start isn't included. `python -X importtime` breaks an import down further.
+    """
+
+    def __init__(self, start: Optional[float] = None) -> None:
+        self._start = perf_counter() if start is None else start
+        self._milestones: Dict[str, float] = {}
+        self._imports: Dict[str, ImportTime] = {}
+        self._lock = Lock()  # the first frame is marked from the render thread
+
+    @property
+    def milestones(self) -> Dict[str, float]:
+        """seconds since the start"""
+        with self._lock:
+            return dict(self._milestones)
+
+    @property
+    def imports(self) -> Dict[str, ImportTime]:
+        return dict(self._imports)
+
+    def mark(self, name: str) -> float:
+        """records the first time the milestone is reached and returns the seconds since the start"""
+        with self._lock:
+            return self._milestones.setdefault(name, perf_counter() - self._start)
+
+    @contextmanager
+    def importing(self, module: str) -> Iterator[None]:
+        modules = len(sys.modules)
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._imports[module] = ImportTime(seconds=perf_counter() - start, modules=len(sys.modules) - modules)
+
+    def __str__(self) -> str:
+        milestones = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.milestones.items())
+        imports = ", ".join(
+            f"{module} {t.seconds * 1000:.0f}ms ({t.modules} modules)" for module, t in self._imports.items()
+        )
+        return f"startup: {milestones}; imports: {imports or '-'}"
+
+    def export(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        imports = {module: asdict(t) for module, t in self._imports.items()}
+        path.write_text(
+            json.dumps({"timestamp": time(), "unit": "s", "milestones": self.milestones, "imports": imports}, indent=2)
+        )
+        LOG.info(f"exported startup report to {path}")
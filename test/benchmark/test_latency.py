@@ -0,0 +1,134 @@
+import threading
+import time
+from statistics import mean, median
+from typing import Any, Dict, List
+
+import pytest
+
+from musicpi.hardware.pin_interface import Pins
+from test.fixtures import RunMusicPi
+from test.mockups.mockuphmi import MockupHmi
+from test.mockups.mockupmpd import MockupMpdServer
+
+MAINLOOPS = ["polling", "idle", "asyncio"]
+PRESSES = 20
+STEADY_STATE_WINDOW = 2.0
+TIMEOUT = 2.0
+
+
+class LedWatcher:
+    def __init__(self) -> None:
+        self.changes: List[float] = []
+        self._condition = threading.Condition()
+
+    def __call__(self, pin: int, level: bool) -> None:
+        if pin == Pins.leds["green"]:
+            with self._condition:
+                self.changes.append(time.monotonic())
+                self._condition.notify_all()
+
+    def wait_for_change(self, after: float) -> float:
+        with self._condition:
+            if not self._condition.wait_for(lambda: bool(self.changes) and self.changes[-1] > after, TIMEOUT):
+                raise TimeoutError("led didn't change")
+            return self.changes[-1]
+
+
+@pytest.fixture
+def led_watcher() -> Any:
+    from RPi import GPIO
+
+    watcher = LedWatcher()
+    GPIO.OUTPUT_LISTENERS.append(watcher)
+    yield watcher
+    GPIO.OUTPUT_LISTENERS.remove(watcher)
+
+
+@pytest.fixture
+def paused_mpd(mockup_mpd: MockupMpdServer) -> MockupMpdServer:
+    mockup_mpd.queue = list(mockup_mpd.library)
+    mockup_mpd.state = "pause"
+    return mockup_mpd
+
+
+def press_button(hmi: MockupHmi, led_watcher: LedWatcher) -> Dict[str, float]:
+    """presses the button and returns the seconds until the led and the display reacted"""
+    from RPi import GPIO
+
+    pin = Pins.buttons["button"]
+    frame_before = hmi.last_frame(TIMEOUT)[1]
+    pressed = time.monotonic()
+    GPIO.set_input(pin, GPIO.LOW)
+    try:
+        led = led_watcher.wait_for_change(after=pressed)
+        frame, _ = hmi.wait_for_frame(after=pressed, different_from=frame_before, timeout=TIMEOUT)
+    finally:
+        time.sleep(0.03)
+        GPIO.set_input(pin, GPIO.HIGH)
+    time.sleep(0.1)
+    return {"led": led - pressed, "frame": frame - pressed}
+
+
+def thread_cpu_time(threads: List[threading.Thread]) -> float:
+    return sum(
+        time.clock_gettime(time.pthread_getcpuclockid(t.ident)) for t in threads if t.is_alive() and t.ident is not None
+    )
+
+
+def musicpi_threads() -> List[threading.Thread]:
+    """all threads but the test's own and the mockup mpd's"""
+    return [
+        t
+        for t in threading.enumerate()
+        if t is not threading.current_thread() and not any(n in t.name for n in ["serve_forever", "process_request"])
+    ]
+
+
+def distribution(seconds: List[float]) -> Dict[str, float]:
+    return {
+        "mean_ms": round(mean(seconds) * 1000, 3),
+        "p50_ms": round(median(seconds) * 1000, 3),
+        "max_ms": round(max(seconds) * 1000, 3),
+    }
+
+
+@pytest.mark.parametrize("mainloop", MAINLOOPS)
+def test_button_press_toggles_led_and_display(
+    mainloop: str, run_music_pi: RunMusicPi, paused_mpd: MockupMpdServer, led_watcher: LedWatcher
+) -> None:
+    with run_music_pi(mainloop) as (_, hmi):
+        press_button(hmi, led_watcher)
+    assert paused_mpd.state == "play"
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("mainloop", MAINLOOPS)
+def test_benchmark_mainloop(
+    mainloop: str,
+    run_music_pi: RunMusicPi,
+    paused_mpd: MockupMpdServer,
+    led_watcher: LedWatcher,
+    benchmark_results: Dict[str, Any],
+) -> None:
+    with run_music_pi(mainloop) as (music_pi, hmi):
+        latencies = [press_button(hmi, led_watcher) for _ in range(PRESSES)]
+
+        threads = musicpi_threads()
+        iterations, cpu, commands = music_pi.loop_iterations, thread_cpu_time(threads), paused_mpd.commands_total()
+        start = time.monotonic()
+        time.sleep(STEADY_STATE_WINDOW)
+        elapsed = time.monotonic() - start
+        iterations = music_pi.loop_iterations - iterations
+        cpu = thread_cpu_time(threads) - cpu
+        commands = paused_mpd.commands_total() - commands
+
+    result = {
+        "button_to_led": distribution([latency["led"] for latency in latencies]),
+        "button_to_frame": distribution([latency["frame"] for latency in latencies]),
+        "loop_iterations_per_second": round(iterations / elapsed, 1),
+        "cpu_per_iteration_us": round(cpu / iterations * 1e6, 1) if iterations else None,
+        "cpu_percent": round(cpu / elapsed * 100, 2),
+        "mpd_commands_per_second": round(commands / elapsed, 1),
+    }
+    benchmark_results[f"mainloop_{mainloop}"] = result
+    print(f"\n{mainloop}: {result}")
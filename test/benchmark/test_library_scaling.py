@@ -0,0 +1,120 @@
+import time
+import tracemalloc
+from statistics import median
+from typing import Any, Callable, Dict, Generator, List
+
+import pytest
+from pytest_mock import MockerFixture
+
+from musicpi.library import LibraryIndex, TagValue, Track
+from musicpi.mpd_wrapper import Mpd
+from test.mockups.mockupmpd import MockupMpdServer, generate_library
+
+SIZES = [1_000, 10_000, 100_000]
+REPETITIONS = 5
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size}_songs")
+def large_mockup_mpd(request: pytest.FixtureRequest) -> Generator[MockupMpdServer, None, None]:
+    with MockupMpdServer(generate_library(request.param)) as server:
+        yield server
+
+
+@pytest.fixture
+def mpd_without_index(large_mockup_mpd: MockupMpdServer, mocker: MockerFixture) -> Generator[Mpd, None, None]:
+    """answers every query with mpd's list command, like before the library index existed"""
+    mpd = Mpd(large_mockup_mpd.cfg)
+    mocker.patch.object(mpd, "_library_index", return_value=None)
+    yield mpd
+    mpd.disconnect()
+
+
+@pytest.fixture
+def mpd_with_index(large_mockup_mpd: MockupMpdServer) -> Generator[Mpd, None, None]:
+    mpd = Mpd(large_mockup_mpd.cfg)
+    mpd.refresh_library()
+    assert mpd.library.wait_until_built(timeout=120)
+    yield mpd
+    mpd.disconnect()
+
+
+def measure(call: Callable[[], Any], repetitions: int = REPETITIONS) -> Dict[str, float]:
+    """median wall time and the peak of memory allocated during one call. The peak includes the in-process server."""
+    durations = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        call()
+        durations.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"median_ms": round(median(durations) * 1000, 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def queries(mpd: Mpd) -> Dict[str, Callable[[], Any]]:
+    artist = mpd.get_artists()[len(mpd.get_artists()) // 2]
+    return {
+        "get_artists": mpd.get_artists,
+        "artist_startswith": lambda: mpd.artist_startswith("M"),
+        "get_albums_of_artist": lambda: mpd.get_albums_of_artist(artist),
+        "add_tracks": lambda: mpd.add_tracks(artist),
+    }
+
+
+def record(results: Dict[str, Any], path: str, songs: int, measured: Dict[str, Dict[str, float]]) -> None:
+    scaling = results.setdefault("library_scaling", {})
+    for query, numbers in measured.items():
+        scaling.setdefault(f"{path}.{query}", {})[str(songs)] = numbers
+        print(f"\n{songs:>7} songs, {path:>10}: {query:<22} {numbers}", end="")
+
+
+@pytest.mark.performance
+def test_benchmark_queries_without_index(
+    large_mockup_mpd: MockupMpdServer, mpd_without_index: Mpd, benchmark_results: Dict[str, Any]
+) -> None:
+    songs = len(large_mockup_mpd.library)
+    measured = {name: measure(call) for name, call in queries(mpd_without_index).items()}
+    record(benchmark_results, "list", songs, measured)
+
+
+@pytest.mark.performance
+def test_benchmark_queries_with_index(
+    large_mockup_mpd: MockupMpdServer, mpd_with_index: Mpd, benchmark_results: Dict[str, Any]
+) -> None:
+    songs = len(large_mockup_mpd.library)
+    measured = {name: measure(call) for name, call in queries(mpd_with_index).items()}
+    record(benchmark_results, "index", songs, measured)
+
+
+@pytest.mark.performance
+def test_benchmark_add_files(large_mockup_mpd: MockupMpdServer, benchmark_results: Dict[str, Any]) -> None:
+    """queues the whole library file by file"""
+    files = [song["file"] for song in large_mockup_mpd.library]
+    mpd = Mpd(large_mockup_mpd.cfg)
+    try:
+        round_trips = large_mockup_mpd.command_counts["command_list_ok_begin"]
+        measured = measure(lambda: mpd.add_files(files), repetitions=1)
+        # measure() queues the files twice, once timed and once traced
+        measured["round_trips"] = (large_mockup_mpd.command_counts["command_list_ok_begin"] - round_trips) / 2
+    finally:
+        large_mockup_mpd.queue.clear()
+        mpd.disconnect()
+    record(benchmark_results, "commandlist", len(files), {"add_files": measured})
+
+
+@pytest.mark.performance
+def test_benchmark_pure_functions(large_mockup_mpd: MockupMpdServer, benchmark_results: Dict[str, Any]) -> None:
+    songs: List[Dict[str, TagValue]] = [{k.lower(): v for k, v in song.items()} for song in large_mockup_mpd.library]
+    tracks = [Track.from_dict(song) for song in songs]
+    # list results of grouped queries are a mix of single values and lists of values
+    query_result: List[Any] = [
+        [song["title"], song["album"]] if i % 3 else song["title"] for i, song in enumerate(songs)
+    ]
+    measured = {
+        "flatten_list": measure(lambda: Mpd.flatten_list(query_result)),
+        "build_library_index": measure(lambda: LibraryIndex(tracks, db_update=1), repetitions=1),
+    }
+    record(benchmark_results, "in-memory", len(songs), measured)
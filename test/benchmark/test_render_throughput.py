@@ -0,0 +1,60 @@
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from PIL import Image, ImageDraw
+
+from musicpi.hmi.framebuffer import Framebuffer
+from musicpi.hmi.hmi_x86_64 import HmiX86X64
+from musicpi.hmi.render_worker import RenderWorker
+
+FRAMES = 2000
+
+
+def frames() -> List[Image.Image]:
+    """frames that all differ, so nothing on the way can skip one"""
+    result: List[Image.Image] = []
+    for n in range(64):
+        image = Image.new(mode="1", size=(128, 64), color=0)
+        ImageDraw.Draw(image).rectangle((n, 0, n + 63, n), fill=255)
+        result.append(image)
+    return result
+
+
+@pytest.mark.performance
+def test_benchmark_render_throughput(tmp_path: Path, benchmark_results: Dict[str, Any]) -> None:
+    """frames per second through the render worker into the framebuffer, i.e. without the i2c bus of the oled"""
+    hmi = HmiX86X64({"framebuffer": {"path": str(tmp_path / "musicpi.fb")}})
+    images = frames()
+    start = time.perf_counter()
+    for n in range(FRAMES):
+        hmi.framebuffer.write(images[n % len(images)])
+    write = FRAMES / (time.perf_counter() - start)
+
+    worker = RenderWorker(hmi.show_on_display, max_fps=1_000_000)
+    worker.start()
+    start = time.perf_counter()
+    try:
+        for n in range(FRAMES):
+            worker.submit(images[n % len(images)])
+            time.sleep(0)
+    finally:
+        worker.stop()
+    elapsed = time.perf_counter() - start
+    stats = worker.stats
+
+    with Framebuffer.open(hmi.framebuffer.path) as reader:
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            reader.read()
+        read = FRAMES / (time.perf_counter() - start)
+
+    results = {
+        "framebuffer_writes_per_s": round(write),
+        "framebuffer_reads_per_s": round(read),
+        "worker_frames_per_s": round(stats.frames_shown / elapsed),
+        "worker_frames_dropped": stats.frames_dropped,
+    }
+    benchmark_results["render_throughput"] = results
+    print(f"\nrender throughput: {results}")
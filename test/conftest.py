@@ -1,8 +1,18 @@
 import logging
 import sys
+from platform import machine
+from typing import List
 
 import pytest
 
+pytest_plugins = ["test.fixtures"]
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--benchmark-json", default=None, help="file to write the results of the performance tests to, as json"
+    )
+
 
 def pytest_configure() -> None:
     stdout_handler = logging.StreamHandler(sys.stdout)
@@ -13,3 +23,12 @@ def pytest_configure() -> None:
         datefmt="%m.%d.%Y %H:%M:%S",
         handlers=[stdout_handler, file_handler],
     )
+
+
+def pytest_collection_modifyitems(items: List[pytest.Item]) -> None:
+    if machine() in ["armv6l", "armv7l"]:
+        return
+    not_on_raspi = pytest.mark.skip(reason="only working on raspi")
+    for item in items:
+        if "onraspi" in item.keywords:
+            item.add_marker(not_on_raspi)
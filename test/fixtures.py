@@ -1,8 +1,24 @@
-from typing import Generator
+from __future__ import annotations
+
+import json
+import platform
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from threading import Thread
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Dict, Generator, Iterator, List, Optional, Tuple
 
 import pytest
 
 from musicpi.mpd_wrapper import Mpd
+from musicpi.startup import StartupReport
+from test.mockups.mockuphmi import MockupHmi, make_icons
+from test.mockups.mockupmpd import MockupMpdServer, Song, make_song
+
+if TYPE_CHECKING:
+    from musicpi.musicpi_application import MusicPi
+
+RunMusicPi = Callable[..., ContextManager[Tuple["MusicPi", MockupHmi]]]
 
 
 @pytest.fixture
@@ -11,3 +27,84 @@ def mpd() -> Generator[Mpd, None, None]:
     assert mpd.stats().artists > 0
     assert mpd.stats().albums > 0
     yield mpd
+
+
+def small_library() -> List[Song]:
+    return [
+        make_song("Abba", "Arrival", "Dancing Queen", 2, date=1976),
+        make_song("Abba", "Arrival", "Money, Money, Money", 8, date=1976),
+        make_song("Abba", "Waterloo", "Waterloo", 1, date=1974),
+        make_song("AC/DC", "Back in Black", "Hells Bells", 1, date=1980),
+        make_song("Beatles", "Abbey Road", "Come Together", 1, date=1969),
+        make_song("Nirvana", "Nevermind", "Smells Like Teen Spirit", 1, date=1991, albumartist=False),
+    ]
+
+
+@pytest.fixture
+def mockup_mpd() -> Generator[MockupMpdServer, None, None]:
+    with MockupMpdServer(small_library()) as server:
+        yield server
+
+
+@pytest.fixture
+def mockup_mpd_with_socket(tmp_path: Path) -> Generator[MockupMpdServer, None, None]:
+    with MockupMpdServer(small_library(), unix_socket=tmp_path / "mpd.socket") as server:
+        yield server
+
+
+@pytest.fixture
+def mpd_on_mockup(mockup_mpd: MockupMpdServer) -> Generator[Mpd, None, None]:
+    mpd = Mpd(mockup_mpd.cfg)
+    yield mpd
+    mpd.disconnect()
+
+
+@pytest.fixture
+def icons(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """placeholder icons, the png files aren't part of the repository"""
+    import musicpi.hmi.icons
+
+    directory = tmp_path / "icons"
+    directory.mkdir()
+    make_icons(str(directory))
+    monkeypatch.setattr(musicpi.hmi.icons, "ICON_DIRECTORY", directory)
+    return directory
+
+
+@pytest.fixture
+def run_music_pi(mockup_mpd: MockupMpdServer, icons: Path) -> RunMusicPi:
+    """runs MusicPi with the given mainloop and further config on a MockupHmi and the mockup mpd until the with-block is
+    left"""
+
+    @contextmanager
+    def run(mainloop: str, startup: Optional[StartupReport] = None, **cfg: Any) -> Iterator[Tuple[MusicPi, MockupHmi]]:
+        from musicpi.musicpi_application import MusicPi
+
+        hmi = MockupHmi()
+        music_pi = MusicPi(hmi, {"mainloop": mainloop, "mpd": mockup_mpd.cfg, "max_fps": 30, **cfg}, startup)
+        thread = Thread(target=music_pi.start, name="musicpi")
+        thread.start()
+        try:
+            hmi.last_frame(timeout=5)
+            yield music_pi, hmi
+        finally:
+            music_pi.stop()
+            thread.join(timeout=5)
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request: pytest.FixtureRequest) -> Generator[Dict[str, Any], None, None]:
+    """collects benchmark results and writes them to the file given with --benchmark-json"""
+    results: Dict[str, Any] = {}
+    yield results
+    path = request.config.getoption("benchmark_json")
+    if path and results:
+        report = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+            "results": results,
+        }
+        Path(path).write_text(json.dumps(report, indent=2))
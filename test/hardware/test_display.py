@@ -1,10 +1,13 @@
 import os
 import sys
-from typing import Generator
+from typing import Generator, List, Tuple
 
 import pytest
+from luma.core.interface.serial import noop
+from luma.oled.device import sh1106
+from PIL import Image, ImageDraw
 
-from musicpi.hardware.display import Display
+from musicpi.hardware.display import COLUMN_OFFSET, Display, to_pages
 
 
 @pytest.fixture
@@ -15,3 +18,70 @@ def display() -> Generator[Display, None, None]:
 @pytest.mark.onraspi
 def test_display_init(display: Display) -> None:
     display.write_teststuff_to_displays()
+
+
+class RecordingSh1106(sh1106):
+    def __init__(self) -> None:
+        self.transfers: List[Tuple[List[int], List[int]]] = []
+        super().__init__(noop())
+        self.transfers.clear()
+
+    def command(self, *cmd: int) -> None:
+        self.transfers.append((list(cmd), []))
+
+    def data(self, data: List[int]) -> None:
+        self.transfers[-1][1].extend(data)
+
+
+@pytest.fixture
+def recording_device() -> RecordingSh1106:
+    return RecordingSh1106()
+
+
+@pytest.fixture
+def frame() -> Image.Image:
+    image = Image.new(mode="1", size=(128, 64), color=0)
+    ImageDraw.Draw(image).text((3, 20), "Hi There", fill="white")
+    return image
+
+
+def test_pages_match_luma_layout(recording_device: RecordingSh1106, frame: Image.Image) -> None:
+    recording_device.display(frame)
+    luma_pages = [bytes(data) for _, data in recording_device.transfers]
+    assert to_pages(frame) == luma_pages
+
+
+def test_unchanged_frame_is_skipped(recording_device: RecordingSh1106, frame: Image.Image) -> None:
+    display = Display(recording_device)
+    display.show(frame)
+    assert len(recording_device.transfers) == 8
+    display.show(frame.copy())
+    assert len(recording_device.transfers) == 8
+    assert display.transfer_stats.frames_sent == 1
+    assert display.transfer_stats.frames_skipped == 1
+
+
+def test_only_changed_columns_of_changed_pages_are_sent(recording_device: RecordingSh1106, frame: Image.Image) -> None:
+    display = Display(recording_device)
+    display.show(frame)
+    recording_device.transfers.clear()
+    bytes_after_first_frame = display.transfer_stats.bytes_sent
+
+    frame.putpixel((100, 50), 1)
+    frame.putpixel((110, 52), 1)
+    display.show(frame)
+
+    assert len(recording_device.transfers) == 1
+    command, data = recording_device.transfers[0]
+    column = 100 + COLUMN_OFFSET
+    assert command == [0xB0 + 6, column & 0x0F, 0x10 | (column >> 4)]
+    assert data == [0b00000100] + [0] * 9 + [0b00010000]
+    assert display.transfer_stats.bytes_sent - bytes_after_first_frame == 3 + 11
+
+
+def test_invalidate_forces_full_frame(recording_device: RecordingSh1106, frame: Image.Image) -> None:
+    display = Display(recording_device)
+    display.show(frame)
+    display.invalidate()
+    display.show(frame)
+    assert display.transfer_stats.pages_sent == 16
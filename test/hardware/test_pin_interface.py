@@ -0,0 +1,44 @@
+from queue import Queue
+
+import pytest
+
+from musicpi.hardware.button_events import ButtonEvent, ButtonEventType
+from musicpi.hardware.pin_interface import Button, PinInterface, Pins, RotaryEncoder
+
+
+@pytest.fixture
+def button() -> Button:
+    button = Button()
+    button.configure(debounce=0.01, long_press=10)
+    return button
+
+
+def test_edges_are_queued_as_button_events(button: Button) -> None:
+    from RPi import GPIO
+
+    events: "Queue[ButtonEvent]" = button.events
+    GPIO.set_input(Pins.buttons["button"], GPIO.LOW)
+    assert button.pressed()
+    press = events.get(timeout=1)
+    assert (press.button, press.type) == ("button", ButtonEventType.PRESS)
+    GPIO.set_input(Pins.buttons["button"], GPIO.HIGH)
+    assert events.get(timeout=1).type is ButtonEventType.RELEASE
+    GPIO.set_input(Pins.buttons["enc_sw"], GPIO.LOW)
+    GPIO.set_input(Pins.buttons["enc_sw"], GPIO.HIGH)
+    assert [events.get(timeout=1).button for _ in range(2)] == ["enc_sw", "enc_sw"]
+    assert PinInterface.global_instance().button_events.queue is events
+
+
+def test_quadrature_edges_become_encoder_deltas() -> None:
+    from RPi import GPIO
+
+    encoder = RotaryEncoder()
+    encoder.take_delta()
+    a, b = Pins.enc["a"], Pins.enc["b"]
+    for _ in range(3):
+        for pin, level in [(a, GPIO.LOW), (b, GPIO.LOW), (a, GPIO.HIGH), (b, GPIO.HIGH)]:
+            GPIO.set_input(pin, level)
+    delta = encoder.take_delta()
+    assert delta is not None
+    assert abs(delta.detents) == 3
+    assert encoder.take_delta() is None
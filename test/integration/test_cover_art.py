@@ -0,0 +1,158 @@
+import io
+import time
+from pathlib import Path
+from threading import Event
+from typing import Generator
+
+import pytest
+from mpd import ProtocolError
+from PIL import Image
+from pytest_mock import MockerFixture
+
+from musicpi.cover_art import CoverArt, ThumbnailCache, fetch_cover_art
+from musicpi.mpd_wrapper import MpdWrapper
+from test.fixtures import RunMusicPi
+from test.mockups.mockupmpd import BINARY_CHUNK_SIZE, MockupMpdServer
+from test.unit.test_cover_art import jpeg
+
+ARRIVAL = Path("Abba/Arrival/02 Dancing Queen.flac")
+ARRIVAL_TOO = Path("Abba/Arrival/08 Money, Money, Money.flac")
+ABBEY_ROAD = Path("Beatles/Abbey Road/01 Come Together.flac")
+BACK_IN_BLACK = Path("AC/DC/Back in Black/01 Hells Bells.flac")
+
+
+@pytest.fixture
+def mockup_mpd_with_covers(mockup_mpd: MockupMpdServer) -> MockupMpdServer:
+    mockup_mpd.covers["Abba/Arrival"] = jpeg(size=1200)
+    mockup_mpd.pictures[str(ABBEY_ROAD)] = jpeg()
+    return mockup_mpd
+
+
+@pytest.fixture
+def wrapper(mockup_mpd_with_covers: MockupMpdServer) -> Generator[MpdWrapper, None, None]:
+    wrapper = MpdWrapper(mockup_mpd_with_covers.cfg)
+    yield wrapper
+    wrapper.disconnect()
+
+
+def test_fetch_in_chunks(mockup_mpd_with_covers: MockupMpdServer, wrapper: MpdWrapper) -> None:
+    cover = mockup_mpd_with_covers.covers["Abba/Arrival"]
+    assert len(cover) > BINARY_CHUNK_SIZE
+    with wrapper as client:
+        assert fetch_cover_art(client, str(ARRIVAL)) == cover
+    assert mockup_mpd_with_covers.command_counts["albumart"] == len(cover) // BINARY_CHUNK_SIZE + 1
+
+
+def test_fetch_falls_back_to_embedded_picture(mockup_mpd_with_covers: MockupMpdServer, wrapper: MpdWrapper) -> None:
+    with wrapper as client:
+        assert fetch_cover_art(client, str(ABBEY_ROAD)) == mockup_mpd_with_covers.pictures[str(ABBEY_ROAD)]
+        assert fetch_cover_art(client, str(BACK_IN_BLACK)) is None
+
+
+@pytest.fixture
+def ready() -> Event:
+    return Event()
+
+
+@pytest.fixture
+def cover_art(wrapper: MpdWrapper, tmp_path: Path, ready: Event) -> Generator[CoverArt, None, None]:
+    cover_art = CoverArt(wrapper, ThumbnailCache(tmp_path), on_ready=ready.set)
+    cover_art.start()
+    yield cover_art
+    cover_art.stop()
+
+
+def wait_for_thumbnail(cover_art: CoverArt, ready: Event, file: Path) -> None:
+    ready.clear()
+    assert cover_art.get(file) is None
+    assert ready.wait(timeout=2)
+
+
+def test_thumbnails_are_made_in_the_background(cover_art: CoverArt, ready: Event) -> None:
+    wait_for_thumbnail(cover_art, ready, ARRIVAL)
+    thumbnail = cover_art.get(ARRIVAL)
+    assert thumbnail is not None and thumbnail.mode == "1"
+    assert cover_art.get(ARRIVAL_TOO) is thumbnail
+    wait_for_thumbnail(cover_art, ready, BACK_IN_BLACK)
+    assert cover_art.get(BACK_IN_BLACK) is None
+
+
+def test_album_is_fetched_once_while_skipping_through_it(
+    mockup_mpd_with_covers: MockupMpdServer, wrapper: MpdWrapper, ready: Event
+) -> None:
+    mockup_mpd_with_covers.response_delay = 0.2
+    cover_art = CoverArt(wrapper, on_ready=ready.set)  # without a disk cache, every fetch goes to mpd
+    cover_art.start()
+    try:
+        assert cover_art.get(ARRIVAL) is None
+        time.sleep(0.05)  # the worker is fetching by now
+        assert cover_art.get(ARRIVAL_TOO) is None
+        assert ready.wait(timeout=3)
+        time.sleep(0.5)  # long enough for a second fetch to show up
+    finally:
+        cover_art.stop()
+    cover = mockup_mpd_with_covers.covers["Abba/Arrival"]
+    assert mockup_mpd_with_covers.command_counts["albumart"] == len(cover) // BINARY_CHUNK_SIZE + 1
+
+
+@pytest.mark.parametrize("error", [ProtocolError("Got unexpected return value"), RuntimeError("bug")])
+def test_worker_survives_errors(cover_art: CoverArt, ready: Event, mocker: MockerFixture, error: Exception) -> None:
+    fetch = mocker.patch("musicpi.cover_art.fetch_cover_art", side_effect=error)
+    assert cover_art.get(ARRIVAL) is None
+    deadline = time.monotonic() + 2
+    while not fetch.called and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert cover_art.is_alive()
+    mocker.stop(fetch)
+    wait_for_thumbnail(cover_art, ready, ARRIVAL)
+    assert cover_art.get(ARRIVAL) is not None
+
+
+def corrupt_png() -> bytes:
+    buffer = io.BytesIO()
+    Image.effect_noise((256, 256), 64).save(buffer, "PNG")  # noise doesn't compress, so there are several IDAT chunks
+    data = bytearray(buffer.getvalue())
+    second_idat = data.index(b"IDAT", data.index(b"IDAT") + 4)
+    data[second_idat : second_idat + 4] = bytes(4)  # pillow raises SyntaxError("broken PNG file") while decoding
+    return bytes(data)
+
+
+def test_corrupt_cover_counts_as_missing(
+    mockup_mpd_with_covers: MockupMpdServer, cover_art: CoverArt, ready: Event
+) -> None:
+    mockup_mpd_with_covers.pictures[str(BACK_IN_BLACK)] = corrupt_png()
+    wait_for_thumbnail(cover_art, ready, BACK_IN_BLACK)
+    assert cover_art.get(BACK_IN_BLACK) is None
+    assert cover_art.is_alive()
+    wait_for_thumbnail(cover_art, ready, ARRIVAL)
+    assert cover_art.get(ARRIVAL) is not None
+
+
+def test_thumbnails_come_from_disk_cache(
+    mockup_mpd_with_covers: MockupMpdServer, wrapper: MpdWrapper, cover_art: CoverArt, ready: Event, tmp_path: Path
+) -> None:
+    wait_for_thumbnail(cover_art, ready, ARRIVAL)
+    fetches = mockup_mpd_with_covers.command_counts["albumart"]
+    ready = Event()
+    restarted = CoverArt(wrapper, ThumbnailCache(tmp_path), on_ready=ready.set)
+    restarted.start()
+    try:
+        assert restarted.get(ARRIVAL) is None
+        assert ready.wait(timeout=2)
+        assert restarted.get(ARRIVAL) is not None
+    finally:
+        restarted.stop()
+    assert mockup_mpd_with_covers.command_counts["albumart"] == fetches
+
+
+def test_songinfo_shows_cover(mockup_mpd_with_covers: MockupMpdServer, run_music_pi: RunMusicPi) -> None:
+    mockup_mpd_with_covers.queue = [song for song in mockup_mpd_with_covers.library if song["file"] == str(ARRIVAL)]
+    mockup_mpd_with_covers.state = "play"
+    with run_music_pi("idle") as (_, hmi):
+        hmi.last_frame(timeout=2)
+        started, first_frame = hmi.frames[0]
+        assert Image.frombytes("1", (128, 64), first_frame).crop((96, 24, 128, 56)).getbbox() is None
+        _, with_cover = hmi.wait_for_frame(after=started, different_from=first_frame, timeout=2)
+    cover = Image.frombytes("1", (128, 64), with_cover).crop((96, 24, 128, 56))
+    assert cover.getbbox() is not None
@@ -0,0 +1,124 @@
+from pathlib import Path
+from time import perf_counter
+
+import pytest
+from pytest_mock import MockerFixture
+
+from musicpi.library import Library, LibraryIndex, PrefixMatch
+from musicpi.library_cache import LibraryCache
+from musicpi.mpd_wrapper import Mpd, MpdWrapper
+from test.mockups.mockupmpd import MockupMpdError, MockupMpdServer, generate_library, make_song
+
+
+def test_queries_are_served_from_index_once_built(mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd) -> None:
+    direct = mpd_on_mockup.get_artists()
+    direct_albums = mpd_on_mockup.get_albums_of_artist("Nirvana")
+    assert direct_albums == ["Nevermind"]
+    assert mpd_on_mockup.library.wait_until_built(timeout=2)
+    mockup_mpd.command_counts.clear()
+
+    assert mpd_on_mockup.get_artists() == direct
+    assert mpd_on_mockup.get_albums_of_artist("Nirvana") == direct_albums
+    assert mpd_on_mockup.get_albums_of_artist("Abba") == ["Waterloo", "Arrival"]
+    assert mpd_on_mockup.get_track_of_album_of_artist("Abba", "Arrival") == ["Dancing Queen", "Money, Money, Money"]
+    assert mpd_on_mockup.get_tracks_of_artist("Beatles") == ["Come Together"]
+    assert mockup_mpd.command_counts["list"] == 0
+
+
+def test_index_is_rebuilt_when_db_update_changes(
+    mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd, mocker: MockerFixture
+) -> None:
+    mpd_on_mockup.refresh_library()
+    assert mpd_on_mockup.library.wait_until_built(timeout=2)
+    mpd_on_mockup.refresh_library()
+    assert mockup_mpd.command_counts["search"] == 1
+
+    mockup_mpd.library.append(make_song("Queen", "Jazz", "Bicycle Race", 3))
+    mockup_mpd.db_update += 1
+    mocker.patch("musicpi.mpd_wrapper.LIBRARY_CHECK_INTERVAL", -1)
+    mpd_on_mockup.get_artists()
+    assert mpd_on_mockup.library.wait_until_built(timeout=2)
+    assert "Queen" in mpd_on_mockup.get_artists()
+
+
+def test_scan_is_paged(mockup_mpd: MockupMpdServer, mocker: MockerFixture) -> None:
+    mocker.patch("musicpi.library.LIBRARY_SCAN_PAGE_SIZE", 2)
+    library = Library(MpdWrapper(mockup_mpd.cfg))
+    library.refresh(1)
+    assert library.wait_until_built(timeout=2)
+    assert library.index is not None
+    assert len(library.index) == len(mockup_mpd.library)
+    assert mockup_mpd.command_counts["search"] == 4  # three full pages and an empty one
+
+
+def test_failed_scan_doesnt_block_later_builds(mockup_mpd: MockupMpdServer, mocker: MockerFixture) -> None:
+    def search_fails(*args: str) -> None:
+        raise MockupMpdError(50, "search", "unsupported window")
+
+    library = Library(MpdWrapper(mockup_mpd.cfg))
+    search = mocker.patch.object(mockup_mpd, "_cmd_search", side_effect=search_fails)
+    library.refresh(1)
+    assert library.wait_until_built(timeout=2)
+    assert library.index is None
+
+    mocker.stop(search)
+    library.refresh(2)
+    assert library.wait_until_built(timeout=2)
+    assert library.index is not None
+    assert len(library.index) == len(mockup_mpd.library)
+
+
+def test_artist_prefix_queries(mpd_on_mockup: Mpd) -> None:
+    assert mpd_on_mockup.artist_startswith("a") == ["Abba", "AC/DC"]
+    assert mpd_on_mockup.match_artist_prefix("be") == PrefixMatch(offset=2, count=1)
+    assert mpd_on_mockup.get_artists()[mpd_on_mockup.jump_to_artist("b")] == "Beatles"
+
+
+def test_cached_index_is_available_without_asking_mpd(mockup_mpd: MockupMpdServer, tmp_path: Path) -> None:
+    cache = LibraryCache(tmp_path / "library.sqlite")
+    library = Library(MpdWrapper(mockup_mpd.cfg), cache)
+    library.refresh(mockup_mpd.db_update)
+    assert library.wait_until_built(timeout=2)
+    mockup_mpd.command_counts.clear()
+
+    restarted = Library(MpdWrapper(mockup_mpd.cfg), cache)
+    assert restarted.index is not None
+    assert restarted.index.artists() == ["Abba", "AC/DC", "Beatles", "Nirvana"]
+    restarted.refresh(mockup_mpd.db_update)
+    assert mockup_mpd.commands_total() == 0
+
+
+def test_outdated_cache_is_rebuilt_and_rewritten(mockup_mpd: MockupMpdServer, tmp_path: Path) -> None:
+    cache = LibraryCache(tmp_path / "library.sqlite")
+    cache.save(LibraryIndex([], db_update=mockup_mpd.db_update - 1))
+    library = Library(MpdWrapper(mockup_mpd.cfg), cache)
+    assert library.index is not None and len(library.index) == 0
+
+    library.refresh(mockup_mpd.db_update)
+    assert library.wait_until_built(timeout=2)
+    assert len(library.index) == len(mockup_mpd.library)
+    cached = cache.load()
+    assert cached is not None
+    assert (len(cached), cached.db_update) == (len(mockup_mpd.library), mockup_mpd.db_update)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("n_songs", [10000, 50000])
+def test_benchmark_cold_start_with_and_without_cache(n_songs: int, tmp_path: Path) -> None:
+    with MockupMpdServer(generate_library(n_songs)) as server:
+        start = perf_counter()
+        library = Library(MpdWrapper(server.cfg), LibraryCache(tmp_path / "library.sqlite"))
+        library.refresh(server.db_update)
+        assert library.wait_until_built(timeout=120)
+        assert library.index is not None
+        library.index.artists()
+        without_cache = perf_counter() - start
+
+        start = perf_counter()
+        restarted = Library(MpdWrapper(server.cfg), LibraryCache(tmp_path / "library.sqlite"))
+        assert restarted.index is not None
+        restarted.index.artists()
+        with_cache = perf_counter() - start
+
+    print(f"cold start with {n_songs} songs: {without_cache:.2f}s from mpd, {with_cache:.2f}s from cache")
+    assert with_cache < without_cache
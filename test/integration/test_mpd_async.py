@@ -0,0 +1,144 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, List
+
+import pytest
+from mpd import ConnectionError
+from pytest_mock import MockerFixture
+
+from musicpi.mpd_async import AsyncMpd
+from musicpi.mpd_idle import IDLE_SUBSYSTEMS
+from musicpi.mpd_wrapper import PlayerSnapshot, Status, Transport
+from test.mockups.mockupmpd import MockupMpdServer
+
+
+def run(mockup_mpd: MockupMpdServer, test: Callable[[AsyncMpd], Awaitable[None]]) -> None:
+    async def main() -> None:
+        mpd = AsyncMpd(mockup_mpd.cfg)
+        try:
+            await test(mpd)
+        finally:
+            mpd.disconnect()
+
+    asyncio.run(main())
+
+
+def test_status_and_queries(mockup_mpd: MockupMpdServer) -> None:
+    async def test(mpd: AsyncMpd) -> None:
+        assert isinstance(await mpd.status(), Status)
+        assert await mpd.get_artists() == ["Abba", "AC/DC", "Beatles", "Nirvana"]
+        assert await mpd.get_albums_of_artist("Abba") == ["Waterloo", "Arrival"]
+        assert await mpd.get_track_of_album_of_artist("Abba", "Arrival") == ["Dancing Queen", "Money, Money, Money"]
+        assert mpd.transport is Transport.TCP
+
+    run(mockup_mpd, test)
+    assert mockup_mpd.connections == 1
+
+
+def test_add_tracks(mockup_mpd: MockupMpdServer) -> None:
+    async def test(mpd: AsyncMpd) -> None:
+        await mpd.add_tracks("Abba", "Arrival")
+        await mpd.search_add("together")
+
+    run(mockup_mpd, test)
+    assert [song["Title"] for song in mockup_mpd.queue] == ["Dancing Queen", "Money, Money, Money", "Come Together"]
+
+
+def test_adding_isnt_retried_after_mpd_ran_it(mockup_mpd: MockupMpdServer) -> None:
+    async def test(mpd: AsyncMpd) -> None:
+        mockup_mpd.drop_after = {"findadd", "searchadd"}
+        with pytest.raises((ConnectionError, OSError)):
+            await mpd.add_tracks("Abba", "Arrival")
+        with pytest.raises((ConnectionError, OSError)):
+            await mpd.search_add("together")
+        mockup_mpd.drop_after = set()
+        assert isinstance(await mpd.status(), Status)
+
+    run(mockup_mpd, test)
+    assert [song["Title"] for song in mockup_mpd.queue] == ["Dancing Queen", "Money, Money, Money", "Come Together"]
+
+
+def test_snapshot_pipelines_its_requests(mockup_mpd: MockupMpdServer) -> None:
+    mockup_mpd.queue = mockup_mpd.library[:2]
+    mockup_mpd.state = "play"
+
+    async def test(mpd: AsyncMpd) -> None:
+        snapshot = await mpd.snapshot(with_stats=True)
+        assert isinstance(snapshot, PlayerSnapshot)
+        assert snapshot.status.playing
+        assert snapshot.song_info.title == "Dancing Queen"
+        assert snapshot.stats is not None and snapshot.stats.songs == 6
+
+    run(mockup_mpd, test)
+
+
+def test_timeout_leaves_connection_usable(mockup_mpd: MockupMpdServer) -> None:
+    async def test(mpd: AsyncMpd) -> None:
+        await mpd.status()
+        mockup_mpd.response_delay = 0.2
+        with pytest.raises(asyncio.TimeoutError):
+            await mpd.status(timeout=0.01)
+        mockup_mpd.response_delay = 0
+        assert isinstance(await mpd.status(), Status)
+
+    run(mockup_mpd, test)
+    assert mockup_mpd.connections == 1
+
+
+def test_cancelled_call_leaves_connection_usable(mockup_mpd: MockupMpdServer) -> None:
+    async def test(mpd: AsyncMpd) -> None:
+        mockup_mpd.response_delay = 0.1
+        pending = asyncio.ensure_future(mpd.get_artists())
+        await asyncio.sleep(0.02)
+        pending.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        mockup_mpd.response_delay = 0
+        assert await mpd.get_tracks_of_artist("Beatles") == ["Come Together"]
+
+    run(mockup_mpd, test)
+    assert mockup_mpd.connections == 1
+
+
+def test_slow_call_doesnt_block_other_tasks(mockup_mpd: MockupMpdServer) -> None:
+    ticks: List[int] = []
+
+    async def tick() -> None:
+        for n in range(5):
+            ticks.append(n)
+            await asyncio.sleep(0.01)
+
+    async def test(mpd: AsyncMpd) -> None:
+        mockup_mpd.response_delay = 0.2
+        ticker = asyncio.ensure_future(tick())
+        await mpd.status()
+        assert ticks == list(range(5))
+        await ticker
+
+    run(mockup_mpd, test)
+
+
+def test_reconnects_after_connection_loss(mockup_mpd: MockupMpdServer) -> None:
+    async def test(mpd: AsyncMpd) -> None:
+        await mpd.status()
+        mockup_mpd.drop_connections()
+        await asyncio.sleep(0.05)
+        assert isinstance(await mpd.status(), Status)
+
+    run(mockup_mpd, test)
+    assert mockup_mpd.connections == 2
+
+
+def test_idle_reports_all_subsystems_and_then_changes(mockup_mpd: MockupMpdServer, mocker: MockerFixture) -> None:
+    mocker.patch("musicpi.mpd_async.IDLE_RECONNECT_DELAY", 0.01)
+
+    async def test(mpd: AsyncMpd) -> None:
+        changes: AsyncIterator[List[str]] = mpd.idle()
+        assert await asyncio.wait_for(changes.__anext__(), 1) == list(IDLE_SUBSYSTEMS)
+        await mpd.pause()
+        assert await asyncio.wait_for(changes.__anext__(), 1) == ["player"]
+        mockup_mpd.drop_connections()
+        assert await asyncio.wait_for(changes.__anext__(), 1) == list(IDLE_SUBSYSTEMS)
+        mockup_mpd.notify("mixer")
+        assert await asyncio.wait_for(changes.__anext__(), 1) == ["mixer"]
+
+    run(mockup_mpd, test)
@@ -0,0 +1,103 @@
+import time
+from queue import Queue
+from threading import Event, Thread
+from typing import Generator, List, Set
+
+import pytest
+from mpd import MPDClient, ProtocolError
+from pytest_mock import MockerFixture
+
+from musicpi.mpd_idle import IDLE_SUBSYSTEMS, IdleListener
+from musicpi.mpd_wrapper import Mpd, MpdWrapper
+from test.mockups.mockupmpd import MockupMpdServer
+
+
+@pytest.fixture
+def events() -> "Queue[str]":
+    return Queue()
+
+
+@pytest.fixture
+def idle_listener(mockup_mpd: MockupMpdServer, events: "Queue[str]") -> Generator[IdleListener, None, None]:
+    listener = IdleListener(mockup_mpd.cfg, events)
+    listener.start()
+    assert {events.get(timeout=1) for _ in IDLE_SUBSYSTEMS} == set(IDLE_SUBSYSTEMS)
+    yield listener
+    listener.stop()
+
+
+def drain(events: "Queue[str]", expected: int) -> Set[str]:
+    return {events.get(timeout=1) for _ in range(expected)}
+
+
+def test_player_change_is_reported(idle_listener: IdleListener, events: "Queue[str]", mpd_on_mockup: Mpd) -> None:
+    mpd_on_mockup.pause()
+    assert drain(events, 1) == {"player"}
+
+
+def test_changes_of_other_subsystems_are_reported(
+    idle_listener: IdleListener, events: "Queue[str]", mockup_mpd: MockupMpdServer
+) -> None:
+    mockup_mpd.notify("mixer")
+    assert drain(events, 1) == {"mixer"}
+    mockup_mpd.notify("update")
+    mockup_mpd.notify("options")
+    assert drain(events, 1) == {"options"}
+
+
+def test_resyncs_after_connection_loss(
+    idle_listener: IdleListener, events: "Queue[str]", mockup_mpd: MockupMpdServer, mocker: MockerFixture
+) -> None:
+    mocker.patch("musicpi.mpd_idle.IDLE_RECONNECT_DELAY", 0.01)
+    mockup_mpd.drop_connections()
+    assert drain(events, len(IDLE_SUBSYSTEMS)) == set(IDLE_SUBSYSTEMS)
+    mockup_mpd.notify("playlist")
+    assert drain(events, 1) == {"playlist"}
+
+
+def test_stop_unblocks_pending_idle(mockup_mpd: MockupMpdServer, events: "Queue[str]") -> None:
+    listener = IdleListener(mockup_mpd.cfg, events)
+    listener.start()
+    events.get(timeout=1)
+    listener.stop()
+    assert not listener.is_alive()
+
+
+def test_resyncs_after_protocol_error(
+    idle_listener: IdleListener, events: "Queue[str]", mockup_mpd: MockupMpdServer, mocker: MockerFixture
+) -> None:
+    mocker.patch("musicpi.mpd_idle.IDLE_RECONNECT_DELAY", 0.01)
+    idle = MPDClient.idle
+    failures = [ProtocolError("Got unexpected return value")]
+
+    def fails_once(client: MPDClient, *subsystems: str) -> List[str]:
+        if failures:
+            raise failures.pop()
+        return idle(client, *subsystems)
+
+    mocker.patch.object(MPDClient, "idle", fails_once)
+    mockup_mpd.notify("mixer")
+    assert drain(events, 1) == {"mixer"}
+    assert drain(events, len(IDLE_SUBSYSTEMS)) == set(IDLE_SUBSYSTEMS)
+    mockup_mpd.notify("playlist")
+    assert drain(events, 1) == {"playlist"}
+
+
+def test_stop_before_connecting(mockup_mpd: MockupMpdServer, events: "Queue[str]", mocker: MockerFixture) -> None:
+    stopped = Event()
+    connect = MpdWrapper.connect
+
+    def connects_late(wrapper: MpdWrapper) -> None:
+        stopped.wait(timeout=1)
+        connect(wrapper)
+
+    mocker.patch.object(MpdWrapper, "connect", connects_late)
+    listener = IdleListener(mockup_mpd.cfg, events)
+    listener.start()
+    stopper = Thread(target=listener.stop, daemon=True)
+    stopper.start()
+    time.sleep(0.05)  # stop() has interrupted a socket that doesn't exist yet
+    stopped.set()
+    stopper.join(timeout=1)
+    assert not stopper.is_alive()
+    assert not listener.is_alive()
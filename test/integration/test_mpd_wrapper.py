@@ -0,0 +1,185 @@
+import socket
+from pathlib import Path
+from threading import Thread
+from time import perf_counter
+from typing import List, Tuple
+
+import pytest
+from mpd import ConnectionError, MPDClient
+from pytest_mock import MockerFixture
+
+from musicpi.mpd_wrapper import Mpd, PlayerSnapshot, Stats, Status, Transport
+from test.mockups.mockupmpd import MockupMpdServer, Song
+
+
+def test_connection_is_reused(mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd) -> None:
+    for _ in range(5):
+        mpd_on_mockup.status()
+        mpd_on_mockup.current_song()
+    assert mockup_mpd.connections == 1
+    assert mockup_mpd.command_counts["status"] == 5
+
+
+def test_reconnects_after_connection_loss(mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd) -> None:
+    mpd_on_mockup.status()
+    mockup_mpd.drop_connections()
+    assert isinstance(mpd_on_mockup.status(), Status)
+    assert mockup_mpd.connections == 2
+
+
+def test_pings_after_keepalive_interval(mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd, mocker: MockerFixture) -> None:
+    mpd_on_mockup.status()
+    mocker.patch("musicpi.mpd_wrapper.MPD_KEEPALIVE_INTERVAL", -1)
+    mpd_on_mockup.status()
+    assert mockup_mpd.command_counts["ping"] == 1
+    assert mockup_mpd.connections == 1
+
+
+def test_concurrent_access_from_threads(mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd) -> None:
+    errors: List[Exception] = []
+
+    def hammer() -> None:
+        try:
+            for _ in range(20):
+                mpd_on_mockup.status()
+                mpd_on_mockup.get_artists()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [Thread(target=hammer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert mockup_mpd.command_counts["status"] == 80
+
+
+@pytest.mark.performance
+def test_benchmark_per_call_latency(mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd) -> None:
+    calls = 500
+
+    start = perf_counter()
+    for _ in range(calls):
+        client = MPDClient()
+        client.connect(mockup_mpd.host, mockup_mpd.port)
+        Status.from_client(client)
+        client.close()
+        client.disconnect()
+    per_call_connection = (perf_counter() - start) / calls
+
+    start = perf_counter()
+    for _ in range(calls):
+        mpd_on_mockup.status()
+    persistent_connection = (perf_counter() - start) / calls
+
+    print(
+        f"status() latency: connect per call {per_call_connection * 1e6:.0f}us, "
+        f"persistent connection {persistent_connection * 1e6:.0f}us"
+    )
+    assert persistent_connection < per_call_connection
+
+
+def test_snapshot_in_single_round_trip(mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd) -> None:
+    mockup_mpd.queue = [song for song in mockup_mpd.library if song["Title"] == "Waterloo"]
+    mockup_mpd.state = "play"
+    snapshot = mpd_on_mockup.snapshot(with_stats=True)
+    assert isinstance(snapshot, PlayerSnapshot)
+    assert snapshot.status.playing
+    assert snapshot.song_info.title == "Waterloo"
+    assert isinstance(snapshot.stats, Stats)
+    assert snapshot.stats.songs == len(mockup_mpd.library)
+    assert mockup_mpd.command_counts["command_list_ok_begin"] == 1
+    assert mockup_mpd.command_counts["status"] == 1
+
+
+def test_snapshot_without_stats_on_empty_playlist(mpd_on_mockup: Mpd) -> None:
+    snapshot = mpd_on_mockup.snapshot()
+    assert snapshot.stats is None
+    assert not snapshot.status.playing
+    assert snapshot.song_info.title == "unknown"
+
+
+def titles(songs: List[Song]) -> List[str]:
+    return [song["Title"] for song in songs]
+
+
+def test_add_tracks_of_artist_album_and_title(mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd) -> None:
+    mpd_on_mockup.add_tracks("Abba")
+    assert titles(mockup_mpd.queue) == ["Dancing Queen", "Money, Money, Money", "Waterloo"]
+    mockup_mpd.queue.clear()
+    mpd_on_mockup.add_tracks("Abba", "Arrival")
+    mpd_on_mockup.add_tracks("Abba", track="Waterloo")
+    mpd_on_mockup.add_tracks("Abba", "Arrival", "Dancing Queen")
+    assert titles(mockup_mpd.queue) == ["Dancing Queen", "Money, Money, Money", "Waterloo", "Dancing Queen"]
+    assert mockup_mpd.command_counts["findadd"] == 4
+    assert mockup_mpd.command_counts["find"] == 0
+
+
+def test_search_add(mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd) -> None:
+    mpd_on_mockup.search_add("money")
+    mpd_on_mockup.search_add("ab", tag="album")
+    assert titles(mockup_mpd.queue) == ["Money, Money, Money", "Come Together"]
+
+
+def test_adding_isnt_retried_after_mpd_ran_it(mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd) -> None:
+    mockup_mpd.drop_after = {"findadd", "searchadd"}
+    with pytest.raises(ConnectionError):
+        mpd_on_mockup.add_tracks("Abba", "Arrival")
+    with pytest.raises(ConnectionError):
+        mpd_on_mockup.search_add("together")
+    assert titles(mockup_mpd.queue) == ["Dancing Queen", "Money, Money, Money", "Come Together"]
+    mockup_mpd.drop_after = set()
+    assert isinstance(mpd_on_mockup.status(), Status)
+
+
+def test_add_files_in_batches(mockup_mpd: MockupMpdServer, mpd_on_mockup: Mpd) -> None:
+    files = [song["file"] for song in mockup_mpd.library]
+    progress: List[Tuple[int, int]] = []
+    mpd_on_mockup.add_files(files, progress=lambda added, total: progress.append((added, total)), batch_size=2)
+    assert [song["file"] for song in mockup_mpd.queue] == files
+    assert progress == [(2, 6), (4, 6), (6, 6)]
+    assert mockup_mpd.command_counts["command_list_ok_begin"] == 3
+
+
+def test_prefers_unix_socket(mockup_mpd_with_socket: MockupMpdServer) -> None:
+    mpd = Mpd(mockup_mpd_with_socket.cfg)
+    mpd.status()
+    assert mpd.transport == Transport.UNIX
+    mpd.disconnect()
+
+
+def test_uses_tcp_without_unix_socket(mpd_on_mockup: Mpd) -> None:
+    mpd_on_mockup.status()
+    assert mpd_on_mockup.transport == Transport.TCP
+
+
+def test_falls_back_to_tcp_on_dead_unix_socket(mockup_mpd: MockupMpdServer, tmp_path: Path) -> None:
+    dead_socket = tmp_path / "dead.socket"
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.bind(str(dead_socket))
+        mpd = Mpd({**mockup_mpd.cfg, "socket": str(dead_socket)})
+        mpd.status()
+    assert mpd.transport == Transport.TCP
+    mpd.disconnect()
+
+
+@pytest.mark.performance
+def test_benchmark_transport_latency(mockup_mpd_with_socket: MockupMpdServer) -> None:
+    calls = 2000
+    latencies = {}
+    for transport, cfg in [
+        (Transport.TCP, {**mockup_mpd_with_socket.cfg, "socket": "/nonexistent/mpd/socket"}),
+        (Transport.UNIX, mockup_mpd_with_socket.cfg),
+    ]:
+        mpd = Mpd(cfg)
+        mpd.status()
+        assert mpd.transport == transport
+        start = perf_counter()
+        for _ in range(calls):
+            mpd.status()
+        latencies[transport] = (perf_counter() - start) / calls
+        mpd.disconnect()
+
+    print(", ".join(f"{t.value}: {latency * 1e6:.0f}us per status()" for t, latency in latencies.items()))
+    assert latencies[Transport.UNIX] < latencies[Transport.TCP]
@@ -0,0 +1,45 @@
+import time
+
+from test.fixtures import RunMusicPi
+from test.mockups.mockupmpd import MockupMpdServer
+
+WINDOW = 1.5
+
+
+def test_progress_moves_without_polling_mpd(mockup_mpd: MockupMpdServer, run_music_pi: RunMusicPi) -> None:
+    mockup_mpd.queue = list(mockup_mpd.library)
+    mockup_mpd.state = "play"
+    with run_music_pi("idle") as (_, hmi):
+        start, frame = hmi.last_frame(timeout=2)
+        status_requests = mockup_mpd.command_counts["status"]
+        time.sleep(WINDOW)
+        status_requests = mockup_mpd.command_counts["status"] - status_requests
+        distinct_frames = {f for t, f in hmi.frames if t > start}
+    assert status_requests == 0
+    assert len(distinct_frames) >= 2  # the clock ticks every second
+
+
+def test_seeking_resyncs_progress(mockup_mpd: MockupMpdServer, run_music_pi: RunMusicPi) -> None:
+    mockup_mpd.queue = list(mockup_mpd.library)
+    mockup_mpd.state = "pause"
+    with run_music_pi("idle") as (_, hmi):
+        start, frame = hmi.last_frame(timeout=2)
+        time.sleep(0.3)
+        assert hmi.last_frame(timeout=0)[1] == frame  # paused, so nothing moves
+        mockup_mpd.handle_command("seekcur", ["100"])
+        hmi.wait_for_frame(after=start, different_from=frame, timeout=2)
+
+
+def test_idle_mainloop_sleeps_until_something_changes(mockup_mpd: MockupMpdServer, run_music_pi: RunMusicPi) -> None:
+    mockup_mpd.queue = list(mockup_mpd.library)
+    mockup_mpd.state = "pause"
+    with run_music_pi("idle") as (music_pi, hmi):
+        time.sleep(0.3)
+        _, frame = hmi.last_frame(timeout=0)
+        iterations = music_pi.loop_iterations
+        time.sleep(0.5)
+        assert music_pi.loop_iterations == iterations  # paused, so nothing moves and there is nothing to do
+        changed = time.monotonic()
+        mockup_mpd.handle_command("repeat", ["1"])
+        shown, _ = hmi.wait_for_frame(after=changed, different_from=frame, timeout=2)
+    assert shown - changed < 0.05  # handled as soon as mpd reports it, not within a polling interval
@@ -1,15 +1,17 @@
-from enum import IntEnum
-from time import sleep
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
-from musicpi.hardware.pin_interface import Pins
-
-BOARD = None
+BOARD = 10
+BCM = 11
 OUT = 0
 IN = 1
-PUD_UP = 1
+PUD_OFF = 20
+PUD_DOWN = 21
+PUD_UP = 22
 LOW = False
 HIGH = True
+RISING = 31
+FALLING = 32
+BOTH = 33
 
 PINS_N_SENSOR_DOCKED_OCCURRENCES = 0
 PINS_N_SENSOR_UNDOCKED_OCCURRENCES = 0
@@ -17,7 +19,11 @@ PINS_N_SENSOR_UNDOCKED_OCCURRENCES = 0
 DOCKED_AFTER_QUERIES = 3
 UNDOCKED_AFTER_QUERIES = 3
 
-PIN_DIRECTIONS = set()
+PIN_DIRECTIONS: Set[Tuple[int, int, int]] = set()
+
+LEVELS: Dict[int, bool] = {}
+EVENT_DETECTS: Dict[int, Tuple[int, List[Callable[[int], None]]]] = {}
+OUTPUT_LISTENERS: List[Callable[[int, bool], None]] = []  # called with pin and level whenever an output changes
 
 
 def setmode(*args: Any) -> None:
@@ -30,11 +36,48 @@ def setup(pin: int = 0, direction: int = 0, pull_up_down: int = 0) -> None:
     PINS_N_SENSOR_UNDOCKED_OCCURRENCES = 0
     print(f"Call setup with pin = {pin}, dir = {direction}")
     PIN_DIRECTIONS.add((pin, direction, pull_up_down))
+    LEVELS.setdefault(pin, pull_up_down != PUD_DOWN)
+
+
+def input(pin: int) -> bool:
+    return LEVELS.get(pin, HIGH)
+
+
+def output(pin: int, value: bool) -> None:
+    changed = LEVELS.get(pin) != bool(value)
+    LEVELS[pin] = bool(value)
+    if changed:
+        for listener in OUTPUT_LISTENERS:
+            listener(pin, bool(value))
+
+
+def add_event_detect(
+    pin: int, edge: int, callback: Optional[Callable[[int], None]] = None, bouncetime: Optional[int] = None
+) -> None:
+    if pin in EVENT_DETECTS:
+        raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+    EVENT_DETECTS[pin] = (edge, [callback] if callback is not None else [])
+
+
+def add_event_callback(pin: int, callback: Callable[[int], None]) -> None:
+    EVENT_DETECTS[pin][1].append(callback)
+
+
+def remove_event_detect(pin: int) -> None:
+    EVENT_DETECTS.pop(pin, None)
 
 
-def input(pin: IntEnum) -> bool:
-    ...
+def cleanup(*args: Any) -> None:
+    EVENT_DETECTS.clear()
 
 
-def output(pin: IntEnum, value: IntEnum) -> None:
-    ...
+def set_input(pin: int, level: bool) -> None:
+    """test helper: drives an input pin and calls the edge callbacks like RPi.GPIO's event thread would"""
+    previous = LEVELS.get(pin, HIGH)
+    LEVELS[pin] = level
+    if previous == level or pin not in EVENT_DETECTS:
+        return
+    edge, callbacks = EVENT_DETECTS[pin]
+    if edge == BOTH or edge == (RISING if level else FALLING):
+        for callback in callbacks:
+            callback(pin)
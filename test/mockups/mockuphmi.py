@@ -0,0 +1,67 @@
+from threading import Condition
+from time import monotonic
+from typing import List, Tuple
+
+from PIL import Image, ImageDraw
+
+from musicpi.hardware.pin_interface import Button, Led, RotaryEncoder
+from musicpi.hmi.hmi import Hmi
+
+ICONS = ["pause", "play", "repeat", "no_repeat", "random", "no_random"]
+
+
+class MockupHmi(Hmi):
+    """the pins of HmiArm on the RPi.GPIO mockup, with a display that records every frame it is shown"""
+
+    def __init__(self) -> None:
+        self._button = Button()
+        self._led = Led()
+        self._encoder = RotaryEncoder()
+        self.frames: List[Tuple[float, bytes]] = []
+        self._condition = Condition()
+
+    @property
+    def led(self) -> Led:
+        return self._led
+
+    @property
+    def button(self) -> Button:
+        return self._button
+
+    @property
+    def encoder(self) -> RotaryEncoder:
+        return self._encoder
+
+    def show_on_display(self, image: Image.Image) -> None:
+        with self._condition:
+            self.frames.append((monotonic(), image.tobytes()))
+            self._condition.notify_all()
+
+    def wait_for_frame(self, after: float, different_from: bytes, timeout: float) -> Tuple[float, bytes]:
+        """the first frame shown after the given time whose content differs from different_from"""
+        with self._condition:
+            frame = None
+
+            def arrived() -> bool:
+                nonlocal frame
+                frame = next((f for f in self.frames if f[0] > after and f[1] != different_from), None)
+                return frame is not None
+
+            if not self._condition.wait_for(arrived, timeout=timeout):
+                raise TimeoutError("no new frame arrived")
+            assert frame is not None
+            return frame
+
+    def last_frame(self, timeout: float) -> Tuple[float, bytes]:
+        with self._condition:
+            if not self._condition.wait_for(lambda: bool(self.frames), timeout=timeout):
+                raise TimeoutError("no frame arrived")
+            return self.frames[-1]
+
+
+def make_icons(directory: str) -> None:
+    """placeholders for the icons MusicPi loads, each one looking different"""
+    for n, name in enumerate(ICONS):
+        icon = Image.new(mode="1", size=(16, 16), color=0)
+        ImageDraw.Draw(icon).rectangle((0, 0, n + 2, 15 - n), fill=1)
+        icon.save(f"{directory}/{name}.png")
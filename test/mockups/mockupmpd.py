@@ -0,0 +1,508 @@
+from __future__ import annotations
+
+import logging
+import select
+import shlex
+import socket
+import socketserver
+import threading
+import time
+from collections import Counter
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Type, Union
+
+LOG = logging.getLogger(__name__)
+
+Song = Dict[str, str]
+Line = Union[str, bytes]
+
+BINARY_CHUNK_SIZE = 8192  # mpd's default binarylimit
+
+
+class MockupMpdServer:
+    """in-process stand-in for mpd that speaks enough of the text protocol for python-mpd2"""
+
+    def __init__(
+        self,
+        songs: Optional[List[Song]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        unix_socket: Optional[Path] = None,
+    ) -> None:
+        self.library: List[Song] = songs if songs is not None else []
+        self.queue: List[Song] = []
+        self.elapsed = 0.0  # seconds into the current song when it was paused or started playing
+        self._playing_since = 0.0
+        self._state = "stop"
+        self.options = {"repeat": "0", "random": "0", "single": "0", "consume": "0"}
+        self.volume = 50
+        self.playlist_version = 1
+        self.db_update = 1
+        self.command_counts: Counter = Counter()
+        self.response_delay = 0.0  # seconds every response is held back, to stand in for a slow mpd
+        self.connections = 0
+        self.drop_after: Set[str] = set()  # commands that are run, but whose response is lost with the connection
+        self.covers: Dict[str, bytes] = {}  # cover files by directory, as answered by albumart
+        self.pictures: Dict[str, bytes] = {}  # pictures embedded in songs by file, as answered by readpicture
+        self._files: Dict[str, Song] = {}
+        self._files_key: Tuple[int, int] = (0, -1)
+        self._open_sockets: Set[socket.socket] = set()
+        self._pending_changes: Dict[socket.socket, Set[str]] = {}
+        self._lock = threading.Condition()
+        self._tcp_server = _ThreadingTcpServer((host, port), _MpdRequestHandler)
+        self._tcp_server.mpd = self
+        self._servers: List[Union[_ThreadingTcpServer, _ThreadingUnixServer]] = [self._tcp_server]
+        self.unix_socket = unix_socket
+        if unix_socket is not None:
+            unix_server = _ThreadingUnixServer(str(unix_socket), _MpdRequestHandler)
+            unix_server.mpd = self
+            self._servers.append(unix_server)
+
+    def __enter__(self) -> MockupMpdServer:
+        self.start()
+        return self
+
+    def __exit__(
+        self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException], exc_tb: Optional[TracebackType]
+    ) -> None:
+        self.stop()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @state.setter
+    def state(self, state: str) -> None:
+        """keeps track of the elapsed time across play, pause and stop"""
+        if state == "play" and self._state != "play":
+            self._playing_since = time.monotonic()
+        elif state != "play" and self._state == "play":
+            self.elapsed = self._elapsed()
+        if state == "stop":
+            self.elapsed = 0.0
+        self._state = state
+
+    @property
+    def host(self) -> str:
+        return str(self._tcp_server.server_address[0])
+
+    @property
+    def port(self) -> int:
+        return int(self._tcp_server.server_address[1])
+
+    @property
+    def cfg(self) -> dict:
+        return {"host": self.host, "port": self.port, "socket": str(self.unix_socket or "/nonexistent/mpd/socket")}
+
+    def start(self) -> None:
+        for server in self._servers:
+            threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def stop(self) -> None:
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        if self.unix_socket is not None:
+            self.unix_socket.unlink(missing_ok=True)
+
+    def drop_connections(self) -> None:
+        """closes all client connections the way mpd does after its connection_timeout"""
+        for sock in list(self._open_sockets):
+            sock.shutdown(socket.SHUT_RDWR)
+
+    def notify(self, *subsystems: str) -> None:
+        """marks subsystems as changed for every connected client, waking up the idling ones"""
+        with self._lock:
+            for pending in self._pending_changes.values():
+                pending.update(subsystems)
+            self._lock.notify_all()
+
+    def wait_for_changes(self, sock: socket.socket, subsystems: Set[str], timeout: float) -> List[str]:
+        with self._lock:
+            pending = self._pending_changes.setdefault(sock, set())
+            self._lock.wait_for(lambda: bool(pending & subsystems if subsystems else pending), timeout=timeout)
+            changed = sorted(pending & subsystems if subsystems else pending)
+            pending.difference_update(changed)
+            return changed
+
+    def commands_total(self) -> int:
+        return sum(self.command_counts.values())
+
+    def handle_command(self, command: str, args: List[str]) -> Iterable[Line]:
+        with self._lock:
+            self.command_counts[command] += 1
+            handler = getattr(self, f"_cmd_{command}", None)
+            if handler is None:
+                raise MockupMpdError(5, command, f'unknown command "{command}"')
+            return list(handler(*args))
+
+    def _current_song(self) -> Optional[Song]:
+        if self.queue and self.state != "stop":
+            return self.queue[0]
+        return None
+
+    def _cmd_ping(self) -> Iterable[str]:
+        return []
+
+    def _cmd_status(self) -> Iterable[str]:
+        yield f"volume: {self.volume}"
+        for option, value in self.options.items():
+            yield f"{option}: {value}"
+        yield f"playlist: {self.playlist_version}"
+        yield f"playlistlength: {len(self.queue)}"
+        yield "mixrampdb: 0.000000"
+        yield f"state: {self.state}"
+        song = self._current_song()
+        if song is not None:
+            yield "song: 0"
+            yield "songid: 1"
+            yield f"elapsed: {self._elapsed():.3f}"
+            yield f"duration: {song['duration']}"
+
+    def _cmd_currentsong(self) -> Iterable[str]:
+        song = self._current_song()
+        if song is not None:
+            yield from _song_lines(song)
+            yield "Pos: 0"
+            yield "Id: 1"
+
+    def _cmd_stats(self) -> Iterable[str]:
+        yield f"artists: {len({s.get('Artist', '') for s in self.library})}"
+        yield f"albums: {len({s.get('Album', '') for s in self.library})}"
+        yield f"songs: {len(self.library)}"
+        yield "uptime: 100"
+        yield "db_playtime: 1000"
+        yield f"db_update: {self.db_update}"
+        yield "playtime: 10"
+
+    def _cmd_pause(self, pause: str = "") -> Iterable[str]:
+        if pause == "1" or (not pause and self.state == "play"):
+            self.state = "pause"
+        elif self.queue:
+            self.state = "play"
+        self.notify("player")
+        return []
+
+    def _cmd_play(self, *args: str) -> Iterable[str]:
+        if self.queue:
+            self.state = "stop"
+            self.state = "play"
+        self.notify("player")
+        return []
+
+    def _cmd_seekcur(self, position: str) -> Iterable[str]:
+        self.elapsed = float(position)
+        self._playing_since = time.monotonic()
+        self.notify("player")
+        return []
+
+    def _elapsed(self) -> float:
+        if self._state != "play":
+            return self.elapsed
+        return self.elapsed + time.monotonic() - self._playing_since
+
+    def _cmd_setvol(self, volume: str) -> Iterable[str]:
+        self.volume = int(volume)
+        self.notify("mixer")
+        return []
+
+    def _cmd_repeat(self, state: str) -> Iterable[str]:
+        self.options["repeat"] = state
+        self.notify("options")
+        return []
+
+    def _cmd_random(self, state: str) -> Iterable[str]:
+        self.options["random"] = state
+        self.notify("options")
+        return []
+
+    def _cmd_list(self, tag: str, *args: str) -> Iterable[str]:
+        filters, groups = _split_filters(list(args))
+        tag_name = _tag_name(tag)
+        group_names = [_tag_name(g) for g in groups]
+        grouped: Dict[Tuple[str, ...], Set[str]] = {}
+        for song in self._filter(filters, exact=True):
+            key = tuple(_tag_value(song, g) for g in group_names)
+            grouped.setdefault(key, set()).add(_tag_value(song, tag_name))
+        for key in sorted(grouped):
+            for name, value in zip(group_names, key):
+                yield f"{name}: {value}"
+            for value in sorted(grouped[key]):
+                yield f"{tag_name}: {value}"
+
+    def _cmd_find(self, *args: str) -> Iterable[str]:
+        return self._find(list(args), exact=True)
+
+    def _cmd_search(self, *args: str) -> Iterable[str]:
+        return self._find(list(args), exact=False)
+
+    def _cmd_update(self, uri: str = "") -> Iterable[str]:
+        self.db_update += 1
+        self.notify("update", "database")
+        yield "updating_db: 1"
+
+    def _cmd_add(self, uri: str) -> Iterable[str]:
+        song = self._songs_by_file().get(uri)
+        if song is not None:
+            return self._enqueue([song])
+        return self._enqueue(s for s in self.library if s["file"].startswith(uri.rstrip("/") + "/"))
+
+    def _cmd_findadd(self, *args: str) -> Iterable[str]:
+        filters, _ = _split_filters(list(args))
+        return self._enqueue(self._filter(filters, exact=True))
+
+    def _cmd_searchadd(self, *args: str) -> Iterable[str]:
+        filters, _ = _split_filters(list(args))
+        return self._enqueue(self._filter(filters, exact=False))
+
+    def _enqueue(self, songs: Iterable[Song]) -> Iterable[str]:
+        self.queue.extend(songs)
+        self.playlist_version += 1
+        self.notify("playlist")
+        return []
+
+    def _songs_by_file(self) -> Dict[str, Song]:
+        """rebuilt whenever the library has been replaced or changed in size, so adding a file is a lookup"""
+        key = (id(self.library), len(self.library))
+        if self._files_key != key:
+            self._files = {song["file"]: song for song in self.library}
+            self._files_key = key
+        return self._files
+
+    def _cmd_albumart(self, uri: str, offset: str) -> Iterable[Line]:
+        cover = self.covers.get(str(PurePosixPath(uri).parent))
+        if cover is None:
+            raise MockupMpdError(50, "albumart", "No file exists")
+        return _binary_chunk(cover, int(offset))
+
+    def _cmd_readpicture(self, uri: str, offset: str) -> Iterable[Line]:
+        picture = self.pictures.get(uri)
+        if picture is None:
+            return []
+        return ["type: image/jpeg", *_binary_chunk(picture, int(offset))]
+
+    def _cmd_clear(self) -> Iterable[str]:
+        self.queue.clear()
+        self.state = "stop"
+        self.playlist_version += 1
+        self.notify("playlist", "player")
+        return []
+
+    def _find(self, args: List[str], exact: bool) -> Iterable[str]:
+        filters, _ = _split_filters(list(args))
+        songs = list(self._filter(filters, exact=exact))
+        for song in songs[_window(args)]:
+            yield from _song_lines(song)
+
+    def _filter(self, filters: List[Tuple[str, str]], exact: bool) -> Iterable[Song]:
+        for song in self.library:
+            if all(_matches(song, tag, value, exact) for tag, value in filters):
+                yield song
+
+
+class MockupMpdError(Exception):
+    def __init__(self, code: int, command: str, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.command = command
+        self.message = message
+
+    def ack(self, list_index: int = 0) -> str:
+        return f"ACK [{self.code}@{list_index}] {{{self.command}}} {self.message}"
+
+
+def make_song(artist: str, album: str, title: str, track: int, date: int = 2000, albumartist: bool = True) -> Song:
+    song = {
+        "file": f"{artist}/{album}/{track:02d} {title}.flac",
+        "Artist": artist,
+        "AlbumArtist": artist,
+        "Album": album,
+        "Title": title,
+        "Track": str(track),
+        "Date": str(date),
+        "Genre": "Rock",
+        "Time": "180",
+        "duration": "180.000",
+    }
+    if not albumartist:
+        del song["AlbumArtist"]
+    return song
+
+
+def generate_library(n_songs: int, tracks_per_album: int = 10, albums_per_artist: int = 4) -> List[Song]:
+    """a deterministic synthetic collection with artists spread over the whole alphabet"""
+    songs = []
+    for i in range(n_songs):
+        album_no, track = divmod(i, tracks_per_album)
+        artist_no = album_no // albums_per_artist
+        artist = f"{chr(ord('A') + artist_no % 26)}rtist {artist_no:06d}"
+        album = f"Album {album_no:06d}"
+        songs.append(make_song(artist, album, f"Title {i:07d}", track + 1, date=1960 + album_no % 60))
+    return songs
+
+
+def _song_lines(song: Song) -> Iterable[str]:
+    yield f"file: {song['file']}"
+    for key, value in song.items():
+        if key != "file":
+            yield f"{key}: {value}"
+
+
+def _tag_name(tag: str) -> str:
+    lower = tag.lower()
+    if lower == "file":
+        return "file"
+    if lower == "albumartist":
+        return "AlbumArtist"
+    return lower.capitalize()
+
+
+def _tag_value(song: Song, name: str) -> str:
+    """mpd falls back to the artist for songs without an album artist"""
+    if name == "AlbumArtist" and name not in song:
+        name = "Artist"
+    return song.get(name, "")
+
+
+def _matches(song: Song, tag: str, value: str, exact: bool) -> bool:
+    if tag.lower() == "any":
+        candidates = list(song.values())
+    else:
+        candidates = [_tag_value(song, _tag_name(tag))]
+    if exact:
+        return value in candidates
+    return any(value.lower() in c.lower() for c in candidates)
+
+
+def _binary_chunk(data: bytes, offset: int) -> List[Line]:
+    chunk = data[offset : offset + BINARY_CHUNK_SIZE]
+    return [f"size: {len(data)}", f"binary: {len(chunk)}", chunk]
+
+
+def _window(args: List[str]) -> slice:
+    if "window" not in args:
+        return slice(None)
+    start, end = args[args.index("window") + 1].split(":")
+    return slice(int(start), int(end) if end else None)
+
+
+def _split_filters(args: List[str]) -> Tuple[List[Tuple[str, str]], List[str]]:
+    filters: List[Tuple[str, str]] = []
+    groups: List[str] = []
+    while args:
+        key = args.pop(0)
+        value = args.pop(0) if args else ""
+        if key == "group":
+            groups.append(value)
+        elif key not in ("sort", "window"):
+            filters.append((key, value))
+    return filters, groups
+
+
+class _ThreadingTcpServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    mpd: MockupMpdServer
+
+
+class _ThreadingUnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    mpd: MockupMpdServer
+
+
+class _MpdRequestHandler(socketserver.StreamRequestHandler):
+    server: Union[_ThreadingTcpServer, _ThreadingUnixServer]
+
+    def handle(self) -> None:
+        mpd = self.server.mpd
+        mpd.connections += 1
+        mpd._open_sockets.add(self.request)
+        mpd.wait_for_changes(self.request, set(), timeout=0)
+        try:
+            self._serve()
+        except OSError:
+            pass
+        finally:
+            mpd._open_sockets.discard(self.request)
+            mpd._pending_changes.pop(self.request, None)
+
+    def _serve(self) -> None:
+        self._buffer = b""
+        self._send(["OK MPD 0.23.5"])
+        command_list: Optional[List[str]] = None
+        list_ok = False
+        while True:
+            line = self._readline()
+            if line is None:
+                return
+            if line in ("command_list_begin", "command_list_ok_begin"):
+                self.server.mpd.command_counts[line] += 1
+                command_list, list_ok = [], line == "command_list_ok_begin"
+            elif line == "command_list_end" and command_list is not None:
+                self._run_command_list(command_list, list_ok)
+                command_list = None
+            elif command_list is not None:
+                command_list.append(line)
+            elif line == "close":
+                return
+            elif line == "noidle":
+                continue  # mpd silently ignores a noidle that arrives after idle has already returned
+            elif line.startswith("idle"):
+                self._idle(set(shlex.split(line)[1:]))
+            else:
+                self._run_command_list([line], list_ok=False)
+
+    def _run_command_list(self, lines: List[str], list_ok: bool) -> None:
+        time.sleep(self.server.mpd.response_delay)
+        response: List[Line] = []
+        for index, line in enumerate(lines):
+            command, *args = shlex.split(line)
+            try:
+                response.extend(self.server.mpd.handle_command(command, args))
+            except MockupMpdError as e:
+                response.append(e.ack(index))
+                self._send(response)
+                return
+            except (TypeError, IndexError, ValueError):
+                response.append(MockupMpdError(2, command, "wrong arguments").ack(index))
+                self._send(response)
+                return
+            if command in self.server.mpd.drop_after:
+                self.request.shutdown(socket.SHUT_RDWR)
+                return
+            if list_ok:
+                response.append("list_OK")
+        response.append("OK")
+        self._send(response)
+
+    def _idle(self, subsystems: Set[str]) -> None:
+        mpd = self.server.mpd
+        mpd.command_counts["idle"] += 1
+        while True:
+            changed = mpd.wait_for_changes(self.request, subsystems, timeout=0.02)
+            if changed:
+                break
+            readable, _, _ = select.select([self.request], [], [], 0)
+            if readable or b"\n" in self._buffer:
+                if self._readline() is None:
+                    raise ConnectionResetError("client went away while idling")
+                changed = mpd.wait_for_changes(self.request, subsystems, timeout=0)
+                break
+        self._send([f"changed: {subsystem}" for subsystem in changed] + ["OK"])
+
+    def _readline(self) -> Optional[str]:
+        """buffers on its own rather than using rfile, so _idle can tell whether a line has already arrived"""
+        while b"\n" not in self._buffer:
+            chunk = self.request.recv(65536)
+            if not chunk:
+                return None
+            self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line.decode("utf-8")
+
+    def _send(self, lines: Sequence[Line]) -> None:
+        """bytes are sent as they are, e.g. the chunk of a binary response"""
+        self.wfile.write(
+            b"\n".join(line if isinstance(line, bytes) else line.encode("utf-8") for line in lines) + b"\n"
+        )
@@ -0,0 +1,72 @@
+from queue import Empty
+from time import sleep
+from typing import Dict, List
+
+import pytest
+
+from musicpi.hardware.button_events import ButtonEvent, ButtonEvents, ButtonEventType
+
+DEBOUNCE = 0.02
+LONG_PRESS = 0.1
+
+
+@pytest.fixture
+def levels() -> Dict[str, bool]:
+    return {"button": False}
+
+
+@pytest.fixture
+def button_events(levels: Dict[str, bool]) -> ButtonEvents:
+    return ButtonEvents(levels.__getitem__, debounce=DEBOUNCE, long_press=LONG_PRESS)
+
+
+def edge(button_events: ButtonEvents, levels: Dict[str, bool], pressed: bool) -> None:
+    levels["button"] = pressed
+    button_events.on_edge("button")
+
+
+def drain(button_events: ButtonEvents, timeout: float = 0.05) -> List[ButtonEventType]:
+    types = []
+    try:
+        while True:
+            types.append(button_events.queue.get(timeout=timeout).type)
+    except Empty:
+        return types
+
+
+def test_press_is_reported_without_delay(button_events: ButtonEvents, levels: Dict[str, bool]) -> None:
+    edge(button_events, levels, pressed=True)
+    event = button_events.queue.get_nowait()
+    assert isinstance(event, ButtonEvent)
+    assert (event.button, event.type) == ("button", ButtonEventType.PRESS)
+
+
+def test_bouncing_yields_one_press_and_one_release(button_events: ButtonEvents, levels: Dict[str, bool]) -> None:
+    for pressed in [True, False, True, False, True]:
+        edge(button_events, levels, pressed)
+    sleep(2 * DEBOUNCE)
+    for pressed in [False, True, False]:
+        edge(button_events, levels, pressed)
+    assert drain(button_events) == [ButtonEventType.PRESS, ButtonEventType.RELEASE]
+
+
+def test_release_while_bouncing_is_caught_up_after_debounce(
+    button_events: ButtonEvents, levels: Dict[str, bool]
+) -> None:
+    edge(button_events, levels, pressed=True)
+    edge(button_events, levels, pressed=False)
+    assert drain(button_events) == [ButtonEventType.PRESS, ButtonEventType.RELEASE]
+
+
+def test_holding_yields_a_single_long_press(button_events: ButtonEvents, levels: Dict[str, bool]) -> None:
+    edge(button_events, levels, pressed=True)
+    sleep(3 * LONG_PRESS)
+    edge(button_events, levels, pressed=False)
+    assert drain(button_events) == [ButtonEventType.PRESS, ButtonEventType.LONG_PRESS, ButtonEventType.RELEASE]
+
+
+def test_short_press_yields_no_long_press(button_events: ButtonEvents, levels: Dict[str, bool]) -> None:
+    edge(button_events, levels, pressed=True)
+    sleep(2 * DEBOUNCE)
+    edge(button_events, levels, pressed=False)
+    assert drain(button_events, timeout=2 * LONG_PRESS) == [ButtonEventType.PRESS, ButtonEventType.RELEASE]
@@ -0,0 +1,59 @@
+import io
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from musicpi.cover_art import ThumbnailCache, make_thumbnail
+
+
+def jpeg(size: int = 600) -> bytes:
+    buffer = io.BytesIO()
+    Image.radial_gradient("L").resize((size, size // 2)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def test_thumbnail_is_dithered_to_one_bit() -> None:
+    thumbnail = make_thumbnail(jpeg(), size=32)
+    assert thumbnail.mode == "1"
+    assert thumbnail.size == (32, 16)
+    colors = thumbnail.getcolors()
+    assert colors is not None and len(colors) == 2  # a gradient ends up as a pattern rather than a solid area
+
+
+def test_cache_keeps_thumbnails_and_missing_covers(tmp_path: Path) -> None:
+    cache = ThumbnailCache(tmp_path / "covers")
+    thumbnail = make_thumbnail(jpeg())
+    cache.save("Abba/Arrival", thumbnail)
+    cache.save("AC/DC/Back in Black", None)
+    reopened = ThumbnailCache(tmp_path / "covers")
+    assert "Abba/Arrival" in reopened
+    loaded = reopened.load("Abba/Arrival")
+    assert loaded is not None and loaded.tobytes() == thumbnail.tobytes()
+    assert "AC/DC/Back in Black" in reopened
+    assert reopened.load("AC/DC/Back in Black") is None
+    assert "Beatles/Abbey Road" not in reopened
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    thumbnail = make_thumbnail(jpeg())
+    cache = ThumbnailCache(tmp_path, max_bytes=10_000)
+    cache.save("first", thumbnail)
+    thumbnail_bytes = cache.size
+    cache = ThumbnailCache(tmp_path, max_bytes=3 * thumbnail_bytes)
+    for key in ["second", "third"]:
+        cache.save(key, thumbnail)
+    cache.load("first")
+    cache.save("fourth", thumbnail)
+    assert [key in cache for key in ["first", "second", "third", "fourth"]] == [True, False, True, True]
+    assert cache.size <= 3 * thumbnail_bytes
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_unreadable_thumbnail_is_dropped(tmp_path: Path) -> None:
+    cache = ThumbnailCache(tmp_path)
+    cache.save("album", make_thumbnail(jpeg()))
+    for path in tmp_path.iterdir():
+        path.write_bytes(b"no png")
+    assert cache.load("album") is None
+    assert "album" not in cache
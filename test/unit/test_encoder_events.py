@@ -0,0 +1,64 @@
+from typing import Iterable
+
+import pytest
+
+from musicpi.hardware.encoder_events import ENCODER_STEPS_PER_DETENT, Acceleration, EncoderEvents
+
+
+@pytest.fixture
+def encoder_events() -> EncoderEvents:
+    return EncoderEvents(count=100)
+
+
+def turn(encoder_events: EncoderEvents, detents: Iterable[int], interval: float, start: float = 0.0) -> None:
+    count = encoder_events._count
+    for n, detent in enumerate(detents):
+        count += detent * ENCODER_STEPS_PER_DETENT
+        encoder_events.on_count(count, timestamp=start + n * interval)
+
+
+def test_nothing_to_take_without_rotation(encoder_events: EncoderEvents) -> None:
+    encoder_events.on_count(101)
+    assert encoder_events.take() is None
+
+
+def test_slow_turns_move_one_entry_per_detent(encoder_events: EncoderEvents) -> None:
+    turn(encoder_events, [1, 1, 1], interval=1.0)
+    delta = encoder_events.take()
+    assert delta is not None
+    assert (delta.delta, delta.detents, delta.timestamp) == (3, 3, 2.0)
+    turn(encoder_events, [-1], interval=1.0, start=5.0)
+    delta = encoder_events.take()
+    assert delta is not None and delta.delta == -1
+
+
+def test_partial_detents_add_up(encoder_events: EncoderEvents) -> None:
+    encoder_events.on_count(102)
+    assert encoder_events.take() is None
+    encoder_events.on_count(104)
+    delta = encoder_events.take()
+    assert delta is not None and delta.detents == 1
+
+
+def test_fast_spin_is_accelerated_and_coalesced(encoder_events: EncoderEvents) -> None:
+    turn(encoder_events, [1] * 20, interval=0.01)
+    delta = encoder_events.take()
+    assert delta is not None
+    assert delta.detents == 20
+    assert delta.delta == 1 + 19 * Acceleration().max_factor
+    assert encoder_events.take() is None
+
+
+def test_direction_change_restarts_acceleration(encoder_events: EncoderEvents) -> None:
+    turn(encoder_events, [1, -1, 1, -1], interval=0.01)
+    delta = encoder_events.take()
+    assert delta is not None
+    assert (delta.delta, delta.detents) == (0, 0)
+
+
+def test_acceleration_grows_with_speed() -> None:
+    acceleration = Acceleration(slow=5, fast=25, max_factor=10)
+    factors = [acceleration.factor(speed) for speed in [1, 5, 10, 15, 25, 100]]
+    assert factors == sorted(factors)
+    assert factors[0] == factors[1] == 1
+    assert factors[-2] == factors[-1] == 10
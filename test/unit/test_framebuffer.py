@@ -0,0 +1,101 @@
+import time
+from pathlib import Path
+from threading import Thread
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw
+
+from musicpi.hmi.framebuffer import Framebuffer
+from musicpi.hmi.hmi_x86_64 import HmiX86X64
+from test.mockups.mockupmpd import MockupMpdServer
+from test.utils import run_python
+
+
+def frame(n: int) -> Image.Image:
+    image = Image.new(mode="1", size=(128, 64), color=0)
+    ImageDraw.Draw(image).rectangle((n, 0, n + 9, 63), fill=255)
+    return image
+
+
+def same(a: Image.Image, b: Image.Image) -> bool:
+    return ImageChops.difference(a, b).getbbox() is None
+
+
+@pytest.fixture
+def framebuffer(tmp_path: Path) -> Framebuffer:
+    return Framebuffer.create(tmp_path / "musicpi.fb")
+
+
+def test_blank_framebuffer(framebuffer: Framebuffer) -> None:
+    with Framebuffer.open(framebuffer.path) as reader:
+        blank = reader.read()
+    assert blank.number == 0
+    assert blank.image.getbbox() is None
+
+
+def test_frames_are_counted_and_timestamped(framebuffer: Framebuffer) -> None:
+    with Framebuffer.open(framebuffer.path) as reader:
+        before = time.monotonic()
+        assert framebuffer.write(frame(1)) == 1
+        first = reader.read()
+        assert framebuffer.write(frame(2)) == 2
+        second = reader.read()
+    assert (first.number, second.number) == (1, 2)
+    assert same(first.image, frame(1))
+    assert same(second.image, frame(2))
+    assert before <= first.monotonic <= second.monotonic <= time.monotonic()
+    assert first.time == pytest.approx(time.time(), abs=5)
+
+
+def test_another_process_reads_the_frame(framebuffer: Framebuffer, tmp_path: Path) -> None:
+    framebuffer.write(frame(5))
+    framebuffer.write(frame(7))
+    png = tmp_path / "read.png"
+    script = (
+        "import sys; from pathlib import Path; from musicpi.hmi.framebuffer import Framebuffer; "
+        "f = Framebuffer.open(Path(sys.argv[1])).read(); f.image.save(sys.argv[2]); print(f.number)"
+    )
+    assert run_python(script, str(framebuffer.path), str(png)).strip() == "2"
+    with Image.open(png) as image:
+        assert same(image.convert("1"), frame(7))
+
+
+def test_wrong_size(framebuffer: Framebuffer) -> None:
+    with pytest.raises(ValueError):
+        framebuffer.write(Image.new(mode="1", size=(64, 64)))
+
+
+def test_not_a_framebuffer(tmp_path: Path) -> None:
+    path = tmp_path / "other"
+    path.write_bytes(b"\0" * 2048)
+    with pytest.raises(ValueError):
+        Framebuffer.open(path)
+
+
+def test_png_dump(tmp_path: Path) -> None:
+    hmi = HmiX86X64({"framebuffer": {"path": str(tmp_path / "musicpi.fb"), "png_dump": str(tmp_path / "frames")}})
+    hmi.show_on_display(frame(1))
+    hmi.show_on_display(frame(2))
+    assert sorted(p.name for p in (tmp_path / "frames").iterdir()) == ["frame_000001.png", "frame_000002.png"]
+    with Image.open(tmp_path / "frames" / "frame_000002.png") as image:
+        assert same(image.convert("1"), frame(2))
+
+
+def test_music_pi_renders_into_the_framebuffer(mockup_mpd: MockupMpdServer, icons: Path, tmp_path: Path) -> None:
+    from musicpi.musicpi_application import MusicPi
+
+    hmi = HmiX86X64({"framebuffer": {"path": str(tmp_path / "musicpi.fb")}})
+    music_pi = MusicPi(hmi, {"mainloop": "idle", "mpd": mockup_mpd.cfg, "cover_art": {"enabled": False}})
+    thread = Thread(target=music_pi.start, name="musicpi")
+    thread.start()
+    try:
+        with Framebuffer.open(hmi.framebuffer.path) as reader:
+            deadline = time.monotonic() + 5
+            while reader.read().number == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            shown = reader.read()
+    finally:
+        music_pi.stop()
+        thread.join(timeout=5)
+    assert shown.number >= 1
+    assert shown.image.getbbox() is not None
@@ -0,0 +1,94 @@
+from time import perf_counter
+from typing import List, Union
+
+import pytest
+
+from musicpi.library import LibraryIndex, PrefixIndex, PrefixMatch, Track
+
+
+def song(file: str, title: str, artist: Union[str, List[str]], album: str, track: str, date: str) -> dict:
+    albumartist = artist if isinstance(artist, str) else "Various"
+    return dict(file=file, title=title, artist=artist, albumartist=albumartist, album=album, track=track, date=date)
+
+
+@pytest.fixture
+def index() -> LibraryIndex:
+    songs = [
+        song("abba/arrival/08.flac", "Money, Money, Money", "Abba", "Arrival", "8", "1976"),
+        song("abba/arrival/02.flac", "Dancing Queen", "Abba", "Arrival", "2/10", "1976"),
+        song("abba/waterloo/01.flac", "Waterloo", "Abba", "Waterloo", "1", "1974"),
+        song("various/duet.flac", "Duet", ["Abba", "Beatles"], "Duets", "1", "1980"),
+        {
+            "file": "nirvana/teen_spirit.flac",
+            "title": "Smells Like Teen Spirit",
+            "artist": "Nirvana",
+            "album": "Nevermind",
+        },
+        {"file": "untagged.flac"},
+    ]
+    return LibraryIndex((Track.from_dict(s) for s in songs), db_update=42)
+
+
+def test_artists_are_sorted_and_without_empty_ones(index: LibraryIndex) -> None:
+    assert index.artists() == ["Abba", "Beatles", "Nirvana"]
+
+
+def test_albums_of_albumartist_ordered_by_date(index: LibraryIndex) -> None:
+    assert index.albums_of_artist("Abba") == ["Waterloo", "Arrival"]
+    assert index.albums_of_artist("Various") == ["Duets"]
+    assert index.albums_of_artist("Unknown") == []
+
+
+def test_albums_of_artist_without_albumartist_tag(index: LibraryIndex) -> None:
+    assert index.albums_of_artist("Nirvana") == ["Nevermind"]
+
+
+def test_tracks_of_album_ordered_by_track_number(index: LibraryIndex) -> None:
+    assert index.tracks_of_album_of_artist("Abba", "Arrival") == ["Dancing Queen", "Money, Money, Money"]
+
+
+def test_tracks_of_artist_include_multi_artist_songs(index: LibraryIndex) -> None:
+    assert index.tracks_of_artist("Beatles") == ["Duet"]
+    assert "Duet" in index.tracks_of_artist("Abba")
+
+
+def test_files(index: LibraryIndex) -> None:
+    assert index.files("Abba", album="Arrival") == ["abba/arrival/08.flac", "abba/arrival/02.flac"]
+    assert index.files("Abba", title="Waterloo") == ["abba/waterloo/01.flac"]
+    assert len(index.files("Abba")) == 4
+
+
+@pytest.fixture
+def prefixes() -> PrefixIndex:
+    return PrefixIndex(["beatles", "ABBA", "Ärzte", "AC/DC", "Björk", "Zappa", "", "Abba"])
+
+
+def test_names_are_sorted_folded(prefixes: PrefixIndex) -> None:
+    assert prefixes.names() == ["ABBA", "Abba", "AC/DC", "Ärzte", "beatles", "Björk", "Zappa"]
+
+
+def test_prefix_match_ignores_case_and_diacritics(prefixes: PrefixIndex) -> None:
+    assert prefixes.startswith("a") == ["ABBA", "Abba", "AC/DC", "Ärzte"]
+    assert prefixes.startswith("ar") == ["Ärzte"]
+    assert prefixes.startswith("BJÖ") == ["Björk"]
+    assert prefixes.match("b") == PrefixMatch(offset=4, count=2)
+    assert prefixes.match("x") == PrefixMatch(offset=6, count=0)
+
+
+def test_jump_to_letter(prefixes: PrefixIndex) -> None:
+    assert prefixes.jump_to("B") == 4
+    assert prefixes.jump_to("c") == 6
+    assert prefixes.jump_to("z") == 6
+    assert PrefixIndex([]).jump_to("a") == 0
+
+
+@pytest.mark.performance
+def test_benchmark_prefix_lookup_in_10k_artists() -> None:
+    artists = [f"{chr(ord('a') + i % 26)}rtist {i}" for i in range(10000)]
+    prefixes = PrefixIndex(artists)
+    start = perf_counter()
+    for letter in "abcdefghijklmnopqrstuvwxyz" * 40:
+        prefixes.match(letter)
+    per_lookup = (perf_counter() - start) / 1040
+    print(f"prefix lookup in {len(prefixes)} artists: {per_lookup * 1e6:.1f}us")
+    assert per_lookup < 1e-3
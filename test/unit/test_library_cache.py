@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import pytest
+
+from musicpi.library import LibraryIndex, Track
+from musicpi.library_cache import LibraryCache
+
+
+@pytest.fixture
+def index() -> LibraryIndex:
+    tracks = [
+        Track("a/1.flac", "One", ("Abba",), ("Abba",), "Arrival", 1, "1976"),
+        Track("v/2.flac", "Two", ("Abba", "Beatles"), ("Various",), "Duets", 2, "1980"),
+    ]
+    return LibraryIndex(tracks, db_update=1234)
+
+
+def test_round_trip(tmp_path: Path, index: LibraryIndex) -> None:
+    cache = LibraryCache(tmp_path / "cache" / "library.sqlite")
+    cache.save(index)
+    loaded = cache.load()
+    assert loaded is not None
+    assert loaded.db_update == 1234
+    assert loaded.tracks() == index.tracks()
+    assert loaded.artists() == ["Abba", "Beatles"]
+
+
+def test_saving_replaces_previous_content(tmp_path: Path, index: LibraryIndex) -> None:
+    cache = LibraryCache(tmp_path / "library.sqlite")
+    cache.save(index)
+    cache.save(LibraryIndex(index.tracks()[:1], db_update=1235))
+    loaded = cache.load()
+    assert loaded is not None
+    assert (len(loaded), loaded.db_update) == (1, 1235)
+
+
+def test_missing_or_broken_cache_is_ignored(tmp_path: Path) -> None:
+    assert LibraryCache(tmp_path / "missing.sqlite").load() is None
+    broken = tmp_path / "broken.sqlite"
+    broken.write_text("no sqlite file")
+    assert LibraryCache(broken).load() is None
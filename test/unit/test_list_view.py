@@ -0,0 +1,105 @@
+from typing import List, Optional
+
+import pytest
+from PIL import Image
+
+from musicpi.hmi.list_view import ListView, PageCache, SequenceSource
+from musicpi.hmi.text_cache import TextBitmapCache
+from musicpi.library import PrefixIndex
+
+
+class CountingSource(SequenceSource):
+    def __init__(self, length: int) -> None:
+        super().__init__([f"item {i}" for i in range(length)])
+        self.windows: List[int] = []
+
+    def names(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        items = super().names(start, stop)
+        self.windows.append(len(items))
+        return items
+
+
+@pytest.fixture
+def text_cache() -> TextBitmapCache:
+    return TextBitmapCache()
+
+
+def test_shows_eight_rows_on_the_display(text_cache: TextBitmapCache) -> None:
+    view = ListView(SequenceSource([f"item {i}" for i in range(20)]), text_cache)
+    assert view.rows == 8
+    assert view.visible() == [f"item {i}" for i in range(8)]
+    assert view.selected() == "item 0"
+
+
+def test_window_follows_the_cursor(text_cache: TextBitmapCache) -> None:
+    view = ListView(SequenceSource([f"item {i}" for i in range(20)]), text_cache)
+    assert view.move(9)
+    assert (view.top, view.cursor) == (2, 9)
+    assert view.visible() == [f"item {i}" for i in range(2, 10)]
+    assert view.move(-5)
+    assert view.top == 2
+    assert view.move(-3)
+    assert (view.top, view.selected()) == (1, "item 1")
+
+
+def test_cursor_stays_within_the_list(text_cache: TextBitmapCache) -> None:
+    view = ListView(SequenceSource(["a", "b", "c"]), text_cache)
+    assert not view.move(-1)
+    assert view.move(100)
+    assert (view.cursor, view.visible()) == (2, ["a", "b", "c"])
+    assert not view.move(1)
+
+
+def test_empty_list(text_cache: TextBitmapCache) -> None:
+    view = ListView(SequenceSource([]), text_cache)
+    assert not view.move(1)
+    assert view.selected() is None
+    assert view.visible() == []
+
+
+@pytest.mark.parametrize("length", [100, 100_000])
+def test_scrolling_fetches_only_pages(text_cache: TextBitmapCache, length: int) -> None:
+    source = CountingSource(length)
+    view = ListView(source, text_cache)
+    for _ in range(80):
+        view.move(1)
+        view.visible()
+    assert len(source.windows) == 12  # pages 0 to 10 with the cursor and page 11 prefetched, each fetched once
+    assert max(source.windows) == view.rows
+
+
+def test_page_cache_evicts_least_recently_used_page() -> None:
+    source = CountingSource(100)
+    pages = PageCache(source, page_size=8, max_pages=2)
+    pages.page(0)
+    pages.page(1)
+    pages.page(0)
+    pages.page(2)
+    assert pages.items(0, 8) == [f"item {i}" for i in range(8)]
+    assert pages.fetches == 3
+    pages.page(1)
+    assert pages.fetches == 4
+
+
+def test_items_across_pages() -> None:
+    pages = PageCache(SequenceSource([str(i) for i in range(20)]), page_size=8)
+    assert pages.items(6, 10) == ["6", "7", "8", "9"]
+
+
+def test_new_source_keeps_cursor(text_cache: TextBitmapCache) -> None:
+    view = ListView(PrefixIndex(["Abba", "AC/DC", "Beatles"]), text_cache)
+    view.move(2)
+    view.set_source(PrefixIndex(["Abba", "AC/DC", "Beatles", "Cream"]))
+    assert view.selected() == "Beatles"
+    view.set_source(PrefixIndex(["Abba"]))
+    assert view.selected() == "Abba"
+
+
+def test_draw_inverts_selected_row(text_cache: TextBitmapCache) -> None:
+    view = ListView(SequenceSource(["a", "b"]), text_cache)
+    view.move(1)
+    frame = Image.new(mode="1", size=(128, 64), color=0)
+    view.draw(frame)
+    assert frame.getpixel((127, 0)) == 0
+    assert frame.getpixel((127, 8)) == 255
+    assert frame.getpixel((127, 16)) == 0
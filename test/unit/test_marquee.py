@@ -0,0 +1,76 @@
+from time import perf_counter
+
+import pytest
+from PIL import Image, ImageChops
+
+from musicpi.hmi.marquee import Marquee
+from musicpi.hmi.text_cache import TextBitmapCache
+
+LONG_TITLE = "Money, Money, Money (Single Version, Remastered 2001)"
+SPEED = 10.0
+PAUSE = 1.0
+
+
+@pytest.fixture
+def text_cache() -> TextBitmapCache:
+    return TextBitmapCache()
+
+
+@pytest.fixture
+def marquee(text_cache: TextBitmapCache) -> Marquee:
+    return Marquee(text_cache, speed=SPEED, gap=20, pause=PAUSE)
+
+
+def frame(marquee: Marquee, text: str, now: float) -> Image.Image:
+    image = Image.new(mode="1", size=(128, 64), color=0)
+    marquee.draw(image, (0, 0), text, now=now)
+    return image
+
+
+def same(a: Image.Image, b: Image.Image) -> bool:
+    return ImageChops.difference(a, b).getbbox() is None
+
+
+def test_short_text_stands_still(marquee: Marquee, text_cache: TextBitmapCache) -> None:
+    image = Image.new(mode="1", size=(128, 64), color=0)
+    assert not marquee.draw(image, (0, 0), "Abba", now=0)
+    expected = Image.new(mode="1", size=(128, 64), color=0)
+    text_cache.draw(expected, (0, 0), "Abba")
+    assert same(image, expected)
+
+
+def test_long_text_scrolls_after_the_pause(marquee: Marquee) -> None:
+    image = Image.new(mode="1", size=(128, 64), color=0)
+    assert marquee.draw(image, (0, 0), LONG_TITLE, now=0)
+    assert same(frame(marquee, LONG_TITLE, now=PAUSE), image)
+    assert not same(frame(marquee, LONG_TITLE, now=PAUSE + 1), image)
+
+
+def test_scrolling_wraps_around(marquee: Marquee, text_cache: TextBitmapCache) -> None:
+    start = frame(marquee, LONG_TITLE, now=0)
+    period = text_cache.render(LONG_TITLE).width + 20
+    assert same(frame(marquee, LONG_TITLE, now=PAUSE + period / SPEED), start)
+
+
+def test_text_is_rasterised_only_once(marquee: Marquee, text_cache: TextBitmapCache) -> None:
+    for n in range(100):
+        frame(marquee, LONG_TITLE, now=n * 0.05)
+    assert text_cache.report().misses == 1
+
+
+def test_new_text_restarts_the_animation(marquee: Marquee) -> None:
+    frame(marquee, LONG_TITLE, now=0)
+    other = LONG_TITLE.replace("Money", "Honey")
+    assert same(frame(marquee, other, now=10), frame(Marquee(TextBitmapCache()), other, now=0))
+
+
+@pytest.mark.performance
+def test_benchmark_marquee_frame(marquee: Marquee) -> None:
+    image = Image.new(mode="1", size=(128, 64), color=0)
+    frames = 2000
+    start = perf_counter()
+    for n in range(frames):
+        marquee.draw(image, (0, 0), LONG_TITLE, now=PAUSE + n / 25)
+        marquee.draw(image, (0, 11), LONG_TITLE.upper(), now=PAUSE + n / 25)
+    per_frame = (perf_counter() - start) / frames
+    print(f"\ntwo marquees per frame: {per_frame * 1e6:.0f}us ({1 / per_frame:.0f} fps possible)")
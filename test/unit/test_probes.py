@@ -0,0 +1,115 @@
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Generator
+
+import pytest
+
+from musicpi.hardware.pin_interface import Pins
+from musicpi.probes import PROBES, Probes, Ring
+from test.fixtures import RunMusicPi
+from test.mockups.mockupmpd import MockupMpdServer
+
+
+@pytest.fixture
+def probes() -> Generator[Probes, None, None]:
+    """the global probes, enabled and empty"""
+    PROBES.clear()
+    PROBES.enabled = True
+    yield PROBES
+    PROBES.enabled = False
+    PROBES.clear()
+
+
+def test_ring_keeps_only_the_latest_durations() -> None:
+    ring = Ring(size=4)
+    for seconds in [9.0, 9.0, 1.0, 2.0, 3.0, 4.0]:
+        ring.record(seconds)
+    summary = ring.summary("probe")
+    assert summary.count == 6
+    assert summary.max == 4.0
+    assert summary.p50 == 2.0
+
+
+def test_percentiles() -> None:
+    ring = Ring(size=100)
+    for milliseconds in range(100, 0, -1):
+        ring.record(milliseconds / 1000)
+    summary = ring.summary("probe")
+    assert summary.p50 == 0.05
+    assert summary.p95 == 0.095
+    assert summary.max == 0.1
+
+
+def test_empty_ring() -> None:
+    summary = Ring().summary("probe")
+    assert (summary.count, summary.p50, summary.p95, summary.max) == (0, 0.0, 0.0, 0.0)
+
+
+def test_measure() -> None:
+    probes = Probes(enabled=True)
+    with probes.measure("sleep"):
+        time.sleep(0.01)
+    [summary] = probes.summary()
+    assert summary.name == "sleep"
+    assert summary.count == 1
+    assert 0.01 <= summary.max < 0.1
+
+
+def test_disabled_probes_record_nothing() -> None:
+    probes = Probes(enabled=False)
+    with probes.measure("sleep"):
+        pass
+    probes.record("transfer", 1.0)
+    assert probes.measure("sleep") is probes.measure("other")
+    assert probes.summary() == []
+
+
+def test_export(tmp_path: Path) -> None:
+    probes = Probes(enabled=True)
+    probes.record("transfer", 0.002)
+    path = tmp_path / "stats" / "probes.json"
+    probes.export(path)
+    exported = json.loads(path.read_text())
+    assert exported["probes"]["transfer"] == {"count": 1, "p50": 0.002, "p95": 0.002, "max": 0.002}
+
+
+def test_mpd_round_trips_are_probed(probes: Probes, mockup_mpd: MockupMpdServer) -> None:
+    from musicpi import Mpd
+
+    mpd = Mpd(mockup_mpd.cfg)
+    mpd.snapshot()
+    mpd.disconnect()
+    assert "mpd.snapshot" in [summary.name for summary in probes.summary()]
+
+
+def test_sys_stats_page(probes: Probes, run_music_pi: RunMusicPi, tmp_path: Path) -> None:
+    from RPi import GPIO
+
+    export = tmp_path / "probes.json"
+    with run_music_pi("idle", probes={"enabled": True, "export": str(export)}) as (_, hmi):
+        hmi.button.configure(debounce=0.02, long_press=0.1)
+        song_info = hmi.last_frame(timeout=1)[1]
+        pressed = time.monotonic()
+        GPIO.set_input(Pins.buttons["enc_sw"], GPIO.LOW)
+        try:
+            hmi.wait_for_frame(after=pressed, different_from=song_info, timeout=2)
+        finally:
+            GPIO.set_input(Pins.buttons["enc_sw"], GPIO.HIGH)
+    exported = json.loads(export.read_text())["probes"]
+    assert {"mpd.snapshot", "render.compose", "render.transfer"} <= set(exported)
+
+
+@pytest.mark.performance
+def test_benchmark_overhead(benchmark_results: Dict[str, Any]) -> None:
+    repetitions = 100_000
+    results = {}
+    for enabled in [False, True]:
+        probes = Probes(enabled=enabled)
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            with probes.measure("probe"):
+                pass
+        results["enabled" if enabled else "disabled"] = round((time.perf_counter() - start) / repetitions * 1e9)
+    benchmark_results["probe_overhead_ns"] = results
+    print(f"\nprobe overhead in ns: {results}")
@@ -0,0 +1,132 @@
+from threading import Event
+from time import monotonic, sleep
+from typing import Generator, List
+
+import pytest
+from PIL import Image
+
+from musicpi.hmi.render_worker import RenderWorker
+
+
+class RecordingDisplay:
+    def __init__(self, frame_time: float = 0.0) -> None:
+        self.frame_time = frame_time
+        self.shown: List[Image.Image] = []
+        self.timestamps: List[float] = []
+        self.release = Event()
+        self.release.set()
+
+    def show(self, image: Image.Image) -> None:
+        self.release.wait()
+        self.timestamps.append(monotonic())
+        sleep(self.frame_time)
+        self.shown.append(image)
+
+
+def frame(n: int) -> Image.Image:
+    return Image.new(mode="1", size=(128, 64), color=n % 2)
+
+
+@pytest.fixture
+def display() -> RecordingDisplay:
+    return RecordingDisplay()
+
+
+@pytest.fixture
+def worker(display: RecordingDisplay) -> Generator[RenderWorker, None, None]:
+    worker = RenderWorker(display.show, max_fps=1000)
+    worker.start()
+    yield worker
+    worker.stop()
+
+
+def wait_for_frames(worker: RenderWorker, count: int, timeout: float = 1.0) -> None:
+    deadline = monotonic() + timeout
+    while worker.stats.frames_shown < count and monotonic() < deadline:
+        sleep(0.001)
+
+
+def test_submitted_frame_is_shown(worker: RenderWorker, display: RecordingDisplay) -> None:
+    image = frame(1)
+    worker.submit(image)
+    wait_for_frames(worker, 1)
+    assert display.shown == [image]
+
+
+def test_stale_frames_are_dropped(worker: RenderWorker, display: RecordingDisplay) -> None:
+    display.release.clear()
+    worker.submit(frame(0))
+    sleep(0.02)
+    frames = [frame(n) for n in range(1, 6)]
+    for image in frames:
+        worker.submit(image)
+    display.release.set()
+    wait_for_frames(worker, 2)
+    sleep(0.02)
+    assert display.shown[-1] is frames[-1]
+    stats = worker.stats
+    assert stats.frames_shown == 2
+    assert stats.frames_dropped == 4
+
+
+def test_frame_rate_is_capped(display: RecordingDisplay) -> None:
+    worker = RenderWorker(display.show, max_fps=20)
+    worker.start()
+    try:
+        for n in range(30):
+            worker.submit(frame(n))
+            sleep(0.01)
+    finally:
+        worker.stop()
+    assert worker.stats.frames_shown <= 8
+    intervals = [b - a for a, b in zip(display.timestamps, display.timestamps[1:])]
+    assert min(intervals) >= 0.045  # slack for the scheduling of threads on a loaded machine
+
+
+def test_frame_time_is_measured(display: RecordingDisplay) -> None:
+    display.frame_time = 0.02
+    worker = RenderWorker(display.show, max_fps=1000)
+    worker.start()
+    try:
+        worker.submit(frame(0))
+        wait_for_frames(worker, 1)
+    finally:
+        worker.stop()
+    stats = worker.stats
+    assert 0.02 <= stats.last_frame_time == stats.max_frame_time == stats.mean_frame_time < 0.2
+    assert "1 frames shown, 0 dropped" in str(stats)
+
+
+def test_stop_doesnt_wait_for_frames() -> None:
+    worker = RenderWorker(RecordingDisplay().show, max_fps=0.1)
+    worker.start()
+    worker.submit(frame(0))
+    worker.stop()
+    assert not worker.is_alive()
+
+
+class DeviceNotFoundError(Exception):
+    """like luma.core.error.DeviceNotFoundError, which isn't an OSError"""
+
+
+def test_worker_survives_display_errors(display: RecordingDisplay) -> None:
+    failures = [DeviceNotFoundError("I2C device not found on address: 0x3C")]
+    invalidated = Event()
+
+    def show(image: Image.Image) -> None:
+        if failures:
+            raise failures.pop()
+        display.show(image)
+
+    worker = RenderWorker(show, max_fps=1000, on_error=invalidated.set)
+    worker.start()
+    try:
+        worker.submit(frame(0))
+        wait_for_frames(worker, 1)
+        image = frame(1)
+        worker.submit(image)
+        wait_for_frames(worker, 2)
+    finally:
+        worker.stop()
+    assert invalidated.is_set()
+    assert display.shown == [image]
@@ -0,0 +1,97 @@
+from threading import Event
+from typing import List
+
+import pytest
+
+from musicpi.scheduler import Job, Scheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock: FakeClock) -> Scheduler:
+    return Scheduler(wait=clock.sleep, clock=clock)
+
+
+def run_for(scheduler: Scheduler, clock: FakeClock, seconds: float) -> None:
+    end = clock.now + seconds
+    while clock.now < end:
+        scheduler.run_due()
+        clock.sleep(min(max(scheduler.next_due() - clock.now, 0.0), 1.0))
+
+
+def test_jobs_run_at_their_own_rate(scheduler: Scheduler, clock: FakeClock) -> None:
+    fast = scheduler.add(Job("fast", lambda: None, interval=0.1))
+    slow = scheduler.add(Job("slow", lambda: None, interval=30.0))
+    run_for(scheduler, clock, 60.0)
+    assert fast.runs == pytest.approx(600, abs=1)
+    assert slow.runs == 2
+
+
+def test_triggered_job_runs_only_when_triggered(scheduler: Scheduler, clock: FakeClock) -> None:
+    job = scheduler.add(Job("led", lambda: None))
+    run_for(scheduler, clock, 10.0)
+    assert job.runs == 0
+    scheduler.trigger("led")
+    scheduler.trigger("led")
+    scheduler.run_due()
+    assert job.runs == 1
+    scheduler.trigger("unknown")  # e.g. a job that is configured off
+
+
+def test_jobs_trigger_later_ones_in_the_same_pass(scheduler: Scheduler) -> None:
+    ran: List[str] = []
+
+    def handle_input() -> None:
+        ran.append("input")
+        scheduler.trigger("display")
+
+    scheduler.add(Job("input", handle_input, interval=1.0))
+    scheduler.add(Job("display", lambda: ran.append("display")))
+    assert scheduler.run_due() == 2
+    assert ran == ["input", "display"]
+
+
+def test_min_interval_defers_triggers(scheduler: Scheduler, clock: FakeClock) -> None:
+    display = scheduler.add(Job("display", lambda: None, min_interval=0.1))
+    for _ in range(100):
+        scheduler.trigger("display")
+        scheduler.run_due()
+        clock.sleep(0.01)
+    assert display.runs == pytest.approx(10, abs=1)
+
+
+def test_back_off_while_paused(scheduler: Scheduler, clock: FakeClock) -> None:
+    status = scheduler.add(Job("status", lambda: None, interval=0.1, backoff=10.0))
+    scheduler.paused = True
+    run_for(scheduler, clock, 10.0)
+    assert status.runs == pytest.approx(10, abs=1)
+    assert min(clock.sleeps) >= 0.99
+
+
+def test_nothing_due_sleeps_at_most_max_sleep(scheduler: Scheduler, clock: FakeClock) -> None:
+    stop = Event()
+
+    def stop_on_second_run() -> None:
+        if clock.now:
+            stop.set()
+
+    scheduler.add(Job("stop", stop_on_second_run, interval=5.0))
+    scheduler.run(stop)
+    assert clock.sleeps == [1.0] * 5
@@ -0,0 +1,88 @@
+import json
+import time
+from pathlib import Path
+
+from musicpi.hmi import icons
+from musicpi.hmi.render_worker import RenderWorker
+from musicpi.hmi.splash import splash_frame
+from musicpi.startup import StartupReport
+from test.fixtures import RunMusicPi
+from test.utils import run_python
+
+
+def modules_loaded_by(statement: str) -> str:
+    """the modules in sys.modules after running statement in a fresh interpreter"""
+    return run_python(f"import sys; {statement}; print(' '.join(sys.modules))")
+
+
+def test_splash_needs_neither_mpd_nor_the_state_machine() -> None:
+    modules = modules_loaded_by(
+        "from musicpi.startup import StartupReport; from musicpi.hmi.splash import splash_frame"
+    )
+    for heavy in ["mpd", "super_state_machine", "luma", "musicpi.mpd_wrapper"]:
+        assert f" {heavy} " not in f" {modules} "
+
+
+def test_application_imports_asyncio_only_for_its_mainloop() -> None:
+    modules = modules_loaded_by("import musicpi.musicpi_application")
+    assert " asyncio " not in f" {modules} "
+
+
+def test_splash_frame() -> None:
+    frame = splash_frame()
+    assert frame.size == (128, 64)
+    assert frame.mode == "1"
+    assert frame.getbbox() is not None
+
+
+def test_icons_are_loaded_on_first_use(icons: Path) -> None:
+    from musicpi.hmi.icons import icon
+
+    assert icon("play") is icon("play")
+    assert icon("play").tobytes() != icon("pause").tobytes()
+
+
+def test_icons_are_relative_to_the_module() -> None:
+    assert icons.ICON_DIRECTORY.is_absolute()
+    assert icons.ICON_DIRECTORY.parent == Path(icons.__file__).parent
+
+
+def test_report() -> None:
+    report = StartupReport(start=time.perf_counter() - 1)
+    assert 1 <= report.mark("splash") < 2
+    assert report.mark("splash") == report.milestones["splash"]  # only the first time counts
+    with report.importing("a module"):
+        import musicpi.mpd_idle  # noqa: F401
+    assert "a module" in report.imports
+    assert "splash" in str(report)
+
+
+def test_export(tmp_path: Path) -> None:
+    report = StartupReport()
+    report.mark("first_frame")
+    path = tmp_path / "startup" / "report.json"
+    report.export(path)
+    assert set(json.loads(path.read_text())["milestones"]) == {"first_frame"}
+
+
+def test_first_frame_callback() -> None:
+    shown = []
+    worker = RenderWorker(lambda frame: None, max_fps=100, on_first_frame=lambda: shown.append(time.monotonic()))
+    worker.start()
+    try:
+        for _ in range(3):
+            worker.submit(splash_frame())
+            time.sleep(0.02)
+    finally:
+        worker.stop()
+    assert worker.stats.frames_shown == 3
+    assert len(shown) == 1
+
+
+def test_time_to_first_frame(run_music_pi: RunMusicPi, tmp_path: Path) -> None:
+    export = tmp_path / "startup.json"
+    report = StartupReport()
+    with run_music_pi("idle", startup=report, startup_report=str(export)):
+        pass
+    milestones = json.loads(export.read_text())["milestones"]
+    assert 0 < milestones["mainloop"] <= milestones["first_frame"]
@@ -0,0 +1,36 @@
+from musicpi.mpd_wrapper import Status
+
+STATUS = {
+    "repeat": "0",
+    "random": "0",
+    "single": "0",
+    "consume": "0",
+    "playlist": "2",
+    "playlistlength": "5",
+    "mixrampdb": "0.000000",
+    "elapsed": "10.500",
+    "duration": "180.000",
+}
+
+
+def test_position_is_extrapolated_while_playing() -> None:
+    status = Status.from_dict({**STATUS, "state": "play"})
+    assert (status.elapsed, status.duration) == (10.5, 180.0)
+    assert status.position(now=status.timestamp + 2) == 12.5
+    assert status.position(now=status.timestamp + 1000) == 180.0
+
+
+def test_position_stands_still_while_paused() -> None:
+    status = Status.from_dict({**STATUS, "state": "pause"})
+    assert status.position(now=status.timestamp + 2) == 10.5
+
+
+def test_timestamp_doesnt_take_part_in_comparisons() -> None:
+    assert Status.from_dict({**STATUS, "state": "play"}) == Status.from_dict({**STATUS, "state": "play"})
+
+
+def test_stopped_without_song() -> None:
+    status = Status.from_dict(
+        {**{k: v for k, v in STATUS.items() if k not in ("elapsed", "duration")}, "state": "stop"}
+    )
+    assert status.position() == 0.0
@@ -0,0 +1,79 @@
+from itertools import product
+from pathlib import Path
+from time import perf_counter
+from typing import Tuple
+
+import pytest
+from PIL import Image, ImageChops
+
+from musicpi.hmi.icons import icon
+from musicpi.hmi.status_bar import StatusBar
+from musicpi.hmi.text_cache import TextBitmapCache
+
+
+@pytest.fixture
+def text_cache() -> TextBitmapCache:
+    return TextBitmapCache()
+
+
+@pytest.fixture
+def status_bar(icons: Path, text_cache: TextBitmapCache) -> StatusBar:
+    return StatusBar(text_cache)
+
+
+def separately(text_cache: TextBitmapCache, playing: bool, repeat: bool, random: bool, position: str) -> Image.Image:
+    """the status row like it was drawn before, icon by icon"""
+    image = Image.new(mode="1", size=(128, 64), color=0)
+    image.paste(icon("play" if playing else "pause"), (0, 48))
+    image.paste(icon("repeat" if repeat else "no_repeat"), (16, 48))
+    image.paste(icon("random" if random else "no_random"), (32, 48))
+    text_cache.draw(image, (48, 48), position)
+    return image
+
+
+@pytest.mark.parametrize("flags", list(product([False, True], repeat=3)))
+def test_sprite_looks_like_separate_icons(
+    status_bar: StatusBar, text_cache: TextBitmapCache, flags: Tuple[bool, bool, bool]
+) -> None:
+    image = Image.new(mode="1", size=(128, 64), color=0)
+    playing, repeat, random = flags
+    status_bar.draw(image, (0, 48), playing, repeat, random, "(3/12)")
+    expected = separately(text_cache, playing, repeat, random, "(3/12)")
+    assert ImageChops.difference(image, expected).getbbox() is None
+
+
+def test_unchanged_status_reuses_the_sprite(status_bar: StatusBar) -> None:
+    sprite = status_bar.sprite(True, False, False, "(3/12)")
+    assert status_bar.sprite(True, False, False, "(3/12)") is sprite
+    assert status_bar.sprite(True, False, False, "(4/12)") is not sprite
+    assert status_bar.sprite(False, False, False, "(4/12)") is not sprite
+
+
+def test_icons_are_composited_once_per_combination(status_bar: StatusBar) -> None:
+    for n in range(3):
+        for playing, repeat, random in product([False, True], repeat=3):
+            status_bar.sprite(playing, repeat, random, f"({n}/12)")
+    assert status_bar.combinations == 8
+
+
+def test_icons_are_converted_to_one_bit_on_load(icons: Path) -> None:
+    Image.new(mode="RGBA", size=(16, 16), color=(255, 255, 255, 255)).save(icons / "white.png")
+    white = icon("white")
+    assert white.mode == "1"
+    assert white.getextrema() == (255, 255)
+
+
+@pytest.mark.performance
+def test_benchmark_status_bar(status_bar: StatusBar, text_cache: TextBitmapCache) -> None:
+    frames = 2000
+    image = Image.new(mode="1", size=(128, 64), color=0)
+    start = perf_counter()
+    for _ in range(frames):
+        separately(text_cache, True, False, True, "(3/12)")
+    before = (perf_counter() - start) / frames
+    start = perf_counter()
+    for _ in range(frames):
+        image = Image.new(mode="1", size=(128, 64), color=0)
+        status_bar.draw(image, (0, 48), True, False, True, "(3/12)")
+    after = (perf_counter() - start) / frames
+    print(f"\nstatus row: {before * 1e6:.0f}us icon by icon, {after * 1e6:.0f}us as one sprite")
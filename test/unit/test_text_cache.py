@@ -0,0 +1,44 @@
+from PIL import Image, ImageChops, ImageDraw
+
+from musicpi.hmi.text_cache import DEFAULT_FONT, TextBitmapCache, bitmap_size, get_font
+
+
+def test_fonts_are_loaded_once() -> None:
+    assert get_font(DEFAULT_FONT, 9) is get_font(DEFAULT_FONT, 9)
+    assert get_font(DEFAULT_FONT, 9) is not get_font(DEFAULT_FONT, 12)
+
+
+def test_drawn_bitmap_equals_drawn_text() -> None:
+    text = "Dancing Queen (2/8)"
+    expected = Image.new(mode="1", size=(128, 64), color=0)
+    ImageDraw.Draw(expected).text((5, 11), text, fill="white", font=get_font())
+    drawn = Image.new(mode="1", size=(128, 64), color=0)
+    TextBitmapCache().draw(drawn, (5, 11), text)
+    assert ImageChops.difference(expected, drawn).getbbox() is None
+
+
+def test_hits_and_misses_are_reported() -> None:
+    cache = TextBitmapCache()
+    first = cache.render("Abba")
+    assert cache.render("Abba") is first
+    cache.render("Abba", size=12)
+    report = cache.report()
+    assert (report.hits, report.misses, report.entries) == (1, 2, 2)
+    assert report.hit_rate == 1 / 3
+
+
+def test_least_recently_used_bitmaps_are_evicted() -> None:
+    bitmap_bytes = bitmap_size(TextBitmapCache().render("title 0"))
+    cache = TextBitmapCache(max_size=3 * bitmap_bytes)
+    for i in range(3):
+        cache.render(f"title {i}")
+    cache.render("title 0")
+    cache.render("title 3")
+
+    report = cache.report()
+    assert report.size <= report.max_size
+    assert report.evictions == 1
+    cache.render("title 0")
+    assert cache.report().hits == 2
+    cache.render("title 1")
+    assert cache.report().misses == 5
@@ -1,5 +1,17 @@
+import subprocess
+import sys
+from pathlib import Path
 from typing import Callable
 
+REPO_ROOT = Path(__file__).parents[1]
+
 
 def derive_mock_string(func: Callable) -> str:
     return f"{func.__module__}.{func.__qualname__}"
+
+
+def run_python(code: str, *args: str) -> str:
+    """runs code in a fresh interpreter from the repository root, wherever pytest was started, and returns its stdout"""
+    return subprocess.run(
+        [sys.executable, "-c", code, *args], cwd=REPO_ROOT, capture_output=True, check=True, text=True
+    ).stdout